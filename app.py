@@ -1,15 +1,45 @@
+import io
+import uuid
 import streamlit as st
+from streamlit.errors import StreamlitAPIException
+from utils.config import set_secrets_provider
+
+# The data layer reads its settings on import and doesn't know about Streamlit
+set_secrets_provider(st.secrets)
+
 from utils.data_handler import (
-    get_all_wishlists, 
     create_wishlist, 
     load_wishlist, 
-    save_wishlist,
+    add_item,
+    update_item,
+    gift_item,
+    delete_item,
+    move_item,
     verify_wishlist_password,
-    delete_wishlist
+    delete_wishlist,
+    get_write_behind_queue,
+    set_save_owner,
+    pop_failed_saves,
+    get_wishlist_stats,
+    get_item_index,
+    search_wishlists,
+    get_wishlists_page,
+    WishlistConflictError
 )
+from utils.models import format_cents
+from utils.import_export import import_items, export_items
 from utils.remote_storage import remote_available
+from utils.storage import get_backend
+from utils import metrics, profiling
 from components.wishlist_item import WishlistItem
 
+# Storage calls of this run are counted per session; the diagnostics show the previous run
+previous_run_metrics = metrics.begin_rerun(st.session_state)
+# Queued saves remember their session, so a background write that fails is shown here
+set_save_owner(st.session_state.setdefault("save_owner", uuid.uuid4().hex))
+# Profiles this run if requested in the diagnostics (stopped at the end of the script)
+profiling.start_run(st.session_state)
+
 # Page configuration
 st.set_page_config(
     page_title="🎄 Weihnachts-Wunschliste",
@@ -37,8 +67,8 @@ st.markdown("""
 st.markdown('<h1 class="big-title">🎄 Weihnachts-Wunschliste 🎁</h1>', unsafe_allow_html=True)
 
 # Storage status badge
-storage_label = "GitHub" if remote_available() else "Local"
-badge_color = "#1976d2" if storage_label == "GitHub" else "#888"
+storage_label = get_backend().label
+badge_color = {"GitHub": "#1976d2", "SQLite": "#2e7d32"}.get(storage_label, "#888")
 st.markdown(
         f"""
         <div style="text-align:center; margin-top:-10px;">
@@ -60,7 +90,8 @@ st.markdown(
 with st.expander("🔧 Storage diagnostics", expanded=False):
     try:
         import os
-        from utils.remote_storage import _get_secrets
+        from utils.remote_storage import _get_secrets, get_request_log, get_replica, get_rate_limit_status
+        from utils.rate_limit import HEALTHCHECK, request_priority
         token, repo, prefix = _get_secrets()
         # Compute whether a token exists in secrets (top-level or [general])
         secrets_has_token = False
@@ -76,6 +107,7 @@ with st.expander("🔧 Storage diagnostics", expanded=False):
             pass
 
         st.write({
+            "backend": get_backend().name,
             "remote_available": remote_available(),
             "GH_REPO": repo or "(missing)",
             "GH_PATH": prefix or "(missing)",
@@ -83,8 +115,55 @@ with st.expander("🔧 Storage diagnostics", expanded=False):
             "ENV_has_token": bool(os.environ.get("GH_TOKEN")),
             "SECRETS_has_token": secrets_has_token,
         })
+        lock_contention = getattr(get_backend(), "lock_contention", None)
+        if lock_contention:
+            st.caption("Lock contention (writers that had to wait, per file)")
+            st.write(dict(lock_contention.most_common(10)))
+        replica = get_replica()
+        if replica is not None:
+            st.write(replica.status())
+        write_queue = get_write_behind_queue()
+        if write_queue is not None:
+            st.write({
+                "write_behind_pending": write_queue.has_pending(),
+                "write_behind_errors": list(write_queue.errors),
+            })
+        if remote_available():
+            st.caption("GitHub rate limit (projected = left at reset if the last 10 minutes' pace continues)")
+            st.write(get_rate_limit_status())
+        if previous_run_metrics is not None and previous_run_metrics.calls:
+            st.caption("Storage calls of the previous rerun")
+            st.dataframe(previous_run_metrics.calls_table(), use_container_width=True, hide_index=True)
+            st.write({"bytes": dict(previous_run_metrics.bytes), "cache_hits": previous_run_metrics.cache_ratios()})
+        session_run_metrics = metrics.session_metrics(st.session_state)
+        if session_run_metrics is not None and session_run_metrics.calls:
+            st.caption("Storage calls of this session")
+            st.dataframe(session_run_metrics.calls_table(), use_container_width=True, hide_index=True)
+        st.caption("Storage calls since process start (p95 = upper bound of the latency bucket)")
+        st.dataframe(metrics.process.calls_table(), use_container_width=True, hide_index=True)
+        st.write({"bytes": dict(metrics.process.bytes), "cache_hits": metrics.process.cache_ratios()})
+        col_runs, col_profile = st.columns([1, 2])
+        profile_runs = col_runs.number_input("Reruns", min_value=1, max_value=20, value=3, key="profile_runs")
+        if col_profile.button("⏱️ Profile next reruns", use_container_width=True):
+            profiling.request_profile(st.session_state, int(profile_runs))
+        if profiling.profiling_pending(st.session_state):
+            st.caption(f"Profiling the next {profiling.profiling_pending(st.session_state)} rerun(s) of this session")
+        profile_stats = profiling.profile_results(st.session_state)
+        if profile_stats is not None:
+            st.caption("Profiled reruns: top functions by cumulative time (script thread only)")
+            st.dataframe(profiling.top_functions(profile_stats), use_container_width=True, hide_index=True)
+            col_raw, col_stacks = st.columns(2)
+            col_raw.download_button("⬇️ Raw profile (.prof)", profiling.raw_profile(profile_stats),
+                                    file_name="rerun.prof", mime="application/octet-stream", use_container_width=True)
+            col_stacks.download_button("⬇️ Collapsed stacks", profiling.collapsed_stacks(profile_stats),
+                                       file_name="rerun.folded", mime="text/plain", use_container_width=True)
+        recent_calls = get_request_log()
+        if recent_calls:
+            st.caption("Recent GitHub API calls (latency in ms, newest last)")
+            st.dataframe(recent_calls, use_container_width=True, hide_index=True)
         if not remote_available():
-            st.info("Add secrets in Streamlit Cloud: GH_TOKEN, GH_REPO, GH_PATH. After saving, wait ~1 minute and reload.")
+            st.info("Add secrets in Streamlit Cloud: GH_TOKEN, GH_REPO, GH_PATH. After saving, reboot the app "
+                    "(Manage app → Reboot app): settings and the storage backend are read once per process.")
         else:
             # Optional self-test to verify GitHub write access
             if st.button("Run remote self-test"):
@@ -93,8 +172,9 @@ with st.expander("🔧 Storage diagnostics", expanded=False):
                     import datetime
                     now = datetime.datetime.utcnow().isoformat() + "Z"
                     test_path = f"{prefix}/healthcheck.txt"
-                    _put_file(token, repo, test_path, f"ok {now}".encode("utf-8"), "chore: remote storage healthcheck")
-                    echoed = _get_file(token, repo, test_path)
+                    with request_priority(HEALTHCHECK):
+                        _put_file(token, repo, test_path, f"ok {now}".encode("utf-8"), "chore: remote storage healthcheck")
+                        echoed = _get_file(token, repo, test_path)
                     if echoed and echoed.startswith("ok "):
                         st.success("Remote self-test passed: wrote and read healthcheck.txt")
                     else:
@@ -110,6 +190,22 @@ if 'current_wishlist_id' not in st.session_state:
 if 'authenticated' not in st.session_state:
     st.session_state.authenticated = False
 
+def change_current_wishlist(change, *args) -> bool:
+    """Apply a data-layer change to the open wishlist; on a real conflict keep a notice for the next rerun."""
+    try:
+        change(st.session_state.current_wishlist_id, *args)
+        return True
+    except WishlistConflictError as e:
+        st.session_state.save_conflict = str(e)
+        return False
+
+def rerun_fragment():
+    """Rerun just the calling fragment; a full script run (e.g. under AppTest) has no fragment to rerun."""
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
+
 # Main navigation
 if st.session_state.current_wishlist_id is None:
     # Show list selection / creation screen
@@ -119,9 +215,18 @@ if st.session_state.current_wishlist_id is None:
     
     with tab1:
         st.subheader("Wähle eine Wunschliste")
-        wishlists = get_all_wishlists()
+        list_query = st.text_input("🔍 Liste suchen", placeholder="Name der Liste", key="wishlist_search")
+        match_count = None
+        if list_query.strip():
+            wishlists, match_count = search_wishlists(list_query)
+            page_count = 1
+        else:
+            # One index page per read, however many lists there are
+            wishlists, page_count = get_wishlists_page(st.session_state.get("overview_page", 1) - 1)
         
-        if not wishlists:
+        if not wishlists and list_query.strip():
+            st.info("🔍 Keine passende Liste gefunden.")
+        elif not wishlists:
             st.info("📭 Noch keine Wunschlisten vorhanden. Erstelle eine neue Liste!")
         else:
             # Display available wishlists
@@ -129,6 +234,10 @@ if st.session_state.current_wishlist_id is None:
                 col1, col2, col3 = st.columns([3, 1, 1])
                 with col1:
                     st.markdown(f"### 🎅 {wishlist['name']}")
+                    if 'item_count' in wishlist:
+                        modified = wishlist.get('modified') or ''
+                        changed = f" · geändert am {modified[8:10]}.{modified[5:7]}.{modified[:4]}" if modified else ''
+                        st.caption(f"🎁 {wishlist.get('gifted_count', 0)} von {wishlist['item_count']} verschenkt{changed}")
                 with col2:
                     if st.button("Öffnen", key=f"open_{wishlist['id']}"):
                         st.session_state.current_wishlist_id = wishlist['id']
@@ -155,6 +264,12 @@ if st.session_state.current_wishlist_id is None:
                             st.rerun()
                 
                 st.markdown("---")
+            
+            if match_count is not None and match_count > len(wishlists):
+                st.caption(f"🔍 {len(wishlists)} von {match_count} Treffern – bitte die Suche genauer fassen.")
+        
+        if page_count > 1:
+            st.number_input(f"Seite (von {page_count})", min_value=1, max_value=page_count, step=1, key="overview_page")
     
     with tab2:
         st.subheader("Neue Wunschliste erstellen")
@@ -239,10 +354,14 @@ else:
     
     st.markdown("---")
     
-    # Edit Dialog (if editing)
-    if 'editing_item_index' in st.session_state and st.session_state.editing_item_index is not None:
-        edit_index = st.session_state.editing_item_index
-        item_to_edit = wishlist_data['items'][edit_index]
+    # Item actions rerun only their fragment; navigation above still reruns the whole page
+    @st.dialog("✏️ Geschenk bearbeiten")
+    def edit_item_dialog(edit_item_id):
+        items = load_wishlist(st.session_state.current_wishlist_id)['items']
+        item_to_edit = next((item for item in items if item.get('id') == edit_item_id), None)
+        if item_to_edit is None:
+            st.warning("⚠️ Das Geschenk gibt es nicht mehr.")
+            return
         
         st.subheader(f"✏️ Bearbeite: {item_to_edit['gift_name']}")
         
@@ -265,126 +384,216 @@ else:
                 cancel_button = st.form_submit_button("❌ Abbrechen", use_container_width=True)
             
             if save_button:
-                wishlist_data['items'][edit_index] = {
+                fields = {
                     "gift_name": edit_gift_name,
                     "purchase_link": edit_purchase_link,
-                    "is_gifted": item_to_edit.get('is_gifted', False),
                     "price": edit_price,
                     "amazon_link": edit_amazon_link,
                     "is_highlight": edit_is_highlight
                 }
-                save_wishlist(st.session_state.current_wishlist_id, wishlist_data)
-                st.session_state.editing_item_index = None
-                st.success("✅ Änderungen gespeichert!")
+                expected = {"gift_name": item_to_edit['gift_name']}
+                change_current_wishlist(update_item, edit_item_id, fields, expected)
+                # Closing a dialog needs an app rerun
                 st.rerun()
             
             if cancel_button:
-                st.session_state.editing_item_index = None
                 st.rerun()
-        
-        st.markdown("---")
     
-    # Item input form
-    st.subheader("➕ Neues Geschenk hinzufügen")
-    with st.form(key='item_form', clear_on_submit=True):
-        col1, col2 = st.columns(2)
+    @st.fragment
+    def item_form():
+        metrics.fragment_rerun(st.session_state)
+        set_save_owner(st.session_state.save_owner)
+        st.subheader("➕ Neues Geschenk hinzufügen")
+        with st.form(key='item_form', clear_on_submit=True):
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                gift_name = st.text_input("🎁 Geschenk Name", placeholder="z.B. Buch, Spielzeug, ...")
+                purchase_link = st.text_input("🔗 Kauflink (optional)", placeholder="https://...")
+                price = st.text_input("💰 Preis (optional)", placeholder="z.B. 29,99€")
+            
+            with col2:
+                amazon_link = st.text_input("📦 Amazon Link (optional)", placeholder="https://amazon.de/...")
+                is_highlight = st.checkbox("⭐ Als Highlight markieren", help="Item wird gelb hervorgehoben")
+            
+            submit_button = st.form_submit_button("➕ Hinzufügen", use_container_width=True)
+            
+            if submit_button and gift_name:
+                item = {
+                    "gift_name": gift_name,
+                    "purchase_link": purchase_link,
+                    "is_gifted": False,
+                    "price": price,
+                    "amazon_link": amazon_link,
+                    "is_highlight": is_highlight
+                }
+                change_current_wishlist(add_item, item)
+                # The item list is a separate fragment, so it needs an app rerun to show the new item
+                st.rerun()
+            elif submit_button:
+                st.warning("⚠️ Bitte gib einen Geschenk-Namen ein!")
+    
+    @st.fragment
+    def item_list():
+        metrics.fragment_rerun(st.session_state)
+        set_save_owner(st.session_state.save_owner)
+        wishlist_data = load_wishlist(st.session_state.current_wishlist_id) or {}
         
-        with col1:
-            gift_name = st.text_input("🎁 Geschenk Name", placeholder="z.B. Buch, Spielzeug, ...")
-            purchase_link = st.text_input("🔗 Kauflink (optional)", placeholder="https://...")
-            price = st.text_input("💰 Preis (optional)", placeholder="z.B. 29,99€")
+        if st.session_state.get('save_conflict'):
+            st.warning(f"⚠️ Nicht gespeichert: {st.session_state.pop('save_conflict')}. Die Liste zeigt jetzt den aktuellen Stand.")
+        for failure in pop_failed_saves(st.session_state.save_owner):
+            st.error(f"❌ Eine Änderung konnte nicht gespeichert werden: {failure['error']}. Die Liste zeigt den gespeicherten Stand.")
         
-        with col2:
-            amazon_link = st.text_input("📦 Amazon Link (optional)", placeholder="https://amazon.de/...")
-            is_highlight = st.checkbox("⭐ Als Highlight markieren", help="Item wird gelb hervorgehoben")
+        st.subheader("🎁 Deine Wunschliste")
         
-        submit_button = st.form_submit_button("➕ Hinzufügen", use_container_width=True)
+        if not wishlist_data.get('items') or len(wishlist_data.get('items', [])) == 0:
+            st.info("📋 Deine Wunschliste ist noch leer. Füge oben ein Geschenk hinzu!")
+            return
         
-        if submit_button and gift_name:
-            item = {
-                "gift_name": gift_name,
-                "purchase_link": purchase_link,
-                "is_gifted": False,
-                "price": price,
-                "amazon_link": amazon_link,
-                "is_highlight": is_highlight
-            }
-            wishlist_data['items'].append(item)
-            save_wishlist(st.session_state.current_wishlist_id, wishlist_data)
-            st.success(f"✅ '{gift_name}' wurde hinzugefügt!")
-            st.rerun()
-        elif submit_button:
-            st.warning("⚠️ Bitte gib einen Geschenk-Namen ein!")
-    
-    st.markdown("---")
-    
-    # Display the wish list items
-    st.subheader("🎁 Deine Wunschliste")
-    
-    if not wishlist_data.get('items') or len(wishlist_data.get('items', [])) == 0:
-        st.info("📋 Deine Wunschliste ist noch leer. Füge oben ein Geschenk hinzu!")
-    else:
-        # Show statistics
+        # Show statistics (kept per wishlist version, not recounted on every rerun)
         total_items = len(wishlist_data.get('items', []))
-        gifted_items = sum(1 for item in wishlist_data.get('items', []) if item.get('is_gifted', False))
+        stats = get_wishlist_stats(st.session_state.current_wishlist_id)
         
         col1, col2, col3 = st.columns(3)
-        col1.metric("Gesamt", total_items)
-        col2.metric("Wird verschenkt", gifted_items)
-        col3.metric("Noch offen", total_items - gifted_items)
+        col1.metric("Gesamt", stats.total_count)
+        col2.metric("Wird verschenkt", stats.gifted_count)
+        col3.metric("Noch offen", stats.open_count)
+        
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Gesamtwert", format_cents(stats.total_cents))
+        col2.metric("Verschenkt (Wert)", format_cents(stats.gifted_cents))
+        col3.metric("Noch offen (Wert)", format_cents(stats.open_cents))
         
         st.markdown("---")
         
+        # Search and filter chips, answered by the shared item index
+        item_index = get_item_index(st.session_state.current_wishlist_id)
+        search_query = st.text_input("🔍 Suchen", placeholder="Name oder Shop, z.B. lego amazon", key="item_search")
+        status_filters = ["⭐ Highlights", "🎁 Noch offen", "✅ Verschenkt"]
+        price_filters = {"bis 25 €": (None, 2500), "25–50 €": (2500, 5000), "50–100 €": (5000, 10000), "über 100 €": (10000, None)}
+        shop_filters = {f"🛒 {shop}": shop for shop in list(item_index.shops())[:5]}
+        selected = st.pills(
+            "Filter", status_filters + list(price_filters) + list(shop_filters),
+            selection_mode="multi", key="item_filters", label_visibility="collapsed"
+        ) or []
+        
+        if search_query.strip() or selected:
+            open_only, gifted_only = "🎁 Noch offen" in selected, "✅ Verschenkt" in selected
+            bands = [price_filters[f] for f in selected if f in price_filters] or [(None, None)]
+            matches = set()
+            for min_cents, max_cents in bands:
+                matches |= item_index.search(
+                    search_query,
+                    highlight=True if "⭐ Highlights" in selected else None,
+                    gifted=None if open_only == gifted_only else gifted_only,
+                    shops=[shop_filters[f] for f in selected if f in shop_filters],
+                    min_cents=min_cents,
+                    max_cents=max_cents,
+                )
+            visible = [i for i, item in enumerate(wishlist_data['items']) if item.get('id') in matches]
+            st.caption(f"{len(visible)} von {total_items} Geschenken gefunden")
+        else:
+            visible = range(total_items)
+        
+        if not visible:
+            st.info("🔍 Keine passenden Geschenke.")
+            return
+        
+        # Pagination: only the visible slice is rendered, indices stay absolute
+        page_size_options = [10, 25, 50, 100, "Alle"]
+        col_size, col_page = st.columns(2)
+        with col_size:
+            page_size = st.selectbox("Geschenke pro Seite", page_size_options, index=1, key="page_size")
+        if page_size == "Alle":
+            page_size = len(visible)
+        page_count = max(1, -(-len(visible) // page_size))
+        with col_page:
+            page = st.number_input(
+                f"Seite (von {page_count})", min_value=1, max_value=page_count,
+                value=min(st.session_state.get("item_page", 1), page_count), step=1
+            )
+        st.session_state.item_page = page
+        page_start = (page - 1) * page_size
+        page_end = min(page_start + page_size, len(visible))
+        if page_count > 1:
+            st.caption(f"Zeige {page_start + 1}–{page_end} von {len(visible)}")
+        
         # Display items
         actions_to_process = []
         
-        for index, item in enumerate(wishlist_data['items']):
-            item_display = WishlistItem(
-                item['gift_name'],
-                item['purchase_link'],
-                item.get('is_gifted', False),
-                item.get('price', ''),
-                item.get('amazon_link', ''),
-                item.get('is_highlight', False)
-            )
+        for index in visible[page_start:page_end]:
+            item = wishlist_data['items'][index]
+            item_display = WishlistItem.from_dict(item)
             action = item_display.display(index, len(wishlist_data['items']))
             
             if action:
                 actions_to_process.append(action)
         
-        # Process actions
+        # Process actions (addressed by item ID, so concurrent inserts can't shift them)
         for action in actions_to_process:
             action_type = action.get('action')
             action_index = action.get('index')
+            action_id = action.get('item_id')
             
             if action_type == "delete":
-                wishlist_data['items'].pop(action_index)
-                save_wishlist(st.session_state.current_wishlist_id, wishlist_data)
-                st.rerun()
+                change_current_wishlist(delete_item, action_id)
+                rerun_fragment()
             
             elif action_type == "toggle_gift":
-                wishlist_data['items'][action_index]['is_gifted'] = True
-                save_wishlist(st.session_state.current_wishlist_id, wishlist_data)
-                st.rerun()
+                change_current_wishlist(gift_item, action_id)
+                rerun_fragment()
             
             elif action_type == "move_up" and action_index > 0:
                 # Tausche mit Item davor
-                wishlist_data['items'][action_index], wishlist_data['items'][action_index - 1] = \
-                    wishlist_data['items'][action_index - 1], wishlist_data['items'][action_index]
-                save_wishlist(st.session_state.current_wishlist_id, wishlist_data)
-                st.rerun()
+                change_current_wishlist(move_item, action_id, action_index - 1)
+                rerun_fragment()
             
             elif action_type == "move_down" and action_index < len(wishlist_data['items']) - 1:
                 # Tausche mit Item danach
-                wishlist_data['items'][action_index], wishlist_data['items'][action_index + 1] = \
-                    wishlist_data['items'][action_index + 1], wishlist_data['items'][action_index]
-                save_wishlist(st.session_state.current_wishlist_id, wishlist_data)
-                st.rerun()
+                change_current_wishlist(move_item, action_id, action_index + 1)
+                rerun_fragment()
             
             elif action_type == "edit":
-                # Setze edit mode in session state
-                st.session_state.editing_item_index = action_index
+                edit_item_dialog(action_id)
+    
+    item_form()
+    
+    with st.expander("📥 Import / Export", expanded=False):
+        st.caption("CSV (Spalten z.B. Name, Preis, Link, Amazon, Highlight) oder JSONL mit einem Geschenk pro Zeile. "
+                   "Geschenke mit gleichem Namen und Link werden übersprungen.")
+        upload = st.file_uploader("Datei importieren", type=["csv", "jsonl", "ndjson"], key="import_file")
+        if upload is not None and st.button("📥 Importieren", use_container_width=True):
+            fmt = "csv" if upload.name.lower().endswith(".csv") else "jsonl"
+            try:
+                report = import_items(st.session_state.current_wishlist_id,
+                                      io.TextIOWrapper(upload, encoding="utf-8-sig"), fmt)
+            except (ValueError, UnicodeDecodeError, WishlistConflictError) as e:
+                st.error(f"❌ Import fehlgeschlagen: {e}")
+            else:
+                st.session_state.import_report = report
                 st.rerun()
+        report = st.session_state.pop("import_report", None)
+        if report is not None:
+            st.success(f"✅ {report.added} Geschenke importiert, {report.duplicates} Duplikate übersprungen")
+            if report.errors:
+                st.warning("Nicht importiert:\n\n" + "\n".join(f"- {error}" for error in report.errors[:20]))
+        # Exports are built on request only (not on every rerun) and dropped once downloaded
+        exports = st.session_state.setdefault("exports", {})
+        for column, (fmt, mime) in zip(st.columns(2), [("csv", "text/csv"), ("jsonl", "application/x-ndjson")]):
+            key = (st.session_state.current_wishlist_id, fmt)
+            if key in exports:
+                column.download_button(f"⬇️ Als {fmt.upper()}", exports[key], file_name=f"wunschliste.{fmt}",
+                                       mime=mime, on_click=exports.pop, args=(key, None), use_container_width=True)
+            elif column.button(f"📦 {fmt.upper()}-Export erstellen", key=f"export_{fmt}", use_container_width=True):
+                exports[key] = "".join(export_items([key[0]], fmt))
+                st.rerun()
+    
+    st.markdown("---")
+    
+    # Display the wish list items
+    item_list()
 
 st.markdown("---")
-st.markdown("<p style='text-align: center; color: #666;'>🎄 Frohe Weihnachten! 🎅</p>", unsafe_allow_html=True)
\ No newline at end of file
+st.markdown("<p style='text-align: center; color: #666;'>🎄 Frohe Weihnachten! 🎅</p>", unsafe_allow_html=True)
+
+profiling.finish_run(st.session_state)
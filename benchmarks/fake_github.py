@@ -0,0 +1,260 @@
+"""In-process stand-in for the parts of the GitHub REST API that remote_storage uses.
+
+Covers the Contents API (GET/PUT/DELETE with blob SHAs and ETags), the Git Data API
+(refs, commits, trees, blobs) and tarball downloads of one branch, all kept in memory.
+Every request can be delayed to simulate the network:
+
+    server = FakeGitHub(latency=0.05)
+    server.start()
+    os.environ["GH_API_URL"] = server.url   # before utils.remote_storage is imported
+"""
+import io
+import re
+import json
+import time
+import base64
+import random
+import hashlib
+import tarfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_KEEP_TREES = 32
+
+
+def blob_sha(content: bytes) -> str:
+    return hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+
+
+class FakeGitHub:
+    """One repository with one branch; file contents live in `files` (path -> bytes)."""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, rate_limit: int = 5000):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.files = {}
+        self.requests = 0
+        self._commits = {}  # commit SHA -> (parent SHA, files)
+        self._trees = {}    # tree SHA -> files
+        self._blobs = {}    # blob SHA -> bytes
+        self._serial = 0
+        self._lock = threading.Lock()
+        self._head = self._new_commit(None, {})
+        self._server = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeGitHub":
+        self._server = _Server(("127.0.0.1", 0), _handler(self))
+        threading.Thread(target=self._server.serve_forever, name="fake-github", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def _new_sha(self) -> str:
+        # Unique is all that matters here; hashing every file on each commit would
+        # make the stand-in itself the bottleneck for large data sets
+        self._serial += 1
+        return hashlib.sha1(str(self._serial).encode()).hexdigest()
+
+    def _add_tree(self, files) -> str:
+        sha = self._new_sha()
+        self._trees[sha] = files
+        # Only recent trees are kept, so memory doesn't grow with every write
+        while len(self._trees) > _KEEP_TREES:
+            del self._trees[next(iter(self._trees))]
+        return sha
+
+    def _new_commit(self, parent, files) -> str:
+        tree = self._add_tree(files)
+        sha = self._new_sha()
+        self._commits[sha] = (parent, tree)
+        return sha
+
+    def _commit_files(self, files) -> dict:
+        """Move the branch to a new commit with these files (a fresh dict; caller holds the lock)."""
+        self.files = files
+        self._head = self._new_commit(self._head, files)
+        return {"sha": self._head, "tree": {"sha": self._commits[self._head][1]}}
+
+    def handle(self, method: str, path: str, query: str, headers, body: dict):
+        """Return (status, JSON payload or raw bytes, extra headers)."""
+        match = re.match(r"/repos/[^/]+/[^/]+/(.*)", path)
+        if match is None:
+            return 404, {"message": "Not Found"}, {}
+        route = match.group(1)
+        with self._lock:
+            if route.startswith("contents/"):
+                return self._contents(method, route[len("contents/"):], headers, body)
+            if route.startswith(("git/ref/heads/", "git/refs/heads/")):
+                return self._ref(method, body)
+            if route.startswith("git/commits"):
+                return self._commit(method, route, body)
+            if route.startswith("git/trees"):
+                return self._tree(method, route, body)
+            if route.startswith("git/blobs"):
+                return self._blob(method, route, body)
+            if route.startswith("tarball/"):
+                return self._tarball(route[len("tarball/"):])
+        return 404, {"message": "Not Found"}, {}
+
+    def _contents(self, method, path, headers, body):
+        current = self.files.get(path)
+        if method == "GET":
+            if current is None:
+                return 404, {"message": "Not Found"}, {}
+            sha = blob_sha(current)
+            etag = f'W/"{sha}"'
+            if headers.get("If-None-Match") == etag:
+                return 304, None, {"ETag": etag}
+            return 200, {"sha": sha, "path": path, "content": base64.b64encode(current).decode()}, {"ETag": etag}
+        if method == "PUT":
+            if current is not None and body.get("sha") != blob_sha(current):
+                return (409 if body.get("sha") else 422), {"message": "sha does not match"}, {}
+            content = base64.b64decode(body["content"])
+            files = dict(self.files)
+            files[path] = content
+            commit = self._commit_files(files)
+            sha = blob_sha(content)
+            return (200 if current is not None else 201), {"content": {"sha": sha, "path": path}, "commit": commit}, {"ETag": f'W/"{sha}"'}
+        if method == "DELETE":
+            if current is None:
+                return 404, {"message": "Not Found"}, {}
+            if body.get("sha") != blob_sha(current):
+                return 409, {"message": "sha does not match"}, {}
+            files = dict(self.files)
+            del files[path]
+            return 200, {"commit": self._commit_files(files)}, {}
+        return 405, {"message": "Method Not Allowed"}, {}
+
+    def _ref(self, method, body):
+        if method == "GET":
+            return 200, {"object": {"sha": self._head}}, {}
+        sha = body.get("sha")
+        if sha not in self._commits:
+            return 422, {"message": "Object does not exist"}, {}
+        parent, tree = self._commits[sha]
+        if parent != self._head:
+            return 422, {"message": "Update is not a fast forward"}, {}
+        if tree not in self._trees:
+            return 422, {"message": "Tree is gone"}, {}
+        self.files = dict(self._trees[tree])
+        self._head = sha
+        return 200, {"object": {"sha": sha}}, {}
+
+    def _commit(self, method, route, body):
+        if method == "GET":
+            sha = route.rsplit("/", 1)[-1]
+            if sha not in self._commits:
+                return 404, {"message": "Not Found"}, {}
+            return 200, {"sha": sha, "tree": {"sha": self._commits[sha][1]}}, {}
+        sha = self._new_sha()
+        self._commits[sha] = (body["parents"][0], body["tree"])
+        return 201, {"sha": sha, "tree": {"sha": body["tree"]}}, {}
+
+    def _tree(self, method, route, body):
+        if method == "GET":
+            files = self._trees.get(route.rsplit("/", 1)[-1])
+            if files is None:
+                return 404, {"message": "Not Found"}, {}
+            entries = [{"path": p, "type": "blob", "mode": "100644", "sha": blob_sha(c), "size": len(c)} for p, c in files.items()]
+            return 200, {"sha": route.rsplit("/", 1)[-1], "tree": entries, "truncated": False}, {}
+        base_tree = body.get("base_tree")
+        if base_tree is not None and base_tree not in self._trees:
+            # Like GitHub, refuse a base tree it does not have (unknown, or evicted by _add_tree)
+            return 422, {"message": "Invalid tree info"}, {}
+        files = dict(self._trees.get(base_tree, {}))
+        for entry in body["tree"]:
+            if "content" in entry:
+                files[entry["path"]] = entry["content"].encode("utf-8")
+            elif entry.get("sha") is None:
+                files.pop(entry["path"], None)
+            else:
+                files[entry["path"]] = self._blobs[entry["sha"]]
+        return 201, {"sha": self._add_tree(files)}, {}
+
+    def _blob(self, method, route, body):
+        if method == "GET":
+            sha = route.rsplit("/", 1)[-1]
+            for content in self.files.values():
+                if blob_sha(content) == sha:
+                    return 200, {"sha": sha, "encoding": "base64", "content": base64.b64encode(content).decode()}, {}
+            return 404, {"message": "Not Found"}, {}
+        content = base64.b64decode(body["content"]) if body.get("encoding") == "base64" else body["content"].encode("utf-8")
+        self._blobs[blob_sha(content)] = content
+        return 201, {"sha": blob_sha(content)}, {}
+
+    def _tarball(self, ref):
+        tree = self._commits[ref][1] if ref in self._commits else None
+        files = self._trees.get(tree, self.files)
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+            for path, content in files.items():
+                info = tarfile.TarInfo(f"owner-repo-{ref[:7]}/{path}")
+                info.size = len(content)
+                archive.addfile(info, io.BytesIO(content))
+        return 200, buffer.getvalue(), {"Content-Type": "application/x-gzip"}
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # Bursts of parallel requests must not overflow the listen backlog
+    request_queue_size = 128
+
+
+def _handler(fake: FakeGitHub):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body go out as separate writes; with Nagle on, the body waits for
+        # the client's delayed ACK (~40 ms) on every keep-alive request
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def _serve(self, method):
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b""
+            delay = fake.latency + (random.uniform(0, fake.jitter) if fake.jitter else 0)
+            if delay:
+                time.sleep(delay)
+            with fake._lock:
+                fake.requests += 1
+                remaining = max(0, fake.rate_limit - fake.requests)
+            path, _, query = self.path.partition("?")
+            status, payload, headers = fake.handle(method, path, query, self.headers, json.loads(raw) if raw else {})
+            body = payload if isinstance(payload, bytes) else (json.dumps(payload).encode() if payload is not None else b"")
+            self.send_response(status)
+            self.send_header("Content-Type", headers.pop("Content-Type", "application/json"))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("X-RateLimit-Limit", str(fake.rate_limit))
+            self.send_header("X-RateLimit-Remaining", str(remaining))
+            self.send_header("X-RateLimit-Reset", str(int(time.time()) + 3600))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            self._serve("GET")
+
+        def do_PUT(self):
+            self._serve("PUT")
+
+        def do_POST(self):
+            self._serve("POST")
+
+        def do_PATCH(self):
+            self._serve("PATCH")
+
+        def do_DELETE(self):
+            self._serve("DELETE")
+
+    return Handler
@@ -0,0 +1,298 @@
+"""Load test: many simulated sessions using app.py on one wishlist at the same time.
+
+    python -m benchmarks.load_sessions --sessions 20 --rounds 3 --backend sqlite --output load.json
+
+Every session runs the real script through streamlit.testing.v1.AppTest in its own thread:
+it opens the list, logs in, then per round gifts a contested item (all sessions click at the
+same moment), moves its own item and renames it in the edit dialog. Afterwards the stored
+list is checked against what the sessions were told:
+
+- double wins: an item that more than one session gifted successfully
+- lost updates: a successful gift or edit that is not in the stored list, or items that
+  disappeared or were duplicated
+
+Rerun latency is measured per step (as AppTest sees it, i.e. the whole script run), storage
+calls per session come from the session's metrics (utils.metrics). The exit code is 1 if a
+double win or lost update was found.
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+import tempfile
+import threading
+from collections import Counter, defaultdict
+
+from .fake_github import FakeGitHub
+from .storage_bench import git_commit, local_backends, summarize
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+PASSWORD = "lasttest"
+STEPS = ["open", "open_list", "login", "show_all", "gift", "reorder", "edit_open", "edit_save"]
+
+
+def _item(name: str):
+    return {"gift_name": name, "purchase_link": "", "is_gifted": False, "price": "", "amazon_link": "", "is_highlight": False}
+
+
+def _allow_parallel_apptests():
+    """Patch the two spots where AppTest assumes it is the only test running.
+
+    AppTest installs a mock Runtime for each run and removes it afterwards, so with runs in
+    parallel threads one session's cleanup would pull it away from the scripts of the others;
+    falling back on the most recent mock keeps them running. Every run also compiles app.py
+    afresh, and CPython 3.11 can fail compiling in several threads at once, so compiles are
+    serialized.
+    """
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+
+    recent = []
+
+    def instance(cls):
+        if cls._instance is not None:
+            recent[:] = [cls._instance]
+            return cls._instance
+        if recent:
+            return recent[0]
+        raise RuntimeError("Runtime hasn't been created!")
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(lambda cls: cls._instance is not None or bool(recent))
+
+    get_bytecode = ScriptCache.get_bytecode
+    compile_lock = threading.Lock()
+
+    def locked_get_bytecode(self, script_path):
+        with compile_lock:
+            return get_bytecode(self, script_path)
+
+    ScriptCache.get_bytecode = locked_get_bytecode
+
+
+class Session:
+    """One simulated user; `run` drives AppTest and records latencies and outcomes."""
+
+    def __init__(self, number: int, wishlist_id: str, own_item: str, contested, barrier, timeout: float):
+        self.number = number
+        self.wishlist_id = wishlist_id
+        self.own_item = own_item
+        self.own_name = f"Session {number}"
+        self.contested = contested  # per round: item IDs
+        self.barrier = barrier
+        self.timeout = timeout
+        self.latency = defaultdict(list)
+        self.gifts = []           # (round, item ID, "won" | "conflict" | "gone")
+        self.edits = []           # (round, new name, saved)
+        self.moves = Counter()    # "saved" | "conflict" | "gone"
+        self.app_errors = []
+        self.failure = None
+        self.at = None
+
+    def _run(self, step: str, element=None):
+        started = time.perf_counter()
+        (element or self.at).run(timeout=self.timeout)
+        self.latency[step].append(time.perf_counter() - started)
+        self.app_errors += [str(e.value) for e in self.at.exception]
+
+    def _button(self, key: str):
+        return next((b for b in self.at.button if b.key == key), None)
+
+    def _calls(self, name: str):
+        collector = self.at.session_state["_session_metrics"]
+        return collector.calls[f"data_handler.{name}"], collector.errors[f"data_handler.{name}"]
+
+    def _outcome(self, name: str, before) -> str:
+        calls, errors = self._calls(name)
+        if calls == before[0]:
+            return "gone"  # the button was no longer shown when the click was processed
+        return "conflict" if errors > before[1] else "saved"
+
+    def _click(self, step: str, key: str, call: str) -> str:
+        button = self._button(key)
+        if button is None:
+            return "gone"
+        before = self._calls(call)
+        self._run(step, button.click())
+        return self._outcome(call, before)
+
+    def run(self):
+        from streamlit.testing.v1 import AppTest
+
+        try:
+            self.at = AppTest.from_file(APP, default_timeout=self.timeout)
+            self._run("open")
+            self._run("open_list", self.at.button(key=f"open_{self.wishlist_id}").click())
+            self.at.text_input(key="wishlist_password").input(PASSWORD)
+            self._run("login", next(b for b in self.at.button if b.label == "Anmelden").click())
+            self._run("show_all", self.at.selectbox(key="page_size").set_value("Alle"))
+            for round_number, items in enumerate(self.contested):
+                self.barrier.wait()
+                target = items[self.number % len(items)]
+                outcome = self._click("gift", f"gift_{target}", "gift_item")
+                self.gifts.append((round_number, target, "won" if outcome == "saved" else outcome))
+                move = "down" if self._button(f"down_{self.own_item}") is not None else "up"
+                self.moves[self._click("reorder", f"{move}_{self.own_item}", "move_item")] += 1
+                self._edit(round_number)
+        except Exception as e:
+            self.failure = f"{type(e).__name__}: {e}"
+            self.barrier.abort()  # don't leave the other sessions waiting for this one
+
+    def _edit(self, round_number: int):
+        button = self._button(f"edit_{self.own_item}")
+        if button is None:
+            self.edits.append((round_number, None, False))
+            return
+        self._run("edit_open", button.click())
+        name_input = next(t for t in self.at.text_input if t.label == "🎁 Geschenk Name" and t.value == self.own_name)
+        new_name = f"Session {self.number} · Runde {round_number + 1}"
+        name_input.set_value(new_name)
+        before = self._calls("update_item")
+        # A browser reruns just the open dialog; AppTest reruns the whole script, which only
+        # shows the dialog again if the edit click is replayed along with the submit
+        self._button(f"edit_{self.own_item}").click()
+        self._run("edit_save", next(b for b in self.at.button if b.label == "💾 Speichern").click())
+        saved = self._outcome("update_item", before) == "saved"
+        if saved:
+            self.own_name = new_name
+        self.edits.append((round_number, new_name, saved))
+
+    def storage_calls(self):
+        """Storage calls of the whole session by layer (data_handler, remote_storage, http)."""
+        totals = Counter()
+        collector = self.at.session_state["_session_metrics"] if self.at is not None else None
+        if collector is not None:
+            for name, count in collector.calls.items():
+                totals[name.split(".", 1)[0]] += count
+        return dict(totals)
+
+
+def check(sessions, initial_ids, wishlist):
+    """Compare the stored list with what the sessions were told; returns a dict of findings."""
+    stored = {item["id"]: item for item in wishlist["items"]}
+    winners = defaultdict(list)
+    for session in sessions:
+        for round_number, item_id, outcome in session.gifts:
+            if outcome == "won":
+                winners[item_id].append(session.number)
+    contested = {item_id for session in sessions for items in session.contested for item_id in items}
+    ids = [item["id"] for item in wishlist["items"]]
+    return {
+        "double_wins": {item_id: numbers for item_id, numbers in winners.items() if len(numbers) > 1},
+        "lost_gifts": sorted(item_id for item_id in winners if not stored.get(item_id, {}).get("is_gifted")),
+        "gifts_without_winner": sorted(item_id for item_id in contested
+                                       if stored.get(item_id, {}).get("is_gifted") and item_id not in winners),
+        "lost_edits": [
+            {"session": s.number, "expected": s.own_name, "stored": stored.get(s.own_item, {}).get("gift_name")}
+            # own_name only changes once a save was confirmed, so failed sessions count too
+            for s in sessions if stored.get(s.own_item, {}).get("gift_name") != s.own_name
+        ],
+        "missing_items": sorted(set(initial_ids) - set(ids)),
+        "duplicated_items": sorted(item_id for item_id, count in Counter(ids).items() if count > 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=10, help="simulated sessions running at the same time")
+    parser.add_argument("--rounds", type=int, default=2, help="gift / reorder / edit rounds per session")
+    parser.add_argument("--contested", type=int, default=1, help="items all sessions try to gift per round")
+    parser.add_argument("--items", type=int, default=20, help="further items on the list")
+    parser.add_argument("--backend", default="json", choices=["json", "sqlite", "github"])
+    parser.add_argument("--latency", type=float, default=20.0, help="fake GitHub latency per request in ms")
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds a single script run may take")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    # AppTest runs log deprecation warnings for every widget
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    _allow_parallel_apptests()
+    fake = FakeGitHub(latency=args.latency / 1000).start()
+    factories = local_backends(fake, tempfile.mkdtemp(prefix="wishlist-load-"))
+    from utils import data_handler as dh
+    from utils.storage import set_backend
+
+    set_backend(factories[args.backend]())
+    wishlist_id = dh.create_wishlist("Lasttest", PASSWORD)
+    wishlist = dh.load_wishlist(wishlist_id)
+    wishlist["items"] = (
+        [_item(f"Streitfall {r + 1}.{c + 1}") for r in range(args.rounds) for c in range(args.contested)]
+        + [_item(f"Session {n}") for n in range(args.sessions)]
+        + [_item(f"Geschenk {n}") for n in range(args.items)]
+    )
+    dh.save_wishlist(wishlist_id, wishlist)
+    initial_ids = [item["id"] for item in dh.load_wishlist(wishlist_id)["items"]]
+    contested = [initial_ids[r * args.contested:(r + 1) * args.contested] for r in range(args.rounds)]
+    own_items = initial_ids[args.rounds * args.contested:][:args.sessions]
+
+    barrier = threading.Barrier(args.sessions)
+    sessions = [Session(n, wishlist_id, own_items[n], contested, barrier, args.timeout) for n in range(args.sessions)]
+    threads = [threading.Thread(target=s.run, name=f"session-{s.number}") for s in sessions]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    dh.invalidate_wishlist(wishlist_id)
+    findings = check(sessions, initial_ids, dh.load_wishlist(wishlist_id))
+    fake.stop()
+
+    latency = {}
+    for step in STEPS:
+        samples = [value for s in sessions for value in s.latency[step]]
+        if samples:
+            latency[step] = summarize(samples, sum(samples))
+    calls = [s.storage_calls() for s in sessions]
+    gifts = Counter(outcome for s in sessions for _, _, outcome in s.gifts)
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": {k: v for k, v in vars(args).items() if k != "output"},
+            "wall_s": round(wall, 2),
+        },
+        "rerun_latency": latency,
+        "storage_calls": [{"session": s.number, **c} for s, c in zip(sessions, calls)],
+        "outcomes": {
+            "gifts": dict(gifts),
+            "moves": dict(sum((s.moves for s in sessions), Counter())),
+            "edits_saved": sum(saved for s in sessions for _, _, saved in s.edits),
+            "edits_rejected": sum(not saved for s in sessions for _, _, saved in s.edits),
+        },
+        "failures": {s.number: s.failure for s in sessions if s.failure},
+        "app_errors": sorted({error for s in sessions for error in s.app_errors}),
+        "findings": findings,
+    }
+
+    print(f"{args.sessions} sessions x {args.rounds} rounds on {args.backend} in {wall:.1f}s")
+    print(f"{'step':10} {'runs':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for step, r in latency.items():
+        print(f"{step:10} {r['count']:>5} {r['p50_ms']:>9} {r['p95_ms']:>9} {r['p99_ms']:>9} {r['max_ms']:>9}")
+    for layer in sorted({layer for c in calls for layer in c}):
+        counts = [c.get(layer, 0) for c in calls]
+        print(f"{layer} calls per session: mean {sum(counts) / len(counts):.1f}, max {max(counts)}")
+    print("outcomes:", json.dumps(report["outcomes"]))
+    for number, failure in report["failures"].items():
+        print(f"session {number} failed: {failure}")
+    for error in report["app_errors"]:
+        print(f"app error: {error}")
+    problems = {name: value for name, value in findings.items() if value}
+    print("findings:", json.dumps(problems, ensure_ascii=False) if problems else "none")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+    if report["failures"] or report["app_errors"]:
+        return 1
+    # A gift stored without a winner is a click whose answer got lost, not a wrong save
+    return 1 if any(value for name, value in findings.items() if name != "gifts_without_winner") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
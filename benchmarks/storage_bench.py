@@ -0,0 +1,219 @@
+"""Storage benchmark: data layer operations against the JSON, SQLite and (fake) GitHub backends.
+
+    python -m benchmarks.storage_bench --lists 100 --items 50 --latency 20 --output bench.json
+    python -m benchmarks.storage_bench --compare bench.json   # run again and show the change
+
+Synthetic wishlists are created through utils.data_handler, then every list is loaded
+(cold, i.e. from storage, and from the shared cache), saved with one changed item, has an
+item gifted, and is deleted. GitHub runs against benchmarks.fake_github with the given
+per-request latency. Results (throughput and p50/p95/p99 latency per operation) are
+printed and, with --output, written as JSON together with the commit they were measured on.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+import subprocess
+
+from .fake_github import FakeGitHub
+
+OPERATIONS = ["create_wishlist", "populate", "load_cold", "load_cached", "save_wishlist", "gift_item",
+              "load_many", "delete_wishlist"]
+
+_WORDS = ["Lego", "Buch", "Puzzle", "Schal", "Kopfhörer", "Tasse", "Socken", "Spiel", "Kamera", "Rucksack",
+          "Uhr", "Pflanze", "Kerze", "Roller", "Teddy", "Gutschein", "Tee", "Kalender", "Poster", "Lampe"]
+_SHOPS = ["amazon.de", "thalia.de", "otto.de", "mediamarkt.de", "etsy.com", "ikea.com"]
+
+
+def synthetic_items(count: int, rng: random.Random):
+    """Items shaped like real ones: a name, a free-text price, links and flags."""
+    items = []
+    for n in range(count):
+        shop = rng.choice(_SHOPS)
+        items.append({
+            "gift_name": f"{rng.choice(_WORDS)} {rng.choice(_WORDS)} {n}",
+            "purchase_link": f"https://www.{shop}/p/{rng.randrange(10**8)}" if rng.random() < 0.7 else "",
+            "is_gifted": rng.random() < 0.3,
+            "price": f"{rng.randrange(3, 400)},{rng.randrange(100):02d} €" if rng.random() < 0.8 else "",
+            "amazon_link": f"https://amazon.de/dp/B0{rng.randrange(10**8):08d}" if rng.random() < 0.3 else "",
+            "is_highlight": rng.random() < 0.1,
+        })
+    return items
+
+
+def percentile(sorted_values, q: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, min(len(sorted_values), round(q / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[rank - 1]
+
+
+def summarize(samples, wall: float):
+    """Throughput and latency figures (ms) for one operation's per-call durations (s)."""
+    values = sorted(samples)
+    return {
+        "count": len(values),
+        "ops_per_s": round(len(values) / wall, 2) if wall else None,
+        "mean_ms": round(1000 * sum(values) / len(values), 3) if values else None,
+        "p50_ms": round(1000 * percentile(values, 50), 3),
+        "p95_ms": round(1000 * percentile(values, 95), 3),
+        "p99_ms": round(1000 * percentile(values, 99), 3),
+        "max_ms": round(1000 * values[-1], 3) if values else None,
+    }
+
+
+class Timer:
+    """Collects per-call durations and the wall time of one operation."""
+
+    def __init__(self):
+        self.samples = []
+        self.wall = 0.0
+
+    def run(self, function, *args):
+        started = time.perf_counter()
+        result = function(*args)
+        elapsed = time.perf_counter() - started
+        self.samples.append(elapsed)
+        self.wall += elapsed
+        return result
+
+
+def run_backend(backend, lists: int, items: int, seed: int, batch: int):
+    """Run every operation on one backend; returns {operation: summary}."""
+    from utils import data_handler as dh
+    from utils.storage import set_backend
+
+    set_backend(backend)
+    rng = random.Random(seed)
+    timers = {op: Timer() for op in OPERATIONS}
+    ids = []
+    for n in range(lists):
+        ids.append(timers["create_wishlist"].run(dh.create_wishlist, f"Liste {n}", "benchmark"))
+    for wishlist_id in ids:
+        doc = dh.load_wishlist(wishlist_id)
+        doc["items"] = synthetic_items(items, rng)
+        timers["populate"].run(dh.save_wishlist, wishlist_id, doc)
+    for wishlist_id in ids:
+        dh.invalidate_wishlist(wishlist_id)
+        timers["load_cold"].run(dh.load_wishlist, wishlist_id)
+        timers["load_cached"].run(dh.load_wishlist, wishlist_id)
+    for wishlist_id in ids:
+        doc = dh.load_wishlist(wishlist_id)
+        if doc["items"]:
+            doc["items"][rng.randrange(len(doc["items"]))]["price"] = f"{rng.randrange(3, 400)} €"
+        timers["save_wishlist"].run(dh.save_wishlist, wishlist_id, doc)
+    for wishlist_id in ids:
+        doc = dh.load_wishlist(wishlist_id)
+        open_items = [item["id"] for item in doc["items"] if not item.get("is_gifted")]
+        if open_items:
+            timers["gift_item"].run(dh.gift_item, wishlist_id, rng.choice(open_items))
+    for start in range(0, len(ids), batch):
+        chunk = ids[start:start + batch]
+        for wishlist_id in chunk:
+            dh.invalidate_wishlist(wishlist_id)
+        timers["load_many"].run(dh.load_many, chunk)
+    for wishlist_id in ids:
+        timers["delete_wishlist"].run(dh.delete_wishlist, wishlist_id)
+    return {op: summarize(timer.samples, timer.wall) for op, timer in timers.items() if timer.samples}
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(previous, current):
+    """Lines with the relative change of p50/p95 and throughput per backend and operation."""
+    lines = []
+    for backend, ops in current["results"].items():
+        for op, now in ops.items():
+            before = previous.get("results", {}).get(backend, {}).get(op)
+            if not before:
+                continue
+            changes = []
+            for key in ("p50_ms", "p95_ms", "ops_per_s"):
+                if before.get(key) and now.get(key) is not None:
+                    changes.append(f"{key} {100 * (now[key] - before[key]) / before[key]:+.1f}%")
+            lines.append(f"{backend:8} {op:16} " + "  ".join(changes))
+    return lines
+
+
+def local_backends(fake: FakeGitHub, workdir: str):
+    """Backend factories by name, with GitHub pointed at the fake server.
+
+    Settings are read when the utils modules are imported, so this must run before that.
+    """
+    os.environ.update({
+        "GH_API_URL": fake.url, "GH_TOKEN": "benchmark", "GH_REPO": "bench/wishlists", "GH_PATH": "cloud-data",
+        "WISHLIST_WRITE_BEHIND": "0", "GH_REPLICA": "0",
+    })
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from utils.storage import JsonFileBackend, SqliteBackend, GitHubBackend
+
+    return {
+        "json": lambda: JsonFileBackend(os.path.join(workdir, "json")),
+        "sqlite": lambda: SqliteBackend(os.path.join(workdir, "wishlists.db")),
+        "github": GitHubBackend,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", default="json,sqlite,github", help="comma-separated: json, sqlite, github")
+    parser.add_argument("--lists", type=int, default=50, help="number of wishlists (e.g. 1 to 10000)")
+    parser.add_argument("--items", type=int, default=50, help="items per wishlist (e.g. 10 to 100000)")
+    parser.add_argument("--latency", type=float, default=20.0, help="fake GitHub latency per request in ms")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random fake GitHub latency, up to ms")
+    parser.add_argument("--batch", type=int, default=20, help="lists per load_many call")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--compare", help="a previous JSON result to compare against")
+    args = parser.parse_args(argv)
+
+    fake = FakeGitHub(latency=args.latency / 1000, jitter=args.jitter / 1000).start()
+    factories = local_backends(fake, tempfile.mkdtemp(prefix="wishlist-bench-"))
+    results = {}
+    for name in [b.strip() for b in args.backends.split(",") if b.strip()]:
+        if name not in factories:
+            parser.error(f"unknown backend: {name}")
+        started = time.perf_counter()
+        results[name] = run_backend(factories[name](), args.lists, args.items, args.seed, args.batch)
+        print(f"{name}: {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    fake.stop()
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+            "github_requests": fake.requests,
+        },
+        "results": results,
+    }
+    header = f"{'backend':8} {'operation':16} {'count':>6} {'ops/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    print(header)
+    for backend, ops in results.items():
+        for op, r in ops.items():
+            print(f"{backend:8} {op:16} {r['count']:>6} {r['ops_per_s']:>9} {r['p50_ms']:>9} {r['p95_ms']:>9} {r['p99_ms']:>9}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            previous = json.load(file)
+        print(f"\nChange against {previous['meta'].get('commit')} ({args.compare}):")
+        print("\n".join(compare(previous, report)))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
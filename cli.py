@@ -0,0 +1,160 @@
+"""Command line access to the wishlists, for cron jobs and scripts (no Streamlit involved).
+
+    python cli.py list
+    python cli.py show <wishlist-id>
+    python cli.py add <wishlist-id> "Lego Eiffelturm" --price "629,99 €" --link https://...
+    python cli.py gift <wishlist-id> <item-id>
+    python cli.py export [<wishlist-id> ...] --format jsonl -o backup.jsonl
+    python cli.py import <wishlist-id> geschenke.csv
+
+Storage and settings are the app's (WISHLIST_BACKEND, GH_TOKEN, ... from the environment).
+The CLI works on the storage directly, so list passwords are not asked for.
+Modules are imported per command, which keeps `--help` and simple commands fast.
+"""
+import sys
+import argparse
+
+
+def _print_json(value) -> None:
+    import json
+    print(json.dumps(value, ensure_ascii=False, indent=2))
+
+
+def _load(wishlist_id: str):
+    from utils.data_handler import load_wishlist
+    wishlist = load_wishlist(wishlist_id)
+    if wishlist is None:
+        raise SystemExit(f"Wunschliste {wishlist_id} nicht gefunden")
+    return wishlist
+
+
+def cmd_list(args) -> None:
+    from utils.data_handler import get_all_wishlists
+    wishlists = get_all_wishlists()
+    if args.json:
+        _print_json(wishlists)
+        return
+    for wishlist in wishlists:
+        counts = ""
+        if "item_count" in wishlist:
+            counts = f"  {wishlist.get('gifted_count', 0)}/{wishlist['item_count']} verschenkt"
+        print(f"{wishlist['id']}  {wishlist.get('name')}{counts}")
+
+
+def cmd_show(args) -> None:
+    from utils.data_handler import VERSION_KEY
+    wishlist = _load(args.wishlist_id)
+    wishlist.pop("password_hash", None)
+    wishlist.pop(VERSION_KEY, None)
+    if args.json:
+        _print_json(wishlist)
+        return
+    print(wishlist.get("name"))
+    for item in wishlist.get("items", []):
+        mark = "x" if item.get("is_gifted") else " "
+        star = " *" if item.get("is_highlight") else ""
+        details = "  ".join(value for value in (item.get("price"), item.get("purchase_link")) if value)
+        print(f"[{mark}] {item.get('id')}  {item['gift_name']}{star}  {details}".rstrip())
+
+
+def cmd_add(args) -> None:
+    from utils.data_handler import add_item
+    _load(args.wishlist_id)
+    item_id = add_item(args.wishlist_id, {
+        "gift_name": args.name,
+        "purchase_link": args.link,
+        "is_gifted": False,
+        "price": args.price,
+        "amazon_link": args.amazon,
+        "is_highlight": args.highlight,
+    })
+    print(item_id)
+
+
+def cmd_gift(args) -> None:
+    from utils.data_handler import gift_item
+    from utils.merge import WishlistConflictError
+    try:
+        gift_item(args.wishlist_id, args.item_id)
+    except WishlistConflictError as e:
+        raise SystemExit(f"Nicht gespeichert: {e}")
+
+
+def cmd_export(args) -> None:
+    from utils.import_export import export_items
+    out = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+    try:
+        out.writelines(export_items(args.wishlist_ids or None, args.format))
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+def cmd_import(args) -> None:
+    from utils.import_export import import_items
+    fmt = args.format or ("csv" if args.file.lower().endswith(".csv") else "jsonl")
+    try:
+        if args.file == "-":
+            report = import_items(args.wishlist_id, sys.stdin, fmt)
+        else:
+            with open(args.file, encoding="utf-8-sig", newline="") as file:
+                report = import_items(args.wishlist_id, file, fmt)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    print(f"{report.added} hinzugefügt, {report.duplicates} doppelt übersprungen")
+    for error in report.errors:
+        print(error, file=sys.stderr)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="cli.py", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("list", help="all wishlists")
+    command.add_argument("--json", action="store_true")
+    command.set_defaults(run=cmd_list)
+
+    command = commands.add_parser("show", help="the items of a wishlist")
+    command.add_argument("wishlist_id")
+    command.add_argument("--json", action="store_true")
+    command.set_defaults(run=cmd_show)
+
+    command = commands.add_parser("add", help="add an item; prints its ID")
+    command.add_argument("wishlist_id")
+    command.add_argument("name")
+    command.add_argument("--price", default="")
+    command.add_argument("--link", default="")
+    command.add_argument("--amazon", default="")
+    command.add_argument("--highlight", action="store_true")
+    command.set_defaults(run=cmd_add)
+
+    command = commands.add_parser("gift", help="mark an item as gifted (fails if it already is)")
+    command.add_argument("wishlist_id")
+    command.add_argument("item_id")
+    command.set_defaults(run=cmd_gift)
+
+    command = commands.add_parser("export", help="export items as CSV or JSONL (default: all lists)")
+    command.add_argument("wishlist_ids", nargs="*")
+    command.add_argument("--format", choices=["csv", "jsonl"], default="csv")
+    command.add_argument("-o", "--output", help="file to write (default: stdout)")
+    command.set_defaults(run=cmd_export)
+
+    command = commands.add_parser("import", help="append the items of a CSV or JSONL file")
+    command.add_argument("wishlist_id")
+    command.add_argument("file", help="file to read, or - for stdin")
+    command.add_argument("--format", choices=["csv", "jsonl"], help="default: from the file extension")
+    command.set_defaults(run=cmd_import)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    args.run(args)
+    if args.command in ("add", "gift", "import"):
+        from utils.data_handler import flush_pending_saves
+        flush_pending_saves()  # with WISHLIST_WRITE_BEHIND=1 the process is about to exit
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,42 @@
 import streamlit as st
 import html
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from utils.models import Item
 
-class WishlistItem:
-    def __init__(self, gift_name, purchase_link, is_gifted=False, price="", amazon_link="", is_highlight=False):
-        self.gift_name = gift_name
-        self.purchase_link = purchase_link
-        self.is_gifted = is_gifted
-        self.price = price
-        self.amazon_link = amazon_link
-        self.is_highlight = is_highlight
+# Rendered card HTML by the fields it shows (see card_key), shared by all sessions
+_CARD_CACHE_MAX = 2048
+_card_cache = OrderedDict()
+_card_lock = threading.Lock()
 
-    def display(self, index, total_items):
-        """Display wishlist item as a modern widget"""
+@dataclass(slots=True)
+class WishlistItem(Item):
+    """An Item that can render itself (build with WishlistItem.from_dict)"""
+
+    def card_key(self):
+        # The shown fields themselves: hashing the tuple reuses the strings' cached hashes,
+        # where a digest of the content cost about as much as building the card
+        return (self.id, self.gift_name, self.purchase_link, self.is_gifted, self.price, self.amazon_link, self.is_highlight)
+
+    def card_html(self):
+        """The card's HTML; unchanged items reuse the cached string"""
+        if self.id is None:
+            return self._build_card_html()
+        key = self.card_key()
+        with _card_lock:
+            cached = _card_cache.get(key)
+            if cached is not None:
+                _card_cache.move_to_end(key)
+                return cached
+        html_content = self._build_card_html()
+        with _card_lock:
+            _card_cache[key] = html_content
+            while len(_card_cache) > _CARD_CACHE_MAX:
+                _card_cache.popitem(last=False)
+        return html_content
+
+    def _build_card_html(self):
         # Hintergrundfarbe: gelb für Highlights, grau für verschenkt, weiß sonst
         if self.is_gifted:
             bg_color = "#f0f0f0"
@@ -60,8 +85,15 @@ class WishlistItem:
     {links_html}
 </div>
 """
+        return html_content
+
+    def display(self, index, total_items):
+        """Display wishlist item as a modern widget"""
+        st.markdown(self.card_html(), unsafe_allow_html=True)
         
-        st.markdown(html_content, unsafe_allow_html=True)
+        # Widget keys and actions follow the item, not its position
+        key = self.id if self.id is not None else index
+        action = {"index": index, "item_id": self.id}
         
         # Buttons außerhalb des HTML-Containers (in einer Linie nebeneinander)
         if not self.is_gifted:
@@ -69,43 +101,33 @@ class WishlistItem:
             
             # 🎅 Schenken
             with btn_cols[0]:
-                if st.button("Ich möchte das schenken", key=f"gift_{index}", use_container_width=True):
-                    return {"action": "toggle_gift", "index": index}
+                if st.button("Ich möchte das schenken", key=f"gift_{key}", use_container_width=True):
+                    return {**action, "action": "toggle_gift"}
             
             # ⬆️ Nach oben
             with btn_cols[1]:
                 if index > 0:
-                    if st.button("⬆️", key=f"up_{index}", help="Nach oben", use_container_width=True):
-                        return {"action": "move_up", "index": index}
+                    if st.button("⬆️", key=f"up_{key}", help="Nach oben", use_container_width=True):
+                        return {**action, "action": "move_up"}
                 else:
-                    st.button("⬆️", key=f"up_disabled_{index}", disabled=True, use_container_width=True)
+                    st.button("⬆️", key=f"up_disabled_{key}", disabled=True, use_container_width=True)
             
             # ⬇️ Nach unten
             with btn_cols[2]:
                 if index < total_items - 1:
-                    if st.button("⬇️", key=f"down_{index}", help="Nach unten", use_container_width=True):
-                        return {"action": "move_down", "index": index}
+                    if st.button("⬇️", key=f"down_{key}", help="Nach unten", use_container_width=True):
+                        return {**action, "action": "move_down"}
                 else:
-                    st.button("⬇️", key=f"down_disabled_{index}", disabled=True, use_container_width=True)
+                    st.button("⬇️", key=f"down_disabled_{key}", disabled=True, use_container_width=True)
             
             # ✏️ Bearbeiten
             with btn_cols[3]:
-                if st.button("Bearbeiten", key=f"edit_{index}", help="Bearbeiten", use_container_width=True):
-                    return {"action": "edit", "index": index}
+                if st.button("Bearbeiten", key=f"edit_{key}", help="Bearbeiten", use_container_width=True):
+                    return {**action, "action": "edit"}
             
             # 🗑️ Löschen
             with btn_cols[4]:
-                if st.button("Löschen", key=f"delete_{index}", help="Löschen", use_container_width=True):
-                    return {"action": "delete", "index": index}
+                if st.button("Löschen", key=f"delete_{key}", help="Löschen", use_container_width=True):
+                    return {**action, "action": "delete"}
         
         return None
-
-    def to_dict(self):
-        return {
-            "gift_name": self.gift_name,
-            "purchase_link": self.purchase_link,
-            "is_gifted": self.is_gifted,
-            "price": self.price,
-            "amazon_link": self.amazon_link,
-            "is_highlight": self.is_highlight
-        }
\ No newline at end of file
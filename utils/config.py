@@ -0,0 +1,82 @@
+import os
+
+# Secrets of the hosting app (e.g. st.secrets), flattened on first use; the data layer
+# itself never imports Streamlit, so scripts and the CLI read only the environment
+_provider = None
+_secrets = None
+_github = None
+
+
+def set_secrets_provider(provider) -> None:
+    """Read settings from this mapping (e.g. st.secrets, top-level keys before [general]) before the environment.
+
+    Modules read their settings when they are imported, so the app calls this first.
+    """
+    global _provider, _secrets, _github
+    if provider is _provider:
+        return  # the app sets it again on every rerun
+    _provider = provider
+    _secrets = None
+    _github = None
+
+
+def _load_secrets():
+    if _provider is None:
+        return {}
+    try:
+        # Note: st.secrets returns AttrDict, not plain dict, so use hasattr/getattr
+        values = dict(_provider.items())
+    except Exception:
+        return {}  # e.g. no secrets.toml
+    general = values.get("general")
+    flat = {}
+    if general is not None and hasattr(general, "items"):
+        flat.update((name, value) for name, value in general.items() if value)
+    flat.update((name, value) for name, value in values.items() if value and name != "general")
+    return flat
+
+
+def get_setting(name: str, default=None):
+    """Look up a setting. Prefer the app's secrets (top-level, then [general]), fallback to environment variables."""
+    global _secrets
+    if _secrets is None:
+        _secrets = _load_secrets()
+    value = _secrets.get(name)
+    if value:
+        return value
+    return os.environ.get(name, default)
+
+
+def get_int_setting(name: str, default: int) -> int:
+    try:
+        return int(get_setting(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def get_float_setting(name: str, default: float) -> float:
+    try:
+        return float(get_setting(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def get_bool_setting(name: str, default: bool = False) -> bool:
+    value = get_setting(name)
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "yes", "on")
+
+
+def github_settings():
+    """(token, repo, path prefix) of the GitHub storage, resolved once."""
+    global _github
+    if _github is None:
+        _github = (
+            get_setting("GH_TOKEN"),
+            get_setting("GH_REPO"),  # e.g., "TimRehbronn/Wishlist"
+            get_setting("GH_PATH", "cloud-data"),  # folder in repo to store files
+        )
+    return _github
@@ -1,48 +1,153 @@
-from typing import List, Dict
-import json
+from typing import List, Dict, Optional
 import os
+import copy
+import contextvars
+import dataclasses
 import hashlib
-from .remote_storage import (
-    remote_available,
-    get_all_wishlists_remote,
-    save_wishlists_index_remote,
-    load_wishlist_remote,
-    save_wishlist_remote,
+import time
+import threading
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait
+from .config import get_bool_setting, get_float_setting, get_int_setting
+from .merge import WishlistConflictError, merge_wishlist
+from .metrics import instrumented, cache as record_cache
+from .models import Item, WishlistStats, parse_price
+from .search import ItemIndex, TokenIndex, tokenize
+from .write_behind import WriteBehindQueue
+from .storage import get_backend, StaleVersionError
+from .storage.base import (
+    apply_add_item,
+    apply_update_item,
+    apply_delete_item,
+    apply_move_item,
+    assign_item_ids,
+    new_item_id,
 )
 
-DATA_DIR = 'data'
+# Loaded wishlists carry their storage version (e.g. blob SHA or local mtime/size) under this key
+VERSION_KEY = '_version'
+_MAX_SAVE_ATTEMPTS = 3
 
-def ensure_data_dir():
-    """Ensure data directory exists"""
-    os.makedirs(DATA_DIR, exist_ok=True)
+# Documents as loaded, by (wishlist_id, version): the merge base for saves from stale versions
+_BASE_SNAPSHOTS_MAX = 256
+_base_snapshots = OrderedDict()
+_base_lock = threading.Lock()
 
-def get_wishlist_filename(wishlist_id: str) -> str:
-    """Get filename for a specific wishlist"""
-    return os.path.join(DATA_DIR, f"wishlist_{wishlist_id}.json")
+# Parsed wishlists shared by all sessions of this process: wishlist_id -> (data, version, generation, loaded_at).
+# Cached documents are never mutated; load_wishlist hands out copies. Every save/delete in this
+# process bumps the wishlist's generation, other processes' writes show up after the TTL.
+_CACHE_TTL = get_float_setting("WISHLIST_CACHE_TTL", 2.0)
+_CACHE_MAX_ENTRIES = get_int_setting("WISHLIST_CACHE_SIZE", 256)
+_doc_cache = OrderedDict()
+_generations = defaultdict(int)
+_cache_lock = threading.Lock()
 
+# Item stats per wishlist: wishlist_id -> (version, WishlistStats, {item_id: (is_gifted, cents)}),
+# and search indexes: wishlist_id -> (version, ItemIndex). Item operations of this process move
+# them to the next version instead of rebuilding them.
+_stats_cache = OrderedDict()
+_index_cache = OrderedDict()
+_stats_lock = threading.Lock()
+
+# Token index over wishlist names for the overview search: (index entries, TokenIndex, loaded_at).
+# Reading the index means reading every shard, so it is reused while the user types and
+# only refreshed after _SEARCH_TTL or a create/delete in this process.
+_SEARCH_TTL = get_float_setting("WISHLIST_SEARCH_TTL", 30.0)
+_SEARCH_LIMIT = get_int_setting("WISHLIST_SEARCH_LIMIT", 50)
+_names_index = None
+
+# Optional write-behind mode: saves are coalesced per wishlist and written in the background.
+# A save that finally fails is reported to its owner (e.g. the app session, see set_save_owner).
+_save_owner = contextvars.ContextVar("save_owner", default=None)
+_write_behind = None
+_write_behind_resolved = False
+_write_behind_lock = threading.Lock()
+
+def get_write_behind_queue():
+    """Return the write-behind queue, or None if WISHLIST_WRITE_BEHIND is off"""
+    global _write_behind, _write_behind_resolved
+    if not _write_behind_resolved:
+        with _write_behind_lock:
+            if not _write_behind_resolved:
+                if get_bool_setting("WISHLIST_WRITE_BEHIND"):
+                    _write_behind = WriteBehindQueue(
+                        _write_wishlist,
+                        window=get_float_setting("WISHLIST_FLUSH_WINDOW", 2.0),
+                        # Conflicts and other permanent errors fail for good instead of retrying
+                        retry_if=lambda error: isinstance(error, get_backend().transient_errors),
+                    )
+                _write_behind_resolved = True
+    return _write_behind
+
+def set_save_owner(owner) -> None:
+    """Attribute saves made in this context (e.g. one script run) to owner"""
+    _save_owner.set(owner)
+
+def pop_failed_saves(owner) -> List[Dict]:
+    """Queued saves of owner that could not be written: [{"key", "error", "time"}]"""
+    queue = get_write_behind_queue()
+    return queue.pop_failures(owner) if queue is not None else []
+
+# Bounded pool for load_many/save_many: storage calls for several wishlists run side by side
+_IO_CONCURRENCY = get_int_setting("WISHLIST_IO_CONCURRENCY", 8)
+_io_pool = None
+_io_pool_lock = threading.Lock()
+
+def _get_io_pool() -> ThreadPoolExecutor:
+    global _io_pool
+    if _io_pool is None:
+        with _io_pool_lock:
+            if _io_pool is None:
+                _io_pool = ThreadPoolExecutor(max_workers=max(1, _IO_CONCURRENCY), thread_name_prefix="wishlist-io")
+    return _io_pool
+
+@instrumented
+def flush_pending_saves() -> None:
+    """Write all queued saves now (no-op without write-behind), and the index summaries they changed"""
+    if _write_behind is not None:
+        _write_behind.flush()
+    get_backend().flush_summaries()
+
+@instrumented
 def get_all_wishlists() -> List[Dict]:
     """Load all available wishlists (id and name only)"""
-    if remote_available():
-        return get_all_wishlists_remote()
-    ensure_data_dir()
-    index_file = os.path.join(DATA_DIR, 'wishlists_index.json')
-    if os.path.exists(index_file):
-        try:
-            with open(index_file, 'r', encoding='utf-8') as file:
-                return json.load(file)
-        except:
-            pass
-    return []
+    return get_backend().list_wishlists()
+
+@instrumented
+def get_wishlists_page(page: int = 0):
+    """One page of the index with per-list summaries: (entries, page_count)"""
+    return get_backend().list_page(page)
+
+@instrumented
+def search_wishlists(query: str, limit: int = _SEARCH_LIMIT):
+    """Index entries whose name matches the query, at most limit of them: (entries, match count)"""
+    global _names_index
+    names = _names_index
+    if names is None or time.monotonic() - names[2] > _SEARCH_TTL:
+        wishlists = get_all_wishlists()
+        index = TokenIndex()
+        for wishlist in wishlists:
+            index.add(wishlist.get('id'), tokenize(wishlist.get('name')))
+        index.sort()
+        names = _names_index = (wishlists, index, time.monotonic())
+    wishlists, index, _ = names
+    if tokenize(query):
+        matches = index.search(query)
+        wishlists = [w for w in wishlists if w.get('id') in matches]
+    return wishlists[:limit], len(wishlists)
+
+def _forget_names() -> None:
+    """Drop the names index of the overview search, e.g. after a list was created or deleted"""
+    global _names_index
+    _names_index = None
 
+@instrumented
 def save_wishlists_index(wishlists: List[Dict]) -> None:
     """Save wishlists index"""
-    if remote_available():
-        return save_wishlists_index_remote(wishlists)
-    ensure_data_dir()
-    index_file = os.path.join(DATA_DIR, 'wishlists_index.json')
-    with open(index_file, 'w', encoding='utf-8') as file:
-        json.dump(wishlists, file, indent=4, ensure_ascii=False)
+    get_backend().save_index(wishlists)
+    _forget_names()
 
+@instrumented
 def create_wishlist(name: str, password: str) -> str:
     """Create a new wishlist and return its ID"""
     import hashlib
@@ -61,48 +166,330 @@ def create_wishlist(name: str, password: str) -> str:
         "items": []
     }
     
-    # Save wishlist file (use remote if available)
-    if remote_available():
-        save_wishlist_remote(wishlist_id, wishlist_data)
-    else:
-        ensure_data_dir()
-        filename = get_wishlist_filename(wishlist_id)
-        with open(filename, 'w', encoding='utf-8') as file:
-            json.dump(wishlist_data, file, indent=4, ensure_ascii=False)
-    
-    # Update index
-    wishlists = get_all_wishlists()
-    wishlists.append({"id": wishlist_id, "name": name})
-    save_wishlists_index(wishlists)
+    # Store wishlist and index entry (GitHub: both in one commit)
+    get_backend().create(wishlist_id, wishlist_data)
+    _forget_names()
     
     return wishlist_id
 
-def load_wishlist(wishlist_id: str) -> Dict:
-    """Load a specific wishlist"""
-    if remote_available():
-        return load_wishlist_remote(wishlist_id)
-    ensure_data_dir()
-    filename = get_wishlist_filename(wishlist_id)
-    if os.path.exists(filename):
+def _remember_base(wishlist_id: str, version, data: Dict) -> None:
+    """Keep a loaded document as merge base (data must not be mutated afterwards)."""
+    if version is None:
+        return
+    with _base_lock:
+        _base_snapshots[(wishlist_id, version)] = data
+        _base_snapshots.move_to_end((wishlist_id, version))
+        while len(_base_snapshots) > _BASE_SNAPSHOTS_MAX:
+            _base_snapshots.popitem(last=False)
+
+def _get_base(wishlist_id: str, version):
+    with _base_lock:
+        return _base_snapshots.get((wishlist_id, version))
+
+@instrumented
+def _read_wishlist(wishlist_id: str):
+    """Read a wishlist from storage. Returns (data, version) or (None, None).
+
+    Items saved before items had IDs get one here, and the migrated wishlist is written back.
+    """
+    backend = get_backend()
+    for _ in range(_MAX_SAVE_ATTEMPTS):
+        data, version = backend.read(wishlist_id)
+        if data is None or not assign_item_ids(wishlist_id, data.setdefault('items', [])):
+            return data, version
         try:
-            with open(filename, 'r', encoding='utf-8') as file:
-                return json.load(file)
-        except:
-            pass
-    return None
+            return data, backend.write(wishlist_id, data, expected_version=version)
+        except StaleVersionError:
+            # Changed meanwhile (most likely by the same migration elsewhere); read again
+            continue
+    return data, version
+
+def invalidate_wishlist(wishlist_id: str) -> None:
+    """Forget the cached copy of a wishlist (called after every change)"""
+    with _cache_lock:
+        _generations[wishlist_id] += 1
+        _doc_cache.pop(wishlist_id, None)
+
+def _cache_store(wishlist_id: str, data: Dict, version, generation: int) -> None:
+    with _cache_lock:
+        # A change since we started reading makes this copy stale already
+        if _generations[wishlist_id] != generation:
+            return
+        _doc_cache[wishlist_id] = (data, version, generation, time.monotonic())
+        _doc_cache.move_to_end(wishlist_id)
+        while len(_doc_cache) > _CACHE_MAX_ENTRIES:
+            _doc_cache.popitem(last=False)
 
+def _load_shared(wishlist_id: str):
+    """Return the shared (read-only!) parsed wishlist and its version, from cache if fresh."""
+    with _cache_lock:
+        generation = _generations[wishlist_id]
+        entry = _doc_cache.get(wishlist_id)
+        if entry is not None and entry[2] == generation and time.monotonic() - entry[3] < _CACHE_TTL:
+            _doc_cache.move_to_end(wishlist_id)
+            record_cache("doc_cache", True)
+            return entry[0], entry[1]
+    record_cache("doc_cache", False)
+    data, version = _read_wishlist(wishlist_id)
+    if data is None:
+        return None, None
+    _cache_store(wishlist_id, data, version, generation)
+    _remember_base(wishlist_id, version, data)
+    return data, version
+
+@instrumented
+def load_wishlist(wishlist_id: str) -> Dict:
+    """Load a specific wishlist (a private copy, with its version under VERSION_KEY)"""
+    queue = get_write_behind_queue()
+    if queue is not None:
+        # Serve our own unsaved edits until the background write has landed
+        pending = queue.get_pending(wishlist_id)
+        if pending is not None:
+            return pending
+    shared, version = _load_shared(wishlist_id)
+    if shared is None:
+        return None
+    data = copy.deepcopy(shared)
+    data[VERSION_KEY] = version
+    return data
+
+@instrumented
 def save_wishlist(wishlist_id: str, data: Dict) -> None:
-    """Save a specific wishlist"""
-    if remote_available():
-        return save_wishlist_remote(wishlist_id, data)
-    ensure_data_dir()
-    filename = get_wishlist_filename(wishlist_id)
-    with open(filename, 'w', encoding='utf-8') as file:
-        json.dump(data, file, indent=4, ensure_ascii=False)
+    """Save a specific wishlist (queued and coalesced in write-behind mode).
+
+    If the wishlist changed since `data` was loaded, the items are merged three-way;
+    WishlistConflictError is raised only if both sides changed the same thing.
+    """
+    queue = get_write_behind_queue()
+    if queue is not None:
+        queue.submit(wishlist_id, data, owner=_save_owner.get())
+        return
+    _write_wishlist(wishlist_id, data)
+
+def _run_many(function, calls, return_exceptions: bool) -> Dict:
+    """Run function(key, *args) for every (key, args) on the I/O pool and wait for all.
+
+    Returns {key: result}; with return_exceptions a failed call's exception is its
+    result, otherwise the first failure is raised once every call has finished.
+    """
+    # Each call runs in a copy of the caller's context, so rerun metrics and request priorities carry over
+    futures = {key: _get_io_pool().submit(contextvars.copy_context().run, function, key, *args) for key, args in calls}
+    wait(futures.values())
+    results = {}
+    for key, future in futures.items():
+        error = future.exception()
+        if error is not None and not return_exceptions:
+            raise error
+        results[key] = error if error is not None else future.result()
+    return results
 
+@instrumented
+def load_many(wishlist_ids: List[str], return_exceptions: bool = False) -> Dict[str, Optional[Dict]]:
+    """Load several wishlists concurrently (at most WISHLIST_IO_CONCURRENCY at a time).
+
+    Returns {wishlist_id: wishlist or None}, like load_wishlist for each ID.
+    """
+    return _run_many(load_wishlist, [(wishlist_id, ()) for wishlist_id in dict.fromkeys(wishlist_ids)], return_exceptions)
+
+@instrumented
+def save_many(wishlists: Dict[str, Dict], return_exceptions: bool = False) -> Dict[str, None]:
+    """Save several wishlists, each like save_wishlist (merging as needed).
+
+    Backends with batched writes (GitHub) store them all in one go; otherwise the saves
+    run concurrently on the I/O pool.
+    """
+    if get_write_behind_queue() is None and get_backend().batched_writes:
+        return _write_batch(wishlists, return_exceptions)
+    return _run_many(save_wishlist, [(wishlist_id, (data,)) for wishlist_id, data in wishlists.items()], return_exceptions)
+
+def _write_batch(wishlists: Dict[str, Dict], return_exceptions: bool) -> Dict[str, None]:
+    """save_many through backend.write_many; wishlists that moved on are merged and saved one by one."""
+    docs = {wishlist_id: _prepare_doc(wishlist_id, data) for wishlist_id, data in wishlists.items()}
+    writes = {wishlist_id: (docs[wishlist_id], data.get(VERSION_KEY)) for wishlist_id, data in wishlists.items()}
+    try:
+        versions = get_backend().write_many(writes)
+    except Exception as error:
+        if not return_exceptions:
+            raise
+        return {wishlist_id: error for wishlist_id in wishlists}
+    results = {}
+    for wishlist_id, doc in docs.items():
+        try:
+            if versions.get(wishlist_id) is None:
+                _write_wishlist(wishlist_id, wishlists[wishlist_id])
+            else:
+                _share_written(wishlist_id, doc, versions[wishlist_id])
+            results[wishlist_id] = None
+        except Exception as error:
+            results[wishlist_id] = error
+    if not return_exceptions:
+        for error in results.values():
+            if error is not None:
+                raise error
+    return results
+
+async def _gather_on_pool(function, calls, return_exceptions: bool) -> Dict:
+    import asyncio  # only asyncio callers pay for importing it (the CLI starts without)
+    loop = asyncio.get_running_loop()
+    keys = [key for key, _ in calls]
+    results = await asyncio.gather(
+        *(loop.run_in_executor(_get_io_pool(), contextvars.copy_context().run, function, key, *args) for key, args in calls),
+        return_exceptions=return_exceptions,
+    )
+    return dict(zip(keys, results))
+
+async def load_many_async(wishlist_ids: List[str], return_exceptions: bool = False) -> Dict[str, Optional[Dict]]:
+    """load_many for asyncio code: the loads run on the I/O pool, not on the event loop."""
+    return await _gather_on_pool(load_wishlist, [(wishlist_id, ()) for wishlist_id in dict.fromkeys(wishlist_ids)], return_exceptions)
+
+async def save_many_async(wishlists: Dict[str, Dict], return_exceptions: bool = False) -> Dict[str, None]:
+    """save_many for asyncio code."""
+    if get_write_behind_queue() is None and get_backend().batched_writes:
+        import asyncio
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_io_pool(), contextvars.copy_context().run,
+                                          _write_batch, wishlists, return_exceptions)
+    return await _gather_on_pool(save_wishlist, [(wishlist_id, (data,)) for wishlist_id, data in wishlists.items()], return_exceptions)
+
+def _prepare_doc(wishlist_id: str, data: Dict) -> Dict:
+    """The document to store for data: a copy without VERSION_KEY, every item with an ID."""
+    doc = copy.deepcopy({k: v for k, v in data.items() if k != VERSION_KEY})
+    assign_item_ids(wishlist_id, doc.setdefault('items', []))
+    return doc
+
+def _share_written(wishlist_id: str, doc: Dict, version) -> None:
+    """What we just wrote is the current state: share it without another read."""
+    invalidate_wishlist(wishlist_id)
+    with _cache_lock:
+        generation = _generations[wishlist_id]
+    _cache_store(wishlist_id, doc, version, generation)
+    _remember_base(wishlist_id, version, doc)
+
+@instrumented
+def _write_wishlist(wishlist_id: str, data: Dict) -> None:
+    version = data.get(VERSION_KEY)
+    doc = _prepare_doc(wishlist_id, data)
+    for _ in range(_MAX_SAVE_ATTEMPTS):
+        try:
+            new_version = get_backend().write(wishlist_id, doc, expected_version=version)
+            _share_written(wishlist_id, doc, new_version)
+            return
+        except StaleVersionError:
+            # Someone saved in between: merge our changes onto theirs and try again
+            base = _get_base(wishlist_id, version)
+            current, current_version = _read_wishlist(wishlist_id)
+            if base is None or current is None:
+                raise WishlistConflictError("Die Liste wurde zwischenzeitlich geändert")
+            doc = merge_wishlist(base, doc, current)
+            _remember_base(wishlist_id, current_version, current)
+            version = current_version
+    raise WishlistConflictError("Die Liste wird gerade von mehreren Personen geändert")
+
+def _compute_stats(items: List[Dict]):
+    stats = WishlistStats()
+    contributions = {}
+    for data in items:
+        item = Item.from_dict(data)
+        stats.add(item.is_gifted, item.price_cents)
+        contributions[item.id] = (item.is_gifted, item.price_cents)
+    return stats, contributions
+
+def _stats_store(wishlist_id: str, version, stats: WishlistStats, contributions: Dict) -> None:
+    with _stats_lock:
+        _stats_cache[wishlist_id] = (version, stats, contributions)
+        _stats_cache.move_to_end(wishlist_id)
+        while len(_stats_cache) > _CACHE_MAX_ENTRIES:
+            _stats_cache.popitem(last=False)
+
+@instrumented
+def get_wishlist_stats(wishlist_id: str) -> WishlistStats:
+    """Item counts and values of a wishlist (shared, don't modify)"""
+    queue = get_write_behind_queue()
+    pending = queue.get_pending(wishlist_id) if queue is not None else None
+    if pending is not None:
+        return _compute_stats(pending.get('items', []))[0]
+    shared, version = _load_shared(wishlist_id)
+    if shared is None:
+        return WishlistStats()
+    with _stats_lock:
+        entry = _stats_cache.get(wishlist_id)
+        if entry is not None and entry[0] == version:
+            record_cache("stats_cache", True)
+            return entry[1]
+    record_cache("stats_cache", False)
+    stats, contributions = _compute_stats(shared.get('items', []))
+    _stats_store(wishlist_id, version, stats, contributions)
+    return stats
+
+@instrumented
+def get_item_index(wishlist_id: str) -> ItemIndex:
+    """Search/filter index over the items of a wishlist (shared, query only)"""
+    queue = get_write_behind_queue()
+    pending = queue.get_pending(wishlist_id) if queue is not None else None
+    if pending is not None:
+        return ItemIndex(pending.get('items', []))
+    shared, version = _load_shared(wishlist_id)
+    if shared is None:
+        return ItemIndex()
+    with _stats_lock:
+        entry = _index_cache.get(wishlist_id)
+        if entry is not None and entry[0] == version:
+            record_cache("search_index", True)
+            return entry[1]
+    record_cache("search_index", False)
+    index = ItemIndex(shared.get('items', []))
+    with _stats_lock:
+        _index_cache[wishlist_id] = (version, index)
+        _index_cache.move_to_end(wishlist_id)
+        while len(_index_cache) > _CACHE_MAX_ENTRIES:
+            _index_cache.popitem(last=False)
+    return index
+
+def _advance_views(wishlist_id: str, versions, op: str, args) -> None:
+    """Apply an item operation to the cached stats and index if they belong to the version it was applied to"""
+    if not versions:
+        return
+    old_version, new_version = versions
+    with _stats_lock:
+        entry = _index_cache.pop(wishlist_id, None)
+        if entry is not None and entry[0] == old_version:
+            index = entry[1]
+            # Updated in place: the index locks itself, and readers only query it
+            if op == "add_item":
+                index.add(args[0])
+            elif op == "update_item":
+                index.update(args[0], args[1])
+            elif op == "delete_item":
+                index.remove(args[0])
+            _index_cache[wishlist_id] = (new_version, index)
+        entry = _stats_cache.pop(wishlist_id, None)
+        if entry is None or entry[0] != old_version:
+            return
+        _, stats, contributions = entry
+        # Callers may still hold the old object
+        stats = dataclasses.replace(stats)
+        if op == "add_item":
+            item = Item.from_dict(args[0])
+            stats.add(item.is_gifted, item.price_cents)
+            contributions[item.id] = (item.is_gifted, item.price_cents)
+        elif op in ("update_item", "delete_item"):
+            if args[0] not in contributions:
+                return
+            is_gifted, cents = contributions.pop(args[0])
+            stats.remove(is_gifted, cents)
+            if op == "update_item":
+                fields = args[1]
+                is_gifted = bool(fields.get('is_gifted', is_gifted))
+                cents = parse_price(fields['price']) if 'price' in fields else cents
+                stats.add(is_gifted, cents)
+                contributions[args[0]] = (is_gifted, cents)
+        _stats_cache[wishlist_id] = (new_version, stats, contributions)
+
+@instrumented
 def verify_wishlist_password(wishlist_id: str, password: str) -> bool:
     """Verify password for a wishlist"""
-    wishlist = load_wishlist(wishlist_id)
+    # Read-only access: the shared cached copy is enough
+    wishlist, _ = _load_shared(wishlist_id)
     if not wishlist:
         return False
     
@@ -110,22 +497,64 @@ def verify_wishlist_password(wishlist_id: str, password: str) -> bool:
     return wishlist.get('password_hash') == password_hash
 
 
+@instrumented
 def delete_wishlist(wishlist_id: str) -> bool:
     """Delete a wishlist by ID. Returns True if successful."""
-    from .remote_storage import delete_wishlist_remote
-    
-    # Remove from index
-    wishlists = get_all_wishlists()
-    wishlists = [w for w in wishlists if w.get('id') != wishlist_id]
-    save_wishlists_index(wishlists)
+    queue = get_write_behind_queue()
+    if queue is not None:
+        queue.discard(wishlist_id)
     
-    # Delete the wishlist file
-    if remote_available():
-        delete_wishlist_remote(wishlist_id)
-    else:
-        filename = get_wishlist_filename(wishlist_id)
-        if os.path.exists(filename):
-            os.remove(filename)
+    # Remove index entry and wishlist (GitHub: both in one commit)
+    get_backend().delete(wishlist_id)
+    _forget_names()
+    invalidate_wishlist(wishlist_id)
+    with _stats_lock:
+        _stats_cache.pop(wishlist_id, None)
+        _index_cache.pop(wishlist_id, None)
     
     return True
 
+
+def _change_items(wishlist_id: str, op: str, apply, *args) -> None:
+    """Run an item operation natively on the backend, or on the pending state in write-behind mode"""
+    queue = get_write_behind_queue()
+    if queue is None:
+        try:
+            versions = getattr(get_backend(), op)(wishlist_id, *args)
+            _advance_views(wishlist_id, versions, op, args)
+            return
+        finally:
+            invalidate_wishlist(wishlist_id)
+    data = load_wishlist(wishlist_id)
+    if data is None:
+        raise WishlistConflictError("Wunschliste nicht gefunden")
+    apply(data.setdefault('items', []), *args)
+    save_wishlist(wishlist_id, data)
+
+@instrumented
+def add_item(wishlist_id: str, item: Dict) -> str:
+    """Append an item to a wishlist and return its ID"""
+    item = dict(item)
+    item.setdefault('id', new_item_id())
+    _change_items(wishlist_id, "add_item", apply_add_item, item)
+    return item['id']
+
+@instrumented
+def update_item(wishlist_id: str, item_id: str, fields: Dict, expected: Optional[Dict] = None) -> None:
+    """Change fields of an item; `expected` field values must still hold"""
+    _change_items(wishlist_id, "update_item", apply_update_item, item_id, fields, expected)
+
+@instrumented
+def gift_item(wishlist_id: str, item_id: str) -> None:
+    """Mark an item as gifted; raises WishlistConflictError if someone else was faster"""
+    update_item(wishlist_id, item_id, {"is_gifted": True}, expected={"is_gifted": False})
+
+@instrumented
+def delete_item(wishlist_id: str, item_id: str, expected: Optional[Dict] = None) -> None:
+    """Remove an item"""
+    _change_items(wishlist_id, "delete_item", apply_delete_item, item_id, expected)
+
+@instrumented
+def move_item(wishlist_id: str, item_id: str, new_index: int, expected: Optional[Dict] = None) -> None:
+    """Move an item to position new_index"""
+    _change_items(wishlist_id, "move_item", apply_move_item, item_id, new_index, expected)
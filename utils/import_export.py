@@ -0,0 +1,221 @@
+import io
+import csv
+import json
+import re
+import itertools
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional
+from .data_handler import get_all_wishlists, load_many, load_wishlist, save_wishlist
+from .storage.base import new_item_id
+
+FORMATS = ("csv", "jsonl")
+
+# Item fields in export column order
+FIELDS = ["gift_name", "price", "purchase_link", "amazon_link", "is_highlight", "is_gifted"]
+
+# Accepted column names (case-insensitive) besides the field names themselves
+_ALIASES = {
+    "name": "gift_name", "geschenk": "gift_name", "geschenk name": "gift_name",
+    "link": "purchase_link", "url": "purchase_link", "kauflink": "purchase_link",
+    "preis": "price",
+    "amazon": "amazon_link", "amazon link": "amazon_link",
+    "highlight": "is_highlight",
+    "gifted": "is_gifted", "verschenkt": "is_gifted",
+}
+_TRUE = {"1", "true", "yes", "y", "ja", "j", "x", "wahr"}
+_FALSE = {"", "0", "false", "no", "n", "nein", "falsch"}
+_MAX_NAME_LENGTH = 200
+# "mailto:", "javascript:", "https://"...; a bare "shop.de/x" gets https:// added
+_SCHEME = re.compile(r"^[a-zA-Z][a-zA-Z0-9+.-]*:(?!\d)")
+
+# Wishlists loaded per load_many batch when exporting several lists
+_EXPORT_BATCH = 20
+
+# Cells starting like a formula are prefixed with ' in CSV exports, so spreadsheets don't run them
+_FORMULA_START = ("=", "+", "-", "@")
+
+
+@dataclass
+class ImportReport:
+    """Outcome of an import: items added, rows skipped as duplicates and invalid rows."""
+
+    added: int = 0
+    duplicates: int = 0
+    errors: List[str] = field(default_factory=list)
+
+
+def _column(name: str) -> Optional[str]:
+    key = (name or "").strip().lower().replace("_", " ")
+    if key.replace(" ", "_") in FIELDS:
+        return key.replace(" ", "_")
+    return _ALIASES.get(key)
+
+
+def _flag(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    text = str(value if value is not None else "").strip().lower()
+    if text in _TRUE:
+        return True
+    if text in _FALSE:
+        return False
+    raise ValueError(f"'{value}' ist kein Ja/Nein-Wert")
+
+
+def _link(value) -> str:
+    link = str(value or "").strip()
+    if not link:
+        return ""
+    if not _SCHEME.match(link):
+        link = "https://" + link
+    if not link.lower().startswith(("http://", "https://")) or any(c in link for c in ' "<>\'`'):
+        raise ValueError(f"'{value}' ist kein gültiger Link")
+    return link
+
+
+def _text(value) -> str:
+    text = str(value if value is not None else "").strip()
+    # Undo the formula guard of our own CSV export
+    if text.startswith("'") and text[1:2] in _FORMULA_START:
+        text = text[1:]
+    return text
+
+
+def _to_item(row: Dict) -> Dict:
+    """Validate one input row (column names already mapped) into the items schema."""
+    name = _text(row.get("gift_name"))
+    if not name:
+        raise ValueError("Geschenk-Name fehlt")
+    if len(name) > _MAX_NAME_LENGTH:
+        raise ValueError(f"Geschenk-Name ist länger als {_MAX_NAME_LENGTH} Zeichen")
+    return {
+        "gift_name": name,
+        "purchase_link": _link(row.get("purchase_link")),
+        "is_gifted": _flag(row.get("is_gifted")),
+        "price": _text(row.get("price")),
+        "amazon_link": _link(row.get("amazon_link")),
+        "is_highlight": _flag(row.get("is_highlight")),
+    }
+
+
+def _csv_rows(lines: Iterator[str]):
+    """(line number, row) pairs of a CSV file with a header line."""
+    first = next(lines, None)
+    if first is None:
+        return
+    try:
+        # Spreadsheets with a German locale save with ";"
+        dialect = csv.Sniffer().sniff(first, delimiters=",;\t")
+    except csv.Error:
+        dialect = csv.excel
+    reader = csv.reader(itertools.chain([first], lines), dialect)
+    try:
+        header = [_column(name) for name in next(reader)]
+        if "gift_name" not in header:
+            raise ValueError("Die CSV-Datei braucht eine Spalte 'gift_name' (oder 'Name')")
+        for values in reader:
+            if any(value.strip() for value in values):
+                yield reader.line_num, {column: value for column, value in zip(header, values) if column}
+    except csv.Error as e:
+        raise ValueError(f"Zeile {reader.line_num}: {e}") from e
+
+
+def _jsonl_rows(lines: Iterator[str]):
+    """(line number, row) pairs of a JSONL file; rows stay text until parse_items decodes them."""
+    for line_number, line in enumerate(lines, 1):
+        if line.strip():
+            yield line_number, line
+
+
+def _json_row(line: str) -> Dict:
+    row = json.loads(line)
+    if not isinstance(row, dict):
+        raise ValueError("kein JSON-Objekt")
+    return {_column(key): value for key, value in row.items() if _column(key)}
+
+
+def parse_items(lines: Iterable[str], fmt: str = "csv", errors: Optional[List[str]] = None) -> Iterator[Dict]:
+    """Stream validated items from CSV or JSONL text lines.
+
+    Invalid rows are skipped and described in `errors` (if given); a file that cannot be
+    read at all (e.g. a CSV without a name column) raises ValueError.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format: {fmt}")
+    rows = _csv_rows(iter(lines)) if fmt == "csv" else _jsonl_rows(iter(lines))
+    for line_number, row in rows:
+        try:
+            if isinstance(row, str):
+                row = _json_row(row)
+            yield _to_item(row)
+        except ValueError as e:
+            if errors is not None:
+                errors.append(f"Zeile {line_number}: {e}")
+
+
+def _dedupe_key(item: Dict):
+    return (item.get("gift_name", "").strip().casefold(), (item.get("purchase_link") or "").strip())
+
+
+def import_items(wishlist_id: str, lines: Iterable[str], fmt: str = "csv") -> ImportReport:
+    """Append the items of a CSV/JSONL file to a wishlist with a single save.
+
+    Rows with the same name and link as an existing (or earlier imported) item are skipped.
+    """
+    wishlist = load_wishlist(wishlist_id)
+    if wishlist is None:
+        raise ValueError(f"Wishlist {wishlist_id} not found")
+    report = ImportReport()
+    items = wishlist.setdefault("items", [])
+    seen = {_dedupe_key(item) for item in items}
+    for item in parse_items(lines, fmt, report.errors):
+        key = _dedupe_key(item)
+        if key in seen:
+            report.duplicates += 1
+            continue
+        seen.add(key)
+        items.append({"id": new_item_id(), **item})
+        report.added += 1
+    if report.added:
+        save_wishlist(wishlist_id, wishlist)
+    return report
+
+
+def _csv_line(values: List) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow([
+        "'" + value if isinstance(value, str) and value.startswith(_FORMULA_START) else value
+        for value in values
+    ])
+    return buffer.getvalue()
+
+
+def export_items(wishlist_ids: Optional[List[str]] = None, fmt: str = "csv") -> Iterator[str]:
+    """Stream the items of some (default: all) wishlists as CSV or JSONL text, one row at a time.
+
+    Exports of more than one list start each row with wishlist_id and wishlist_name.
+    Passwords are never exported.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format: {fmt}")
+    if wishlist_ids is None:
+        wishlist_ids = [w["id"] for w in get_all_wishlists()]
+    with_list = len(wishlist_ids) != 1
+    columns = (["wishlist_id", "wishlist_name"] if with_list else []) + FIELDS + ["id"]
+    if fmt == "csv":
+        yield _csv_line(columns)
+    for start in range(0, len(wishlist_ids), _EXPORT_BATCH):
+        batch = wishlist_ids[start:start + _EXPORT_BATCH]
+        wishlists = load_many(batch)
+        for wishlist_id in batch:
+            wishlist = wishlists.get(wishlist_id)
+            if wishlist is None:
+                continue
+            for item in wishlist.get("items", []):
+                row = {"wishlist_id": wishlist_id, "wishlist_name": wishlist.get("name")} if with_list else {}
+                row.update({name: item.get(name, False if name.startswith("is_") else "") for name in FIELDS})
+                row["id"] = item.get("id")
+                if fmt == "csv":
+                    yield _csv_line([row[name] for name in columns])
+                else:
+                    yield json.dumps(row, ensure_ascii=False) + "\n"
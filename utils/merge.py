@@ -0,0 +1,88 @@
+from typing import Dict, List
+
+
+class WishlistConflictError(Exception):
+    """Raised when a save collides with a concurrent change to the same data."""
+
+
+def _item_key(item: Dict):
+    """Identity of an item across versions of the same wishlist."""
+    if item.get("id"):
+        return item["id"]
+    return (item.get("gift_name"), item.get("purchase_link"), item.get("amazon_link"))
+
+
+def _keyed(items: List[Dict]) -> Dict:
+    """Map item keys to items; repeated keys get an occurrence counter."""
+    result = {}
+    seen = {}
+    for item in items:
+        key = _item_key(item)
+        n = seen.get(key, 0)
+        seen[key] = n + 1
+        result[(key, n)] = item
+    return result
+
+
+def _merge_fields(base: Dict, mine: Dict, theirs: Dict, what: str) -> Dict:
+    merged = {}
+    for field in list(theirs) + [f for f in mine if f not in theirs]:
+        b, m, t = base.get(field), mine.get(field), theirs.get(field)
+        if field == "is_gifted" and not b and m and t:
+            # Two gifters claimed the same item; the later one must not "win" too
+            raise WishlistConflictError(f"{what} wurde bereits verschenkt")
+        if m == t or m == b:
+            value = t
+        elif t == b:
+            value = m
+        else:
+            raise WishlistConflictError(f"{what}: '{field}' wurde gleichzeitig geändert")
+        merged[field] = value
+    return merged
+
+
+def merge_items(base: List[Dict], mine: List[Dict], theirs: List[Dict]) -> List[Dict]:
+    """Three-way merge of item lists. Raises WishlistConflictError on a real conflict."""
+    base_k, mine_k, theirs_k = _keyed(base), _keyed(mine), _keyed(theirs)
+
+    merged = {}
+    for key in list(theirs_k) + [k for k in mine_k if k not in theirs_k]:
+        b, m, t = base_k.get(key), mine_k.get(key), theirs_k.get(key)
+        what = f"'{(m or t or b).get('gift_name')}'"
+        if b is None:
+            # Added on one or both sides
+            if m is not None and t is not None and m != t:
+                merged[key] = _merge_fields({}, m, t, what)
+            else:
+                merged[key] = m if m is not None else t
+        elif m is None:
+            if t != b:
+                raise WishlistConflictError(f"{what} wurde gelöscht und gleichzeitig geändert")
+        elif t is None:
+            if m != b:
+                raise WishlistConflictError(f"{what} wurde gelöscht und gleichzeitig geändert")
+        else:
+            merged[key] = _merge_fields(b, m, t, what)
+
+    # Order: keep the side that reordered; new items stay where that side put them
+    base_order = [k for k in base_k if k in merged]
+    mine_order = [k for k in mine_k if k in merged and k in base_k]
+    theirs_order = [k for k in theirs_k if k in merged and k in base_k]
+    mine_moved = mine_order != base_order
+    theirs_moved = theirs_order != base_order
+    if mine_moved and theirs_moved and mine_order != theirs_order:
+        raise WishlistConflictError("Die Reihenfolge wurde gleichzeitig geändert")
+    primary, secondary = (mine_k, theirs_k) if mine_moved else (theirs_k, mine_k)
+    order = [k for k in primary if k in merged]
+    order += [k for k in secondary if k in merged and k not in primary]
+    return [merged[k] for k in order]
+
+
+def merge_wishlist(base: Dict, mine: Dict, theirs: Dict) -> Dict:
+    """Three-way merge of whole wishlist documents (top-level fields and items)."""
+    base_rest = {k: v for k, v in base.items() if k != "items"}
+    mine_rest = {k: v for k, v in mine.items() if k != "items"}
+    theirs_rest = {k: v for k, v in theirs.items() if k != "items"}
+    merged = _merge_fields(base_rest, mine_rest, theirs_rest, "Die Liste")
+    merged["items"] = merge_items(base.get("items", []), mine.get("items", []), theirs.get("items", []))
+    return merged
@@ -0,0 +1,212 @@
+import os
+import time
+import tempfile
+import functools
+import threading
+import contextvars
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from .config import get_setting, get_float_setting
+
+# Latency histogram bucket bounds in seconds (Prometheus style, cumulative on export)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Collector:
+    """Call counts, errors, latency histograms, bytes and cache hits/misses, all thread-safe."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.calls = Counter()
+        self.errors = Counter()
+        self.seconds = defaultdict(float)
+        self.buckets = defaultdict(lambda: [0] * (len(BUCKETS) + 1))
+        self.bytes = Counter()
+        self.hits = Counter()
+        self.misses = Counter()
+
+    def observe(self, name: str, seconds: float, error: bool = False) -> None:
+        with self._lock:
+            self.calls[name] += 1
+            self.seconds[name] += seconds
+            self.buckets[name][bisect_left(BUCKETS, seconds)] += 1
+            if error:
+                self.errors[name] += 1
+
+    def add_bytes(self, direction: str, count: int) -> None:
+        with self._lock:
+            self.bytes[direction] += count
+
+    def cache(self, name: str, hit: bool) -> None:
+        with self._lock:
+            (self.hits if hit else self.misses)[name] += 1
+
+    def _quantile(self, name: str, q: float):
+        """Upper bucket bound below which a share q of the calls finished."""
+        counts = self.buckets[name]
+        target = q * sum(counts)
+        seen = 0
+        for bound, count in zip(BUCKETS + (float("inf"),), counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return float("inf")
+
+    def calls_table(self):
+        """One row per function, slowest total first (for st.dataframe)."""
+        with self._lock:
+            rows = [{
+                "function": name,
+                "calls": self.calls[name],
+                "errors": self.errors[name],
+                "total_ms": round(self.seconds[name] * 1000, 1),
+                "mean_ms": round(self.seconds[name] * 1000 / self.calls[name], 2),
+                "p95_ms_le": self._quantile(name, 0.95) * 1000,
+            } for name in self.calls]
+        return sorted(rows, key=lambda row: -row["total_ms"])
+
+    def cache_ratios(self):
+        with self._lock:
+            names = set(self.hits) | set(self.misses)
+            return {
+                name: f"{self.hits[name]}/{self.hits[name] + self.misses[name]} "
+                      f"({100 * self.hits[name] / (self.hits[name] + self.misses[name]):.0f}%)"
+                for name in sorted(names)
+            }
+
+    def prometheus(self) -> str:
+        """The figures in the Prometheus text exposition format."""
+        lines = [
+            "# HELP wishlist_call_seconds Latency of data layer and GitHub storage functions.",
+            "# TYPE wishlist_call_seconds histogram",
+        ]
+        with self._lock:
+            for name in sorted(self.calls):
+                label = f'function="{name}"'
+                cumulative = 0
+                for bound, count in zip(BUCKETS, self.buckets[name]):
+                    cumulative += count
+                    lines.append(f'wishlist_call_seconds_bucket{{{label},le="{bound}"}} {cumulative}')
+                lines.append(f'wishlist_call_seconds_bucket{{{label},le="+Inf"}} {self.calls[name]}')
+                lines.append(f"wishlist_call_seconds_sum{{{label}}} {self.seconds[name]:.6f}")
+                lines.append(f"wishlist_call_seconds_count{{{label}}} {self.calls[name]}")
+            lines += ["# HELP wishlist_call_errors_total Calls that raised.", "# TYPE wishlist_call_errors_total counter"]
+            lines += [f'wishlist_call_errors_total{{function="{name}"}} {self.errors[name]}' for name in sorted(self.calls)]
+            lines += ["# HELP wishlist_bytes_total Bytes sent to and received from GitHub.", "# TYPE wishlist_bytes_total counter"]
+            lines += [f'wishlist_bytes_total{{direction="{d}"}} {n}' for d, n in sorted(self.bytes.items())]
+            lines += ["# HELP wishlist_cache_requests_total Cache lookups by result.", "# TYPE wishlist_cache_requests_total counter"]
+            for name in sorted(set(self.hits) | set(self.misses)):
+                lines.append(f'wishlist_cache_requests_total{{cache="{name}",result="hit"}} {self.hits[name]}')
+                lines.append(f'wishlist_cache_requests_total{{cache="{name}",result="miss"}} {self.misses[name]}')
+        return "\n".join(lines) + "\n"
+
+
+# Figures since process start, and those of the current rerun and session (bound per script run)
+process = Collector()
+_rerun = contextvars.ContextVar("rerun_metrics", default=())
+
+
+def _collectors():
+    return (process,) + _rerun.get()
+
+
+def observe(name: str, seconds: float, error: bool = False) -> None:
+    for collector in _collectors():
+        collector.observe(name, seconds, error)
+    _ensure_exporter()
+
+
+def add_bytes(direction: str, count: int) -> None:
+    for collector in _collectors():
+        collector.add_bytes(direction, count)
+
+
+def cache(name: str, hit: bool) -> None:
+    for collector in _collectors():
+        collector.cache(name, hit)
+
+
+def instrumented(function):
+    """Record calls, errors and latency of a function under "<module>.<name>"."""
+    name = f"{function.__module__.rsplit('.', 1)[-1]}.{function.__name__}"
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        error = False
+        try:
+            return function(*args, **kwargs)
+        except BaseException:
+            error = True
+            raise
+        finally:
+            observe(name, time.perf_counter() - started, error)
+
+    return wrapper
+
+
+def begin_rerun(session_state) -> Collector:
+    """Collect the figures of this script run for the session; returns those of its previous run.
+
+    Called at the top of the app. Fragment reruns don't run the top, so fragments call
+    fragment_rerun() instead.
+    """
+    previous = session_state.get("_rerun_metrics")
+    current = Collector()
+    session_state["_rerun_metrics"] = current
+    if "_session_metrics" not in session_state:
+        session_state["_session_metrics"] = Collector()
+    _rerun.set((current, session_state["_session_metrics"]))
+    return previous
+
+
+def session_metrics(session_state):
+    """Figures of all reruns of this session so far, or None before its first run."""
+    return session_state.get("_session_metrics")
+
+
+def fragment_rerun(session_state) -> None:
+    """Start collecting for a fragment-only rerun (a no-op inside a full run)."""
+    if not _rerun.get():
+        begin_rerun(session_state)
+
+
+# Optional Prometheus text file (e.g. for node_exporter's textfile collector)
+_EXPORT_PATH = get_setting("WISHLIST_METRICS_FILE")
+_EXPORT_INTERVAL = get_float_setting("WISHLIST_METRICS_INTERVAL", 15.0)
+_exporter = None
+_exporter_lock = threading.Lock()
+
+
+def write_prometheus_file(path: str) -> None:
+    """Write the process figures to path atomically, so scrapers never read half a file."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.metrics', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as file:
+            os.chmod(tmp_path, 0o644)  # not mkstemp's 0600: the scraper usually runs as another user
+            file.write(process.prometheus())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _export_loop():
+    while True:
+        time.sleep(_EXPORT_INTERVAL)
+        try:
+            write_prometheus_file(_EXPORT_PATH)
+        except OSError:
+            pass
+
+
+def _ensure_exporter():
+    global _exporter
+    if _EXPORT_PATH and _exporter is None:
+        with _exporter_lock:
+            if _exporter is None:
+                _exporter = threading.Thread(target=_export_loop, name="metrics-export", daemon=True)
+                _exporter.start()
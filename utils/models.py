@@ -0,0 +1,113 @@
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+# First number in a price text: digits with optional thousands/decimal separators
+_NUMBER = re.compile(r"\d[\d.,'\u00a0\u202f ]*")
+
+
+def parse_price(text) -> Optional[int]:
+    """Parse a free-text price like "282€", "53,99 €", "1.299,00" or "$1,299.50" into cents.
+
+    The last "," or "." followed by one or two digits is the decimal separator; any other
+    separators group thousands. Returns None if the text contains no number.
+    """
+    if isinstance(text, (int, float)) and not isinstance(text, bool):
+        return int(round(text * 100))
+    if not text:
+        return None
+    match = _NUMBER.search(str(text))
+    if match is None:
+        return None
+    number = re.sub(r"[\s']", "", match.group()).rstrip(".,")
+    decimal = max(number.rfind(","), number.rfind("."))
+    if decimal >= 0 and 1 <= len(number) - decimal - 1 <= 2:
+        whole, fraction = number[:decimal], number[decimal + 1:]
+    else:
+        whole, fraction = number, ""
+    whole = re.sub(r"[.,]", "", whole) or "0"
+    return int(whole) * 100 + int(fraction.ljust(2, "0") or 0)
+
+
+def format_cents(cents: int) -> str:
+    """Format cents the German way, e.g. 129950 -> "1.299,50 €"."""
+    euros, rest = divmod(abs(cents), 100)
+    sign = "-" if cents < 0 else ""
+    return f"{sign}{euros:,}".replace(",", ".") + f",{rest:02d} €"
+
+
+@dataclass(slots=True)
+class Item:
+    """One wishlist entry. Unknown keys from storage are kept in `extra`."""
+
+    gift_name: str
+    purchase_link: str = ""
+    is_gifted: bool = False
+    price: str = ""
+    amazon_link: str = ""
+    is_highlight: bool = False
+    id: Optional[str] = None
+    extra: Dict = field(default_factory=dict)
+    price_cents: Optional[int] = field(init=False, default=None)
+
+    def __post_init__(self):
+        self.price_cents = parse_price(self.price)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Item":
+        known = {"id", "gift_name", "purchase_link", "is_gifted", "price", "amazon_link", "is_highlight"}
+        return cls(
+            gift_name=data.get("gift_name") or "",
+            purchase_link=data.get("purchase_link") or "",
+            is_gifted=bool(data.get("is_gifted", False)),
+            price=data.get("price") or "",
+            amazon_link=data.get("amazon_link") or "",
+            is_highlight=bool(data.get("is_highlight", False)),
+            id=data.get("id"),
+            extra={k: v for k, v in data.items() if k not in known},
+        )
+
+    def to_dict(self) -> Dict:
+        data = {"id": self.id} if self.id is not None else {}
+        data.update({
+            "gift_name": self.gift_name,
+            "purchase_link": self.purchase_link,
+            "is_gifted": self.is_gifted,
+            "price": self.price,
+            "amazon_link": self.amazon_link,
+            "is_highlight": self.is_highlight,
+        })
+        data.update(self.extra)
+        return data
+
+
+@dataclass(slots=True)
+class WishlistStats:
+    """Counts and values (in cents) of a wishlist; items without a parseable price count as 0."""
+
+    total_count: int = 0
+    gifted_count: int = 0
+    total_cents: int = 0
+    gifted_cents: int = 0
+
+    @property
+    def open_count(self) -> int:
+        return self.total_count - self.gifted_count
+
+    @property
+    def open_cents(self) -> int:
+        return self.total_cents - self.gifted_cents
+
+    def add(self, is_gifted: bool, cents: Optional[int]) -> None:
+        self.total_count += 1
+        self.total_cents += cents or 0
+        if is_gifted:
+            self.gifted_count += 1
+            self.gifted_cents += cents or 0
+
+    def remove(self, is_gifted: bool, cents: Optional[int]) -> None:
+        self.total_count -= 1
+        self.total_cents -= cents or 0
+        if is_gifted:
+            self.gifted_count -= 1
+            self.gifted_cents -= cents or 0
@@ -0,0 +1,127 @@
+import io
+import marshal
+import pstats
+import cProfile
+from collections import defaultdict
+
+# Session state keys
+_RUNS_LEFT = "_profile_runs_left"
+_PROFILER = "_profiler"
+_STATS = "_profile_stats"
+
+# Deeper call chains are cut off in the collapsed stacks
+_MAX_STACK_DEPTH = 64
+# Stacks below this much time are left out of the collapsed stacks
+_MIN_SECONDS = 0.0001
+
+
+def request_profile(session_state, runs: int) -> None:
+    """Profile the next `runs` script runs of this session (earlier results are dropped)."""
+    session_state[_RUNS_LEFT] = runs
+    session_state.pop(_STATS, None)
+
+
+def profiling_pending(session_state) -> int:
+    return session_state.get(_RUNS_LEFT, 0)
+
+
+def start_run(session_state) -> None:
+    """Called at the top of the app: start the profiler if runs are still requested.
+
+    Costs one dict lookup while profiling is off.
+    """
+    if _PROFILER in session_state:
+        # The previous run ended early (st.stop, st.rerun, an exception) before finish_run
+        finish_run(session_state)
+    if not session_state.get(_RUNS_LEFT):
+        return
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Another profiler is active in this interpreter (e.g. a concurrent session's); skip this run
+        return
+    session_state[_RUNS_LEFT] -= 1
+    session_state[_PROFILER] = profiler
+
+
+def finish_run(session_state) -> None:
+    """Called at the end of the app: stop the profiler and add the run to the results."""
+    profiler = session_state.pop(_PROFILER, None)
+    if profiler is None:
+        return
+    profiler.disable()
+    stats = session_state.get(_STATS)
+    if stats is None:
+        session_state[_STATS] = pstats.Stats(profiler, stream=io.StringIO())
+    else:
+        stats.add(profiler)
+
+
+def profile_results(session_state):
+    """Aggregated pstats.Stats of the profiled runs, or None."""
+    return session_state.get(_STATS)
+
+
+def _label(func) -> str:
+    filename, line, name = func
+    if filename == "~":
+        return name  # built-in
+    return f"{name} ({filename.rsplit('/', 1)[-1]}:{line})"
+
+
+def top_functions(stats: pstats.Stats, limit: int = 25):
+    """Rows of the functions with the highest cumulative time (for st.dataframe)."""
+    rows = [{
+        "function": _label(func),
+        "calls": nc,
+        "cumulative_ms": round(ct * 1000, 1),
+        "own_ms": round(tt * 1000, 1),
+        "file": func[0],
+    } for func, (cc, nc, tt, ct, callers) in stats.stats.items()]
+    rows.sort(key=lambda row: -row["cumulative_ms"])
+    return rows[:limit]
+
+
+def raw_profile(stats: pstats.Stats) -> bytes:
+    """The profile in the format of pstats.Stats.dump_stats (for snakeviz, pstats, ...)."""
+    return marshal.dumps(stats.stats)
+
+
+def collapsed_stacks(stats: pstats.Stats) -> str:
+    """Collapsed stacks ("a;b;c microseconds" per line) for flamegraph.pl or speedscope.
+
+    cProfile only records caller/callee pairs, not whole stacks, so each function's time
+    is split over its callers in proportion to the time spent under each of them.
+    """
+    children = defaultdict(list)
+    for func, (cc, nc, tt, ct, callers) in stats.stats.items():
+        for caller, edge in callers.items():
+            children[caller].append((func, edge[3]))
+    totals = defaultdict(float)
+
+    def walk(func, stack, share):
+        cc, nc, tt, ct, callers = stats.stats[func]
+        stack = stack + [_label(func)]
+        totals[";".join(stack)] += tt * share
+        if len(stack) >= _MAX_STACK_DEPTH:
+            return
+        for child, edge_time in children[func]:
+            # Time in child below this stack, if func's calls to it split like func's time
+            child_time = share * edge_time
+            if child_time < _MIN_SECONDS or _label(child) in stack:
+                continue  # too small to show (keeps the walk short), or recursion
+            walk(child, stack, child_time / stats.stats[child][3])
+
+    for func, (cc, nc, tt, ct, callers) in stats.stats.items():
+        if not ct:
+            continue
+        # Calls from frames entered before the profiler started (e.g. the script's <module>)
+        # have no caller, or one without an entry of its own; those calls start stacks
+        unattributed = ct - sum(edge[3] for edge in callers.values())
+        if unattributed > _MIN_SECONDS:
+            walk(func, [], unattributed / ct)
+        for caller, edge in callers.items():
+            if caller not in stats.stats and edge[3] > _MIN_SECONDS:
+                walk(func, [_label(caller)], edge[3] / ct)
+    return "".join(f"{stack} {round(seconds * 1e6)}\n" for stack, seconds in totals.items() if seconds >= 1e-6)
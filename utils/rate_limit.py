@@ -0,0 +1,135 @@
+import time
+import threading
+import contextvars
+from collections import Counter, deque
+from contextlib import contextmanager
+
+# Request priorities, most important first
+WRITE = 0        # user-initiated saves (also queued write-behind saves)
+INTERACTIVE = 1  # reads a user is waiting for
+BACKGROUND = 2   # replica syncs and other maintenance
+HEALTHCHECK = 3  # diagnostics self-tests
+
+PRIORITY_NAMES = {WRITE: "write", INTERACTIVE: "interactive", BACKGROUND: "background", HEALTHCHECK: "healthcheck"}
+
+_priority = contextvars.ContextVar("request_priority", default=None)
+
+
+class RateLimitDeferred(Exception):
+    """A low-priority request was not sent because the rate limit budget is running low."""
+
+    def __init__(self, priority: int, remaining: int, reset: float):
+        super().__init__(f"{PRIORITY_NAMES[priority]} request deferred: {remaining} requests left until reset")
+        self.priority = priority
+        self.remaining = remaining
+        self.reset = reset
+
+
+@contextmanager
+def request_priority(priority: int):
+    """Send the remote requests made inside the block with the given priority."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority(method: str) -> int:
+    """Priority of a request: the enclosing request_priority, else by method."""
+    priority = _priority.get()
+    if priority is not None:
+        return priority
+    return INTERACTIVE if method in ("GET", "HEAD") else WRITE
+
+
+class RateLimitScheduler:
+    """Tracks the API rate limit budget and decides which requests may still be sent.
+
+    Every response updates the budget from X-RateLimit-Limit/-Remaining/-Reset. The low
+    priorities leave a reserve to the more important requests: background work stops
+    while less than `background_reserve` of the budget is left, healthchecks already
+    below `healthcheck_reserve`. Shed requests raise RateLimitDeferred at once instead
+    of queueing, so no thread is parked behind them. Reads and writes of users may use
+    the whole budget; once it is exhausted they wait for the reset if it is at most
+    `max_wait` seconds away, and are deferred otherwise.
+    """
+
+    def __init__(self, background_reserve: float = 0.2, healthcheck_reserve: float = 0.4,
+                 max_wait: float = 30.0, window: float = 600.0):
+        self.background_reserve = background_reserve
+        self.healthcheck_reserve = healthcheck_reserve
+        self.max_wait = max_wait
+        self._window = window
+        self._lock = threading.Lock()
+        self.limit = None      # unknown until the first response
+        self.remaining = None
+        self.reset = None      # epoch seconds
+        self._sent = deque()   # monotonic send times within the window, for the burn rate
+        self.sent = Counter()  # by priority
+        self.deferred = Counter()
+
+    def _reserve(self, priority: int) -> int:
+        limit = self.limit or 0
+        if priority == HEALTHCHECK:
+            return int(limit * self.healthcheck_reserve)
+        if priority == BACKGROUND:
+            return int(limit * self.background_reserve)
+        return 0
+
+    def acquire(self, priority: int) -> None:
+        """Admit a request, wait for the reset, or raise RateLimitDeferred."""
+        with self._lock:
+            if self.remaining is not None and self.reset is not None and time.time() >= self.reset:
+                # A new window has started; the next response tells the real numbers
+                self.remaining = self.limit
+            remaining, reset = self.remaining, self.reset
+            wait = 0.0
+            if remaining is not None and remaining <= self._reserve(priority):
+                until_reset = (reset or 0) - time.time()
+                if priority <= INTERACTIVE and remaining <= 0 and until_reset <= self.max_wait:
+                    wait = max(0.0, until_reset)
+                else:
+                    self.deferred[priority] += 1
+                    raise RateLimitDeferred(priority, remaining, reset)
+            self.sent[priority] += 1
+            now = time.monotonic()
+            self._sent.append(now)
+            while self._sent and self._sent[0] < now - self._window:
+                self._sent.popleft()
+            if self.remaining is not None:
+                # Count the request now, so concurrent callers see it before its response
+                self.remaining -= 1
+        if wait > 0:
+            time.sleep(wait)
+
+    def update(self, headers) -> None:
+        """Take the budget from a response's rate limit headers (if it has them)."""
+        try:
+            remaining = int(headers["X-RateLimit-Remaining"])
+            reset = float(headers["X-RateLimit-Reset"])
+            limit = int(headers.get("X-RateLimit-Limit") or max(remaining, self.limit or 0))
+        except (KeyError, TypeError, ValueError):
+            return
+        with self._lock:
+            self.limit, self.remaining, self.reset = limit, remaining, reset
+
+    def status(self):
+        """Budget, burn rate and the projected budget left when the window resets."""
+        with self._lock:
+            now = time.monotonic()
+            recent = sum(1 for t in self._sent if t >= now - self._window)
+            per_minute = recent * 60.0 / self._window
+            until_reset = max(0.0, (self.reset or time.time()) - time.time())
+            projected = None
+            if self.remaining is not None:
+                projected = round(self.remaining - per_minute * until_reset / 60.0)
+            return {
+                "rate_limit": self.limit,
+                "rate_remaining": self.remaining,
+                "rate_reset_in_s": round(until_reset),
+                "requests_per_minute": round(per_minute, 1),
+                "projected_remaining_at_reset": projected,
+                "sent": {PRIORITY_NAMES[p]: n for p, n in sorted(self.sent.items())},
+                "deferred": {PRIORITY_NAMES[p]: n for p, n in sorted(self.deferred.items())},
+            }
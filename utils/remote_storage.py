@@ -1,43 +1,77 @@
-import os
 import json
+import time
+import random
 import base64
+import hashlib
+import tarfile
+import threading
+from collections import OrderedDict, deque
+from contextlib import contextmanager
 import requests
-try:
-    import streamlit as st  # for st.secrets on Streamlit Cloud
-except Exception:
-    st = None
+from requests.adapters import HTTPAdapter
+from .config import get_setting, get_int_setting, get_float_setting, github_settings
+from .rate_limit import RateLimitScheduler, current_priority
+from . import metrics
+from .metrics import instrumented
+
+
+_BRANCH = "main"
+
+# API root; point GH_API_URL elsewhere for GitHub Enterprise or a local stand-in (see benchmarks/)
+_API_URL = (get_setting("GH_API_URL") or "https://api.github.com").rstrip("/")
+
+# Process-wide read cache shared by all sessions: (repo, path) -> {"body", "sha", "etag"}
+_CACHE_MAX_ENTRIES = get_int_setting("GH_CACHE_SIZE", 128)
+_read_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+# HTTP settings: (connect, read) timeouts in seconds and retry policy
+_TIMEOUT = (get_float_setting("GH_CONNECT_TIMEOUT", 3.05), get_float_setting("GH_READ_TIMEOUT", 10.0))
+_MAX_RETRIES = get_int_setting("GH_MAX_RETRIES", 3)
+_MAX_RETRY_WAIT = get_float_setting("GH_MAX_RETRY_WAIT", 30.0)
+_BACKOFF_BASE = 0.5
+_BACKOFF_CAP = 8.0
+
+# One connection pool shared by all threads; each thread gets its own Session on top of it
+_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=get_int_setting("GH_POOL_SIZE", 10))
+_local = threading.local()
+
+# Every request passes the scheduler, which tracks the API rate limit budget and
+# sheds background and healthcheck requests before it runs out
+_scheduler = RateLimitScheduler(
+    background_reserve=get_float_setting("GH_RATE_BACKGROUND_RESERVE", 0.2),
+    healthcheck_reserve=get_float_setting("GH_RATE_HEALTHCHECK_RESERVE", 0.4),
+    max_wait=_MAX_RETRY_WAIT,
+)
+
+# Recent calls for the diagnostics panel: {"method", "path", "status", "ms", "attempt"}
+_call_log = deque(maxlen=50)
+
+# Last known blob SHA per (repo, path), learned from reads and write responses.
+# None means the file is known not to exist; a missing key means "never seen".
+_known_shas = {}
+
+# Last known head of _BRANCH per repo: (commit_sha, tree_sha)
+_branch_heads = {}
+# Files as of the head our last commit built: repo -> (commit_sha, {path: (content, blob_sha)}).
+# Only used while that commit is the head we build on again; if the branch moved
+# meanwhile, the fast-forward fails and the retry reads the files anew.
+_head_files = {}
+# Commits of this process go one at a time: only one of several racing commits could
+# fast-forward the branch, the others would just rebuild and retry
+_commit_lock = threading.Lock()
+
+# Optional local mirror of GH_PATH (see replica.py): serves reads and receives our writes
+_replica = None
+
+
+class RemoteConflictError(Exception):
+    """The file changed on GitHub since the SHA the caller expected."""
 
 
 def _get_secrets():
-    """Fetch required secrets. Prefer st.secrets on Streamlit Cloud, fallback to environment variables locally."""
-    token = None
-    repo = None
-    path_prefix = None
-    # Prefer st.secrets if available
-    if st is not None:
-        try:
-            # Try top-level keys first
-            token = st.secrets.get("GH_TOKEN")
-            repo = st.secrets.get("GH_REPO")
-            path_prefix = st.secrets.get("GH_PATH")
-
-            # If not found, try [general] section
-            # Note: st.secrets returns AttrDict, not plain dict, so use hasattr/getattr
-            general = st.secrets.get("general")
-            if general is not None and hasattr(general, "get"):
-                if not token:
-                    token = general.get("GH_TOKEN")
-                if not repo:
-                    repo = general.get("GH_REPO")
-                if not path_prefix:
-                    path_prefix = general.get("GH_PATH")
-        except Exception:
-            pass
-    # Fallback to environment
-    token = token or os.environ.get("GH_TOKEN")
-    repo = repo or os.environ.get("GH_REPO")  # e.g., "TimRehbronn/Wishlist"
-    path_prefix = path_prefix or os.environ.get("GH_PATH", "cloud-data")  # folder in repo to store files
-    return token, repo, path_prefix
+    """Token, repo and path prefix (the app's secrets, else environment variables; read once per process)."""
+    return github_settings()
 
 
 def _gh_headers(token: str):
@@ -48,111 +82,701 @@ def _gh_headers(token: str):
 
 
 def _repo_api(repo: str):
-    return f"https://api.github.com/repos/{repo}"
+    return f"{_API_URL}/repos/{repo}"
+
+
+def _get_session() -> requests.Session:
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        session.mount("https://", _adapter)
+        session.mount("http://", _adapter)
+        _local.session = session
+    return session
+
+
+def _backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff."""
+    return random.uniform(0, min(_BACKOFF_CAP, _BACKOFF_BASE * (2 ** attempt)))
+
+
+def _retry_delay(r, attempt: int):
+    """Seconds to wait before retrying response r, or None if it should not be retried."""
+    rate_limited = r.status_code == 429 or (
+        r.status_code == 403 and (
+            "Retry-After" in r.headers or "secondary rate limit" in r.text.lower()
+        )
+    )
+    if not rate_limited and r.status_code < 500:
+        return None
+    retry_after = r.headers.get("Retry-After")
+    if retry_after is not None:
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            delay = _backoff_delay(attempt)
+    else:
+        delay = _backoff_delay(attempt)
+    # Don't park the script thread for minutes; let the caller see the error instead
+    if delay > _MAX_RETRY_WAIT:
+        return None
+    return delay
+
+
+def _record_call(method: str, url: str, status, started: float, attempt: int):
+    seconds = time.perf_counter() - started
+    _call_log.append({
+        "method": method,
+        "path": url.split("/repos/", 1)[-1].split("/", 2)[-1],
+        "status": status,
+        "ms": round(seconds * 1000, 1),
+        "attempt": attempt,
+    })
+    metrics.observe(f"http.{method}", seconds, error=status is None or status >= 500 or status in (403, 429))
+
+
+def _request(method: str, url: str, token: str, headers=None, **kwargs):
+    """Send a GitHub API request over the pooled session with timeouts and retries.
+
+    Raises RateLimitDeferred if the scheduler holds the request back.
+    """
+    all_headers = _gh_headers(token)
+    if headers:
+        all_headers.update(headers)
+    session = _get_session()
+    priority = current_priority(method)
+    for attempt in range(_MAX_RETRIES + 1):
+        _scheduler.acquire(priority)
+        started = time.perf_counter()
+        try:
+            r = session.request(method, url, headers=all_headers, timeout=_TIMEOUT, **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            _record_call(method, url, None, started, attempt)
+            if attempt == _MAX_RETRIES:
+                raise
+            time.sleep(_backoff_delay(attempt))
+            continue
+        _record_call(method, url, r.status_code, started, attempt)
+        _scheduler.update(r.headers)
+        body = r.request.body
+        metrics.add_bytes("sent", len(body) if body else 0)
+        # Streamed downloads are counted by their announced size, without reading them here
+        received = r.headers.get("Content-Length")
+        if received and received.isdigit():
+            metrics.add_bytes("received", int(received))
+        elif not kwargs.get("stream"):
+            metrics.add_bytes("received", len(r.content))
+        delay = _retry_delay(r, attempt)
+        if delay is None or attempt == _MAX_RETRIES:
+            return r
+        time.sleep(delay)
 
 
+def get_request_log():
+    """Recent GitHub API calls with status and latency, newest last."""
+    return list(_call_log)
+
+
+def get_rate_limit_status():
+    """Rate limit budget, burn rate and projected headroom (see RateLimitScheduler.status)."""
+    return _scheduler.status()
+
+
+@instrumented
 def remote_available() -> bool:
     token, repo, _ = _get_secrets()
     return bool(token and repo)
 
 
+def attach_replica(replica):
+    """Serve file reads from replica and mirror every write into it (None detaches)."""
+    global _replica
+    _replica = replica
+
+
+def get_replica():
+    return _replica
+
+
+def _mirror(path: str, content):
+    """Pass a landed write (bytes, or None for a delete) on to the replica."""
+    replica = _replica
+    if replica is not None:
+        replica.store(path, content)
+
+
+def _cache_get(repo: str, path: str):
+    with _cache_lock:
+        entry = _read_cache.get((repo, path))
+        if entry is not None:
+            _read_cache.move_to_end((repo, path))
+        return entry
+
+
+def _cache_put(repo: str, path: str, body: str, sha, etag):
+    with _cache_lock:
+        _read_cache[(repo, path)] = {"body": body, "sha": sha, "etag": etag}
+        _read_cache.move_to_end((repo, path))
+        while len(_read_cache) > _CACHE_MAX_ENTRIES:
+            _read_cache.popitem(last=False)
+
+
+def _cache_invalidate(repo: str, path: str):
+    with _cache_lock:
+        _read_cache.pop((repo, path), None)
+
+
+@instrumented
+def clear_read_cache():
+    """Drop all cached file bodies and SHAs (e.g. after editing files directly on GitHub)."""
+    with _cache_lock:
+        _read_cache.clear()
+        _known_shas.clear()
+        _head_files.clear()
+
+
+def _remember_sha(repo: str, path: str, sha):
+    with _cache_lock:
+        _known_shas[(repo, path)] = sha
+
+
+def _remember_head(repo: str, commit):
+    """Track the branch head from a commit object returned by the API."""
+    if commit and commit.get("sha") and (commit.get("tree") or {}).get("sha"):
+        with _cache_lock:
+            _branch_heads[repo] = (commit["sha"], commit["tree"]["sha"])
+
+
+def _git_blob_sha(content: bytes) -> str:
+    """Blob SHA git assigns to content, so commits need no read-back."""
+    return hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+
+
+@instrumented
 def _get_file_sha(token: str, repo: str, path: str):
     url = f"{_repo_api(repo)}/contents/{path}"
-    r = requests.get(url, headers=_gh_headers(token))
+    r = _request("GET", url, token)
     if r.status_code == 200:
-        return r.json().get("sha")
+        sha = r.json().get("sha")
+        _remember_sha(repo, path, sha)
+        return sha
+    if r.status_code == 404:
+        _remember_sha(repo, path, None)
     return None
 
 
-def _put_file(token: str, repo: str, path: str, content: bytes, message: str):
+@instrumented
+def _put_file(token: str, repo: str, path: str, content: bytes, message: str, expected_sha=None):
+    """Create or update a file.
+
+    With expected_sha the write only succeeds if the file is still at that blob SHA
+    (RemoteConflictError otherwise); without it the last writer wins.
+    """
     url = f"{_repo_api(repo)}/contents/{path}"
-    sha = _get_file_sha(token, repo, path)
     data = {
         "message": message,
         "content": base64.b64encode(content).decode("utf-8"),
-        "branch": "main",
+        "branch": _BRANCH,
     }
+    # Send the SHA we already know; an unknown file is tried as a create
+    sha = expected_sha or _known_shas.get((repo, path))
     if sha:
         data["sha"] = sha
-    r = requests.put(url, headers=_gh_headers(token), json=data)
+    r = _request("PUT", url, token, json=data)
+    if r.status_code in (409, 422) and expected_sha:
+        if _replica is not None:
+            # The caller worked from a stale replica copy; its retry must see the current file
+            _replica.refresh(path)
+        raise RemoteConflictError(path)
+    if r.status_code in (409, 422):
+        # Stale or missing SHA: look up the current one and try once more
+        sha = _get_file_sha(token, repo, path)
+        data.pop("sha", None)
+        if sha:
+            data["sha"] = sha
+        r = _request("PUT", url, token, json=data)
     r.raise_for_status()
-    return r.json()
+    result = r.json()
+    _remember_head(repo, result.get("commit"))
+    new_sha = (result.get("content") or {}).get("sha")
+    _remember_sha(repo, path, new_sha)
+    # Keep our own write visible with the response's ETag, so the next read is a 304.
+    # A body without one could never be revalidated, so then the next read fetches it.
+    etag = r.headers.get("ETag")
+    if etag:
+        _cache_put(repo, path, content.decode("utf-8"), new_sha, etag)
+    else:
+        _cache_invalidate(repo, path)
+    _mirror(path, content)
+    return result
 
 
 def _get_file(token: str, repo: str, path: str):
+    return _get_file_versioned(token, repo, path)[0]
+
+
+@instrumented
+def _get_file_versioned(token: str, repo: str, path: str):
+    """Return (content, blob_sha) of a file, or (None, None) if it is missing."""
+    replica = _replica
+    if replica is not None:
+        hit = replica.read(path)
+        metrics.cache("replica", hit is not None)
+        if hit is not None:
+            if hit[1]:
+                _remember_sha(repo, path, hit[1])
+            return hit
+    return _fetch_file_versioned(token, repo, path)
+
+
+@instrumented
+def _fetch_file_versioned(token: str, repo: str, path: str, ref=None):
+    """Like _get_file_versioned, but always asks GitHub (revalidating the read cache).
+
+    With ref (a commit SHA) the file is read as of that commit.
+    """
     url = f"{_repo_api(repo)}/contents/{path}"
-    r = requests.get(url, headers=_gh_headers(token))
+    headers = {}
+    cached = _cache_get(repo, path)
+    if cached is not None and cached["etag"]:
+        headers["If-None-Match"] = cached["etag"]
+    r = _request("GET", url, token, headers=headers, params={"ref": ref} if ref else None)
+    if r.status_code == 304 and cached is not None:
+        metrics.cache("github_read_cache", True)
+        return cached["body"], cached["sha"]
+    metrics.cache("github_read_cache", False)
     if r.status_code == 200:
         j = r.json()
         content_b64 = j.get("content", "")
         if content_b64:
-            return base64.b64decode(content_b64).decode("utf-8")
-    return None
+            body = base64.b64decode(content_b64).decode("utf-8")
+            _remember_sha(repo, path, j.get("sha"))
+            _cache_put(repo, path, body, j.get("sha"), r.headers.get("ETag"))
+            return body, j.get("sha")
+    elif r.status_code == 404:
+        _remember_sha(repo, path, None)
+        _cache_invalidate(repo, path)
+    return None, None
+
+
+def _get_ref(token: str, repo: str) -> str:
+    """Commit SHA _BRANCH currently points at."""
+    r = _request("GET", f"{_repo_api(repo)}/git/ref/heads/{_BRANCH}", token)
+    r.raise_for_status()
+    return r.json()["object"]["sha"]
+
+
+def _get_tree_sha(token: str, repo: str, commit_sha: str) -> str:
+    r = _request("GET", f"{_repo_api(repo)}/git/commits/{commit_sha}", token)
+    r.raise_for_status()
+    return r.json()["tree"]["sha"]
+
+
+@instrumented
+def _get_head(token: str, repo: str):
+    commit_sha = _get_ref(token, repo)
+    head = (commit_sha, _get_tree_sha(token, repo, commit_sha))
+    with _cache_lock:
+        _branch_heads[repo] = head
+    return head
+
+
+def _file_at(token: str, repo: str, path: str, commit_sha: str, files: dict):
+    """(content, blob_sha) of path as of commit_sha; files caches what is known at that commit."""
+    if path not in files:
+        files[path] = _fetch_file_versioned(token, repo, path, ref=commit_sha)
+    return files[path]
+
+
+@instrumented
+def _commit_files(token: str, repo: str, changes: dict, message: str, attempts: int = 5):
+    """Apply several path changes as a single commit via the Git Data API.
+
+    changes maps repo path -> bytes to write, None to delete the file, or a function that
+    gets the file's current content (bytes, or None if missing) and returns one of those.
+    Functions and deletes are resolved against the commit each attempt builds on, so when
+    the branch moved they are applied again to the new content instead of overwriting it.
+    Text content is sent inline in the tree, so no separate blob requests are needed.
+    """
+    with _commit_lock:
+        return _commit_files_locked(token, repo, changes, message, attempts)
+
+
+def _commit_files_locked(token: str, repo: str, changes: dict, message: str, attempts: int):
+    api = _repo_api(repo)
+    head = _branch_heads.get(repo)
+    for attempt in range(attempts):
+        if head is None or attempt > 0:
+            head = _get_head(token, repo)
+        parent_sha, base_tree = head
+        known_sha, files = _head_files.get(repo, (None, {}))
+        files = dict(files) if known_sha == parent_sha else {}
+        resolved = {}
+        for path, change in changes.items():
+            if change is None or callable(change):
+                content, sha = _file_at(token, repo, path, parent_sha, files)
+                if callable(change):
+                    current = content.encode("utf-8") if content is not None else None
+                    change = change(current)
+                    if change == current:
+                        continue  # left as it is
+                if change is None and sha is None:
+                    continue  # deleting a path that is not in the tree is rejected by GitHub
+            resolved[path] = change
+        if not resolved:
+            _head_files[repo] = (parent_sha, files)
+            return parent_sha
+        tree = []
+        for path, content in resolved.items():
+            if content is None:
+                tree.append({"path": path, "mode": "100644", "type": "blob", "sha": None})
+            else:
+                tree.append({"path": path, "mode": "100644", "type": "blob", "content": content.decode("utf-8")})
+        r = _request("POST", f"{api}/git/trees", token, json={"base_tree": base_tree, "tree": tree})
+        r.raise_for_status()
+        tree_sha = r.json()["sha"]
+        r = _request("POST", f"{api}/git/commits", token, json={
+            "message": message,
+            "tree": tree_sha,
+            "parents": [parent_sha],
+        })
+        r.raise_for_status()
+        commit_sha = r.json()["sha"]
+        # Fast-forward only: if the branch moved meanwhile, rebuild on the new head
+        r = _request("PATCH", f"{api}/git/refs/heads/{_BRANCH}", token, json={"sha": commit_sha, "force": False})
+        if r.status_code == 422 and attempt < attempts - 1:
+            time.sleep(_backoff_delay(attempt) / 4)  # spread out writers racing for the branch
+            continue
+        r.raise_for_status()
+        break
 
+    with _cache_lock:
+        _branch_heads[repo] = (commit_sha, tree_sha)
+    for path, content in resolved.items():
+        if content is None:
+            files[path] = (None, None)
+            _remember_sha(repo, path, None)
+            _cache_invalidate(repo, path)
+        else:
+            sha = _git_blob_sha(content)
+            files[path] = (content.decode("utf-8"), sha)
+            _remember_sha(repo, path, sha)
+            _cache_put(repo, path, files[path][0], sha, None)
+        _mirror(path, content)
+    while len(files) > _CACHE_MAX_ENTRIES:
+        files.pop(next(iter(files)))
+    _head_files[repo] = (commit_sha, files)
+    return commit_sha
 
-def list_index_path(prefix: str) -> str:
-    return f"{prefix}/wishlists_index.json"
+
+class RemoteTransaction:
+    """Collects file writes and deletes that are committed together."""
+
+    def __init__(self, token: str, repo: str, message: str):
+        self.token = token
+        self.repo = repo
+        self.message = message
+        self.changes = {}
+
+    def put(self, path: str, content: bytes):
+        self.changes[path] = content
+
+    def update(self, path: str, change):
+        """Write change(current content or None) -> bytes or None, computed on the commit's base."""
+        self.changes[path] = change
+
+    def delete(self, path: str):
+        self.changes[path] = None
+
+    def commit(self):
+        if self.changes:
+            return _commit_files(self.token, self.repo, self.changes, self.message)
+        return None
+
+
+@contextmanager
+def remote_transaction(message: str):
+    """Group several remote path changes into one atomic commit on exit.
+
+    Usage:
+        with remote_transaction("feat: ...") as txn:
+            txn.put(path, payload)
+            txn.update(index_path, lambda content: add_entry(content))
+            txn.delete(other_path)
+    Nothing is written if the block raises.
+    """
+    token, repo, _ = _get_secrets()
+    txn = RemoteTransaction(token, repo, message)
+    yield txn
+    txn.commit()
+
+
+def _dump(data) -> bytes:
+    return json.dumps(data, indent=4, ensure_ascii=False).encode("utf-8")
+
+
+def list_index_path(prefix: str, name: str = "wishlists_index.json") -> str:
+    return f"{prefix}/{name}"
 
 
 def wishlist_path(prefix: str, wishlist_id: str) -> str:
     return f"{prefix}/wishlist_{wishlist_id}.json"
 
 
+@instrumented
 def get_all_wishlists_remote():
+    from .storage.github_backend import GitHubBackend
+    return GitHubBackend().list_wishlists()
+
+
+@instrumented
+def save_wishlists_index_remote(wishlists):
+    from .storage.github_backend import GitHubBackend
+    GitHubBackend().save_index(wishlists)
+
+
+@instrumented
+def read_index_file_remote(name: str):
+    """Parsed content of one index file (see storage.index), or None."""
     token, repo, prefix = _get_secrets()
     if not remote_available():
-        return []
-    content = _get_file(token, repo, list_index_path(prefix))
+        return None
+    content = _get_file(token, repo, list_index_path(prefix, name))
     if not content:
-        return []
+        return None
     try:
         return json.loads(content)
     except Exception:
-        return []
+        return None
 
 
-def save_wishlists_index_remote(wishlists):
+@instrumented
+def modify_index_file_remote(name: str, change, attempts: int = 5):
+    """Read-modify-write of one index file, conditional on its blob SHA."""
     token, repo, prefix = _get_secrets()
     if not remote_available():
         return
-    payload = json.dumps(wishlists, indent=4, ensure_ascii=False).encode("utf-8")
-    _put_file(token, repo, list_index_path(prefix), payload, "chore: update wishlists index")
+    path = list_index_path(prefix, name)
+    for _ in range(attempts):
+        content, sha = _get_file_versioned(token, repo, path)
+        try:
+            current = json.loads(content) if content else None
+        except ValueError:
+            current = None
+        try:
+            _put_file(token, repo, path, _dump(change(current)), "chore: update wishlists index", expected_sha=sha)
+            return
+        except RemoteConflictError:
+            continue
+    raise RemoteConflictError(path)
+
+
+@instrumented
+def replace_index_files_remote(files):
+    """Write (or, for None, delete) several index files in one commit."""
+    _, _, prefix = _get_secrets()
+    if not remote_available():
+        return
+    with remote_transaction("chore: update wishlists index") as txn:
+        for name, payload in files.items():
+            if payload is None:
+                txn.delete(list_index_path(prefix, name))
+            else:
+                txn.put(list_index_path(prefix, name), _dump(payload))
 
 
+@instrumented
 def load_wishlist_remote(wishlist_id: str):
+    return load_wishlist_remote_versioned(wishlist_id)[0]
+
+
+@instrumented
+def load_wishlist_remote_versioned(wishlist_id: str):
+    """Return (wishlist, blob_sha); the SHA serves as the version for conditional saves."""
     token, repo, prefix = _get_secrets()
     if not remote_available():
-        return None
-    content = _get_file(token, repo, wishlist_path(prefix, wishlist_id))
+        return None, None
+    content, sha = _get_file_versioned(token, repo, wishlist_path(prefix, wishlist_id))
     if not content:
-        return None
+        return None, None
     try:
-        return json.loads(content)
+        return json.loads(content), sha
     except Exception:
-        return None
+        return None, None
+
 
+def _index_update(change):
+    """A transaction update applying change(entries) -> entries to an index file's JSON."""
+    def update(content):
+        try:
+            current = json.loads(content) if content else None
+        except ValueError:
+            current = None
+        return _dump(change(current))
+    return update
+
+
+@instrumented
+def save_wishlist_remote(wishlist_id: str, data: dict, expected_sha=None):
+    """Save a wishlist and return its new blob SHA.
 
-def save_wishlist_remote(wishlist_id: str, data: dict):
+    With expected_sha, raise RemoteConflictError if the file changed since that version.
+    """
     token, repo, prefix = _get_secrets()
+    if not remote_available():
+        return None
+    payload = _dump(data)
+    result = _put_file(token, repo, wishlist_path(prefix, wishlist_id), payload,
+                       f"feat: update wishlist {wishlist_id}", expected_sha=expected_sha)
+    return (result.get("content") or {}).get("sha")
+
+
+@instrumented
+def save_wishlists_remote(writes: dict):
+    """Save several wishlists in one commit; returns {wishlist_id: new blob SHA, or None if stale}.
+
+    writes maps wishlist IDs to (data, expected_sha). A wishlist that is no longer at its
+    expected_sha is left as it is, so the caller can merge and save it on its own.
+    """
+    _, _, prefix = _get_secrets()
+    if not remote_available():
+        return {}
+    versions = {}
+
+    def conditional(wishlist_id, payload, expected_sha):
+        # Runs on the commit each attempt builds on, so a retry checks again
+        def change(current):
+            if current is None or _git_blob_sha(current) != expected_sha:
+                versions[wishlist_id] = None
+                return current
+            versions[wishlist_id] = _git_blob_sha(payload)
+            return payload
+        return change
+
+    with remote_transaction(f"feat: update {len(writes)} wishlists") as txn:
+        for wishlist_id, (data, expected_sha) in writes.items():
+            payload = _dump(data)
+            if expected_sha:
+                txn.update(wishlist_path(prefix, wishlist_id), conditional(wishlist_id, payload, expected_sha))
+            else:
+                txn.put(wishlist_path(prefix, wishlist_id), payload)
+                versions[wishlist_id] = _git_blob_sha(payload)
+    return versions
+
+
+@instrumented
+def update_index_files_remote(index_changes: dict):
+    """Apply change(entries) -> entries to several index files (by name) in one commit."""
+    _, _, prefix = _get_secrets()
     if not remote_available():
         return
-    payload = json.dumps(data, indent=4, ensure_ascii=False).encode("utf-8")
-    _put_file(token, repo, wishlist_path(prefix, wishlist_id), payload, f"feat: update wishlist {wishlist_id}")
+    with remote_transaction("chore: update wishlists index") as txn:
+        for name, change in index_changes.items():
+            txn.update(list_index_path(prefix, name), _index_update(change))
+
+
+@instrumented
+def create_wishlist_remote(wishlist_id: str, data: dict, index_changes: dict):
+    """Write a new wishlist file together with the index in one commit.
+
+    index_changes maps index file names to change(entries) -> entries (one of them adds
+    the entry); they run on the index as of the commit.
+    """
+    _, _, prefix = _get_secrets()
+    if not remote_available():
+        return
+    with remote_transaction(f"feat: create wishlist {wishlist_id}") as txn:
+        txn.put(wishlist_path(prefix, wishlist_id), _dump(data))
+        for name, change in index_changes.items():
+            txn.update(list_index_path(prefix, name), _index_update(change))
+
 
+@instrumented
+def delete_wishlist_remote(wishlist_id: str, index_changes=None):
+    """Delete a wishlist file from GitHub (optional - file may not exist).
 
-def delete_wishlist_remote(wishlist_id: str):
-    """Delete a wishlist file from GitHub (optional - file may not exist)"""
+    With index_changes (see create_wishlist_remote), the index updates and the delete are
+    committed together.
+    """
     token, repo, prefix = _get_secrets()
     if not remote_available():
         return
     path = wishlist_path(prefix, wishlist_id)
-    sha = _get_file_sha(token, repo, path)
+    if index_changes is not None:
+        with remote_transaction(f"chore: delete wishlist {wishlist_id}") as txn:
+            for name, change in index_changes.items():
+                txn.update(list_index_path(prefix, name), _index_update(change))
+            txn.delete(path)
+        return
+    if (repo, path) in _known_shas:
+        sha = _known_shas[(repo, path)]
+    else:
+        sha = _get_file_sha(token, repo, path)
     if sha:
         url = f"{_repo_api(repo)}/contents/{path}"
         data = {
             "message": f"chore: delete wishlist {wishlist_id}",
             "sha": sha,
-            "branch": "main",
+            "branch": _BRANCH,
         }
-        requests.delete(url, headers=_gh_headers(token), json=data)
+        r = _request("DELETE", url, token, json=data)
+        if r.status_code in (409, 422):
+            sha = _get_file_sha(token, repo, path)
+            if sha:
+                data["sha"] = sha
+                r = _request("DELETE", url, token, json=data)
+        if r.ok:
+            _remember_head(repo, r.json().get("commit"))
+    _remember_sha(repo, path, None)
+    _cache_invalidate(repo, path)
+    _mirror(path, None)
+
+
+@instrumented
+def get_branch_head_remote():
+    """Commit SHA of the branch head (one request)."""
+    token, repo, _ = _get_secrets()
+    return _get_ref(token, repo)
+
+
+@instrumented
+def list_folder_remote(commit_sha: str):
+    """Blob SHAs of all files below GH_PATH at a commit: {path relative to GH_PATH: sha}."""
+    token, repo, prefix = _get_secrets()
+    tree_sha = _get_tree_sha(token, repo, commit_sha)
+    r = _request("GET", f"{_repo_api(repo)}/git/trees/{tree_sha}", token, params={"recursive": "1"})
+    r.raise_for_status()
+    j = r.json()
+    if j.get("truncated"):
+        raise RuntimeError("GitHub truncated the tree listing")
+    folder = prefix.rstrip("/") + "/"
+    return {
+        entry["path"][len(folder):]: entry["sha"]
+        for entry in j.get("tree", [])
+        if entry.get("type") == "blob" and entry["path"].startswith(folder)
+    }
+
+
+@instrumented
+def get_blob_remote(sha: str) -> bytes:
+    token, repo, _ = _get_secrets()
+    r = _request("GET", f"{_repo_api(repo)}/git/blobs/{sha}", token)
+    r.raise_for_status()
+    return base64.b64decode(r.json().get("content", ""))
 
+
+def download_folder_remote(commit_sha: str):
+    """Yield (path relative to GH_PATH, bytes) for all files below GH_PATH at a commit.
+
+    Streams the repository tarball, so the whole folder costs a single request.
+    """
+    token, repo, prefix = _get_secrets()
+    r = _request("GET", f"{_repo_api(repo)}/tarball/{commit_sha}", token, stream=True)
+    r.raise_for_status()
+    folder = prefix.rstrip("/") + "/"
+    with r, tarfile.open(fileobj=r.raw, mode="r|gz") as archive:
+        for member in archive:
+            # Members live under a top-level "<owner>-<repo>-<sha>/" folder
+            parts = member.name.split("/", 1)
+            if member.isfile() and len(parts) == 2 and parts[1].startswith(folder):
+                yield parts[1][len(folder):], archive.extractfile(member).read()
@@ -0,0 +1,220 @@
+import os
+import json
+import time
+import tempfile
+import threading
+from collections import deque
+from . import remote_storage
+from .rate_limit import BACKGROUND, RateLimitDeferred, request_priority
+
+MANIFEST_FILE = ".replica.json"
+
+
+class Replica:
+    """Local copy of the GH_PATH folder, in the same layout as the JSON backend's data folder.
+
+    The first sync downloads the whole folder as one tarball; later syncs compare the branch
+    head (one request while nothing changed) and then fetch only the blobs whose SHA differs
+    from the local copy. Once synced, remote_storage serves reads from here, so reads keep
+    working while GitHub is unreachable. Writes still go to GitHub first and are mirrored
+    here once they have landed.
+
+    The copy survives restarts: .replica.json records the commit and blob SHAs it reflects.
+    """
+
+    def __init__(self, directory: str, prefix: str, interval: float = 30.0, archive_threshold: int = 20):
+        self.directory = directory
+        self.interval = interval
+        # Fetching at least this many files at once uses the tarball instead of single blobs
+        self.archive_threshold = archive_threshold
+        self._folder = prefix.rstrip("/") + "/"
+        self._lock = threading.Lock()
+        self._commit = None
+        self._blobs = {}    # name -> blob SHA of the local file
+        self._written = {}  # name -> time.monotonic() of our last local write
+        self._stop = threading.Event()
+        self._thread = None
+        self.last_sync = None
+        self.errors = deque(maxlen=20)
+        os.makedirs(directory, exist_ok=True)
+        self._load_manifest()
+
+    def _load_manifest(self):
+        try:
+            with open(os.path.join(self.directory, MANIFEST_FILE), 'r', encoding='utf-8') as file:
+                manifest = json.load(file)
+        except (OSError, ValueError):
+            return
+        self._commit = manifest.get("commit")
+        self._blobs = manifest.get("blobs", {})
+
+    def _save_manifest(self):
+        self._write_file(MANIFEST_FILE, json.dumps({"commit": self._commit, "blobs": self._blobs}).encode("utf-8"))
+
+    def _write_file(self, name: str, content: bytes):
+        # Temp file + rename, so readers never see half a file; no fsync, a lost
+        # file is simply fetched again by the next sync
+        filename = os.path.join(self.directory, name)
+        directory = os.path.dirname(filename)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(filename), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                os.chmod(tmp_path, 0o644)  # readable like a JSON data folder, not mkstemp's 0600
+                file.write(content)
+            os.replace(tmp_path, filename)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _remove_file(self, name: str):
+        try:
+            os.remove(os.path.join(self.directory, name))
+        except FileNotFoundError:
+            pass
+
+    def _name(self, path: str):
+        """Name inside the replica for a repository path, or None if it is outside GH_PATH."""
+        if path.startswith(self._folder):
+            return path[len(self._folder):]
+        return None
+
+    @property
+    def ready(self) -> bool:
+        return self._commit is not None
+
+    def read(self, path: str):
+        """(content, blob_sha) of a file, (None, None) if it does not exist, or None if the
+        replica cannot answer (not synced yet, or the path is outside GH_PATH)."""
+        name = self._name(path)
+        if name is None or not self.ready:
+            return None
+        with self._lock:
+            known = name in self._blobs
+        if not known:
+            return None, None
+        try:
+            with open(os.path.join(self.directory, name), 'rb') as file:
+                content = file.read()
+        except OSError:
+            return None
+        return content.decode("utf-8"), remote_storage._git_blob_sha(content)
+
+    def store(self, path: str, content):
+        """Mirror a write that landed on GitHub (bytes, or None for a delete)."""
+        name = self._name(path)
+        if name is None:
+            return
+        with self._lock:
+            self._written[name] = time.monotonic()
+            if content is None:
+                self._remove_file(name)
+                self._blobs.pop(name, None)
+            else:
+                self._write_file(name, content)
+                self._blobs[name] = remote_storage._git_blob_sha(content)
+
+    def refresh(self, path: str):
+        """Fetch one file from GitHub now, e.g. after a write found our copy stale."""
+        token, repo, _ = remote_storage._get_secrets()
+        try:
+            content, _ = remote_storage._fetch_file_versioned(token, repo, path)
+        except Exception as e:
+            self.errors.append({"error": f"refresh {path}: {e}", "time": time.time()})
+            return
+        self.store(path, content.encode("utf-8") if content is not None else None)
+
+    def sync(self) -> bool:
+        """Bring the replica up to the branch head. Returns True if the head had moved."""
+        started = time.monotonic()
+        commit = remote_storage.get_branch_head_remote()
+        if commit == self._commit:
+            self.last_sync = time.time()
+            return False
+        remote = remote_storage.list_folder_remote(commit)
+        with self._lock:
+            local = dict(self._blobs)
+        missing = {name: sha for name, sha in remote.items() if local.get(name) != sha}
+        fetched = {}
+        if len(missing) >= self.archive_threshold:
+            try:
+                for name, content in remote_storage.download_folder_remote(commit):
+                    # Only take files the archive has exactly as listed (no export filters)
+                    if missing.get(name) == remote_storage._git_blob_sha(content):
+                        fetched[name] = content
+            except Exception as e:
+                self.errors.append({"error": f"archive: {e}", "time": time.time()})
+        for name, sha in missing.items():
+            if name not in fetched:
+                fetched[name] = remote_storage.get_blob_remote(sha)
+
+        with self._lock:
+            # Files we wrote ourselves after this sync started are newer than its snapshot
+            def newer(name):
+                return self._written.get(name, 0) > started
+
+            for name, content in fetched.items():
+                if not newer(name):
+                    self._write_file(name, content)
+                    self._blobs[name] = missing[name]
+            for name in local:
+                if name not in remote and not newer(name):
+                    self._remove_file(name)
+                    self._blobs.pop(name, None)
+            self._commit = commit
+            self._save_manifest()
+        self.last_sync = time.time()
+        return True
+
+    def _sync_logged(self):
+        try:
+            with request_priority(BACKGROUND):
+                self.sync()
+        except RateLimitDeferred:
+            # Budget is low: serve the copy we have and try again next round
+            pass
+        except Exception as e:
+            # Keep serving the last good copy; the next round tries again
+            self.errors.append({"error": str(e), "time": time.time()})
+
+    def start(self):
+        """Sync and keep syncing every `interval` seconds from a background thread.
+
+        Without a copy on disk the first sync runs right here, so reads are local from the start.
+        """
+        cold = not self.ready
+        if cold:
+            self._sync_logged()
+        # A copy from an earlier run is served at once and caught up in the background
+        self._thread = threading.Thread(target=self._run, args=(not cold,), name="gh-replica", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self, sync_now: bool):
+        if sync_now:
+            self._sync_logged()
+        while not self._stop.wait(self.interval):
+            self._sync_logged()
+
+    def status(self):
+        with self._lock:
+            files = len(self._blobs)
+        return {
+            "replica_dir": self.directory,
+            "replica_commit": self._commit,
+            "replica_files": files,
+            "replica_last_sync": time.strftime("%H:%M:%S", time.localtime(self.last_sync)) if self.last_sync else None,
+            "replica_errors": list(self.errors),
+        }
+
+
+def start_replica(directory: str, interval: float = 30.0) -> Replica:
+    """Create the replica for the configured repository, attach it to remote_storage and start syncing."""
+    _, _, prefix = remote_storage._get_secrets()
+    replica = Replica(directory, prefix, interval=interval)
+    remote_storage.attach_replica(replica)
+    replica.start()
+    return replica
@@ -0,0 +1,196 @@
+import re
+import threading
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Set
+from urllib.parse import urlparse
+from .models import Item
+
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text: str):
+    return _TOKEN.findall((text or "").casefold())
+
+
+def shop_domain(url: str) -> Optional[str]:
+    """"https://www.amazon.de/dp/..." -> "amazon.de"."""
+    if not url:
+        return None
+    netloc = urlparse(url if "//" in url else "//" + url).netloc.lower().split(":")[0]
+    if netloc.startswith("www."):
+        netloc = netloc[4:]
+    return netloc or None
+
+
+class TokenIndex:
+    """Inverted index from tokens to keys. A query matches keys that have, for every
+    query token, some token starting with it (so half-typed words already match)."""
+
+    def __init__(self):
+        self._postings = defaultdict(set)
+        self._sorted = []  # distinct tokens, for prefix ranges
+        self._tokens = {}  # key -> its tokens
+
+    def __len__(self):
+        return len(self._tokens)
+
+    def add(self, key, tokens: Iterable[str], bulk: bool = False) -> None:
+        """Index key under tokens; with bulk=True call sort() after the last add."""
+        tokens = set(tokens)
+        self._tokens[key] = tokens
+        for token in tokens:
+            postings = self._postings[token]
+            if not postings and not bulk:
+                insort(self._sorted, token)
+            postings.add(key)
+
+    def sort(self) -> None:
+        self._sorted = sorted(self._postings)
+
+    def remove(self, key) -> None:
+        for token in self._tokens.pop(key, ()):
+            postings = self._postings[token]
+            postings.discard(key)
+            if not postings:
+                del self._postings[token]
+                del self._sorted[bisect_left(self._sorted, token)]
+
+    def _prefix_matches(self, prefix: str) -> Set:
+        start = bisect_left(self._sorted, prefix)
+        end = bisect_left(self._sorted, prefix + "\U0010ffff", start)
+        if end - start == 1:
+            return self._postings[self._sorted[start]]
+        result = set()
+        for token in self._sorted[start:end]:
+            result |= self._postings[token]
+        return result
+
+    def search(self, query: str) -> Optional[Set]:
+        """Keys matching all query tokens, or None for an empty query (no restriction)."""
+        tokens = tokenize(query)
+        if not tokens:
+            return None
+        matches = sorted((self._prefix_matches(t) for t in set(tokens)), key=len)
+        result = set(matches[0])
+        for other in matches[1:]:
+            result &= other
+        return result
+
+
+class ItemIndex:
+    """Search and filter index over the items of one wishlist, by item ID.
+
+    Text search covers gift names and shop domains; facets are highlight, gifted,
+    shop and a sorted price list for range queries. Thread-safe, so one index can be
+    shared by all sessions and updated in place.
+    """
+
+    def __init__(self, items: Iterable[Dict] = ()):
+        self._lock = threading.Lock()
+        self._text = TokenIndex()
+        self._items = {}
+        self._highlight = set()
+        self._gifted = set()
+        self._shops = defaultdict(set)
+        self._prices = []  # sorted (cents, item_id)
+        # Bulk build: sort the token and price lists once at the end
+        for item in items:
+            self._add(Item.from_dict(item), bulk=True)
+        self._text.sort()
+        self._prices.sort()
+
+    def __len__(self):
+        return len(self._items)
+
+    def _add(self, item: Item, bulk: bool = False) -> None:
+        item_id = item.id
+        self._items[item_id] = item
+        shops = {d for d in (shop_domain(item.purchase_link), shop_domain(item.amazon_link)) if d}
+        tokens = tokenize(item.gift_name)
+        for shop in shops:
+            self._shops[shop].add(item_id)
+            tokens += tokenize(shop)
+        self._text.add(item_id, tokens, bulk)
+        if item.is_highlight:
+            self._highlight.add(item_id)
+        if item.is_gifted:
+            self._gifted.add(item_id)
+        if item.price_cents is not None:
+            if bulk:
+                self._prices.append((item.price_cents, item_id))
+            else:
+                insort(self._prices, (item.price_cents, item_id))
+
+    def _remove(self, item_id: str) -> Optional[Item]:
+        item = self._items.pop(item_id, None)
+        if item is None:
+            return None
+        self._text.remove(item_id)
+        self._highlight.discard(item_id)
+        self._gifted.discard(item_id)
+        for shop in (shop_domain(item.purchase_link), shop_domain(item.amazon_link)):
+            if shop and shop in self._shops:
+                self._shops[shop].discard(item_id)
+                if not self._shops[shop]:
+                    del self._shops[shop]
+        if item.price_cents is not None:
+            del self._prices[bisect_left(self._prices, (item.price_cents, item_id))]
+        return item
+
+    def add(self, item: Dict) -> None:
+        with self._lock:
+            self._remove(item.get("id"))
+            self._add(Item.from_dict(item))
+
+    def update(self, item_id: str, fields: Dict) -> None:
+        with self._lock:
+            item = self._remove(item_id)
+            if item is not None:
+                self._add(Item.from_dict({**item.to_dict(), **fields}))
+
+    def remove(self, item_id: str) -> None:
+        with self._lock:
+            self._remove(item_id)
+
+    def shops(self) -> Dict[str, int]:
+        """Shop domains with their item counts, most common first."""
+        with self._lock:
+            counts = {shop: len(ids) for shop, ids in self._shops.items()}
+        return dict(sorted(counts.items(), key=lambda kv: (-kv[1], kv[0])))
+
+    def search(self, query: str = "", highlight: Optional[bool] = None, gifted: Optional[bool] = None,
+               shops: Iterable[str] = (), min_cents: Optional[int] = None,
+               max_cents: Optional[int] = None) -> Set[str]:
+        """IDs of the items matching the query text and all given facets."""
+        with self._lock:
+            candidates = []
+            text = self._text.search(query)
+            if text is not None:
+                candidates.append(text)
+            if highlight:
+                candidates.append(self._highlight)
+            if gifted is True:
+                candidates.append(self._gifted)
+            shops = list(shops)
+            if shops:
+                by_shop = set()
+                for shop in shops:
+                    by_shop |= self._shops.get(shop, set())
+                candidates.append(by_shop)
+            if min_cents is not None or max_cents is not None:
+                start = 0 if min_cents is None else bisect_left(self._prices, (min_cents,))
+                end = len(self._prices) if max_cents is None else bisect_right(self._prices, (max_cents, "\U0010ffff"))
+                candidates.append({item_id for _, item_id in self._prices[start:end]})
+            if candidates:
+                candidates.sort(key=len)
+                result = set(candidates[0])
+                for other in candidates[1:]:
+                    result &= other
+            else:
+                result = set(self._items)
+            if highlight is False:
+                result -= self._highlight
+            if gifted is False:
+                result -= self._gifted
+            return result
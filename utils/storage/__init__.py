@@ -0,0 +1,59 @@
+import os
+import threading
+from ..config import get_setting, get_int_setting, get_float_setting, get_bool_setting, github_settings
+from .base import StorageBackend, StaleVersionError
+from .json_backend import JsonFileBackend
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def _create_backend() -> StorageBackend:
+    """Pick the backend from WISHLIST_BACKEND: auto (default), json, github or sqlite."""
+    kind = (get_setting("WISHLIST_BACKEND") or "auto").strip().lower()
+    data_dir = get_setting("WISHLIST_DATA_DIR", "data")
+    if kind == "auto":
+        token, repo, _ = github_settings()
+        kind = "github" if token and repo else "json"
+    if kind == "github":
+        from .github_backend import GitHubBackend
+        if get_bool_setting("GH_REPLICA"):
+            from ..replica import start_replica
+            start_replica(get_setting("GH_REPLICA_DIR") or os.path.join(data_dir, "replica"),
+                          interval=get_float_setting("GH_REPLICA_INTERVAL", 30.0))
+        return GitHubBackend()
+    if kind == "sqlite":
+        from .sqlite_backend import SqliteBackend
+        return SqliteBackend(get_setting("WISHLIST_SQLITE_PATH") or os.path.join(data_dir, "wishlists.db"))
+    if kind != "json":
+        raise ValueError(f"Unknown WISHLIST_BACKEND: {kind}")
+    return JsonFileBackend(data_dir, compact_after=get_int_setting("WISHLIST_LOG_COMPACT_OPS", 200))
+
+
+def __getattr__(name):
+    # Backends besides JSON are imported when used (the GitHub one pulls in requests),
+    # so scripts like the CLI start quickly
+    if name == "GitHubBackend":
+        from .github_backend import GitHubBackend
+        return GitHubBackend
+    if name == "SqliteBackend":
+        from .sqlite_backend import SqliteBackend
+        return SqliteBackend
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def get_backend() -> StorageBackend:
+    """The configured storage backend (resolved once per process)."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = _create_backend()
+    return _backend
+
+
+def set_backend(backend: StorageBackend) -> None:
+    """Use a specific backend instance (e.g. for scripts working on another data folder)."""
+    global _backend
+    with _backend_lock:
+        _backend = backend
@@ -0,0 +1,181 @@
+import hashlib
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+from ..merge import WishlistConflictError
+from .index import index_entry
+
+# Attempts for a read-modify-write item operation when the wishlist keeps changing under us
+MAX_OP_ATTEMPTS = 5
+
+
+class StaleVersionError(Exception):
+    """A conditional write found the wishlist at a different version than expected."""
+
+
+def check_expected(item: Optional[Dict], expected: Optional[Dict]) -> Dict:
+    """Raise WishlistConflictError unless the item exists and still has the expected field values."""
+    if item is None:
+        raise WishlistConflictError("Das Geschenk gibt es nicht mehr")
+    for field, value in (expected or {}).items():
+        current = item.get(field)
+        if current is None and value in (False, ""):
+            continue
+        if current != value:
+            if field == "is_gifted" and item.get("is_gifted"):
+                raise WishlistConflictError(f"'{item.get('gift_name')}' wurde bereits verschenkt")
+            raise WishlistConflictError(f"'{item.get('gift_name')}' wurde zwischenzeitlich geändert")
+    return item
+
+
+def new_item_id() -> str:
+    """A fresh ID for a newly added item."""
+    return uuid.uuid4().hex[:12]
+
+
+def assign_item_ids(wishlist_id: str, items: List[Dict]) -> bool:
+    """Give items without an ID one derived from wishlist, position and name.
+
+    Deterministic, so every process migrating the same document picks the same IDs.
+    Returns True if any item was changed.
+    """
+    taken = {item["id"] for item in items if item.get("id")}
+    changed = False
+    for position, item in enumerate(items):
+        if item.get("id"):
+            continue
+        seed = f"{wishlist_id}\0{position}\0{item.get('gift_name', '')}"
+        item_id = hashlib.sha1(seed.encode()).hexdigest()[:12]
+        n = 0
+        while item_id in taken:
+            n += 1
+            item_id = hashlib.sha1(f"{seed}\0{n}".encode()).hexdigest()[:12]
+        item["id"] = item_id
+        taken.add(item_id)
+        changed = True
+    return changed
+
+
+def find_item(items: List[Dict], item_id: str) -> int:
+    """Position of the item with item_id, or -1."""
+    for index, item in enumerate(items):
+        if item.get("id") == item_id:
+            return index
+    return -1
+
+
+def check_item(items: List[Dict], item_id: str, expected: Optional[Dict]) -> int:
+    """check_expected() for the item with item_id; returns its position."""
+    index = find_item(items, item_id)
+    check_expected(items[index] if index >= 0 else None, expected)
+    return index
+
+
+def apply_add_item(items: List[Dict], item: Dict) -> None:
+    items.append(dict(item))
+
+
+def apply_update_item(items: List[Dict], item_id: str, fields: Dict, expected: Optional[Dict] = None) -> None:
+    items[check_item(items, item_id, expected)].update(fields)
+
+
+def apply_delete_item(items: List[Dict], item_id: str, expected: Optional[Dict] = None) -> None:
+    items.pop(check_item(items, item_id, expected))
+
+
+def apply_move_item(items: List[Dict], item_id: str, new_index: int, expected: Optional[Dict] = None) -> None:
+    index = check_item(items, item_id, expected)
+    if 0 <= new_index < len(items):
+        items.insert(new_index, items.pop(index))
+
+
+class StorageBackend(ABC):
+    """Where wishlists and the wishlist index live.
+
+    Documents are plain dicts ({"id", "name", "password_hash", "items"}). Every read
+    returns an opaque version; write() with expected_version raises StaleVersionError
+    if the stored wishlist moved on. Item operations address items by their "id" and may
+    pass `expected` field values that must still hold (WishlistConflictError otherwise).
+    Item operations return (old_version, new_version): the version they were applied to
+    and the one they produced. The default item operations are read-modify-write;
+    backends that can change a single item in place override them.
+    """
+
+    name = "base"
+    label = "Storage"
+    # Errors a later attempt may not run into again (network, file system), e.g. for write-behind retries
+    transient_errors = (OSError,)
+    # Whether write_many costs less than one write per wishlist (e.g. one commit for all)
+    batched_writes = False
+
+    @abstractmethod
+    def list_wishlists(self) -> List[Dict]:
+        """All wishlists as index entries ({"id", "name"} plus summary, see index_entry)."""
+
+    @abstractmethod
+    def save_index(self, wishlists: List[Dict]) -> None:
+        """Replace the wishlist index."""
+
+    def list_page(self, page: int = 0):
+        """One page of the index for the overview: (entries, page_count)."""
+        return self.list_wishlists(), 1
+
+    def update_summary(self, wishlist_id: str, data: Dict) -> None:
+        """Refresh the index entry's summary (counts, modified) from the wishlist."""
+        entry = index_entry(wishlist_id, data)
+        self.save_index([{**w, **entry} if w.get("id") == wishlist_id else w for w in self.list_wishlists()])
+
+    def flush_summaries(self) -> None:
+        """Write summaries that saves kept back into the index (nothing to do if saves update it)."""
+
+    @abstractmethod
+    def read(self, wishlist_id: str):
+        """Return (wishlist, version), or (None, None) if it does not exist."""
+
+    @abstractmethod
+    def write(self, wishlist_id: str, data: Dict, expected_version=None):
+        """Store a wishlist and return its new version."""
+
+    def write_many(self, writes: Dict[str, Tuple[Dict, Any]]) -> Dict:
+        """Store several wishlists: {id: (data, expected_version)} -> {id: new version, or None if stale}."""
+        versions = {}
+        for wishlist_id, (data, expected_version) in writes.items():
+            try:
+                versions[wishlist_id] = self.write(wishlist_id, data, expected_version=expected_version)
+            except StaleVersionError:
+                versions[wishlist_id] = None
+        return versions
+
+    @abstractmethod
+    def create(self, wishlist_id: str, data: Dict) -> None:
+        """Store a new wishlist and add it to the index."""
+
+    @abstractmethod
+    def delete(self, wishlist_id: str) -> None:
+        """Remove a wishlist and its index entry."""
+
+    def _modify_items(self, wishlist_id: str, change):
+        for _ in range(MAX_OP_ATTEMPTS):
+            data, version = self.read(wishlist_id)
+            if data is None:
+                raise WishlistConflictError("Wunschliste nicht gefunden")
+            items = data.setdefault("items", [])
+            assign_item_ids(wishlist_id, items)
+            change(items)
+            try:
+                return version, self.write(wishlist_id, data, expected_version=version)
+            except StaleVersionError:
+                continue
+        raise WishlistConflictError("Die Liste wird gerade von mehreren Personen geändert")
+
+    def add_item(self, wishlist_id: str, item: Dict):
+        return self._modify_items(wishlist_id, lambda items: apply_add_item(items, item))
+
+    def update_item(self, wishlist_id: str, item_id: str, fields: Dict, expected: Optional[Dict] = None):
+        return self._modify_items(wishlist_id, lambda items: apply_update_item(items, item_id, fields, expected))
+
+    def delete_item(self, wishlist_id: str, item_id: str, expected: Optional[Dict] = None):
+        return self._modify_items(wishlist_id, lambda items: apply_delete_item(items, item_id, expected))
+
+    def move_item(self, wishlist_id: str, item_id: str, new_index: int, expected: Optional[Dict] = None):
+        return self._modify_items(wishlist_id, lambda items: apply_move_item(items, item_id, new_index, expected))
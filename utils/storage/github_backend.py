@@ -0,0 +1,127 @@
+from typing import Dict, List
+from .base import StorageBackend, StaleVersionError
+from .index import INDEX_FILE, ShardedIndex, index_entry
+from .. import remote_storage
+
+
+class _LayoutChanged(remote_storage.RemoteConflictError):
+    """The index was fanned out (or rewritten) since we last read its shard count."""
+
+
+class GitHubBackend(ShardedIndex, StorageBackend):
+    """Wishlists stored as JSON files in a GitHub repository (see remote_storage).
+
+    A save is a single Contents API PUT; its index summary waits (see ShardedIndex) and
+    goes into the next commit that touches the index anyway: a create, a delete, or the
+    flush before the index is read. Saving several wishlists at once (write_many) is one
+    commit for all of them. The shard count is remembered instead of read before
+    every commit; the index files a commit changes tell whether it is still right.
+    """
+
+    name = "github"
+    label = "GitHub"
+    batched_writes = True
+    _shards = None
+
+    def _read_index_file(self, name: str):
+        return remote_storage.read_index_file_remote(name)
+
+    def _modify_index_file(self, name: str, change) -> None:
+        remote_storage.modify_index_file_remote(name, change)
+
+    def _replace_index_files(self, files: Dict) -> None:
+        remote_storage.replace_index_files_remote(files)
+
+    def _write_layout(self, entries: List[Dict], shards: int) -> None:
+        super()._write_layout(entries, shards)
+        self._shards = shards
+
+    def _with_index(self, commit):
+        """Run commit(shards, checked) with the remembered shard count, re-reading it if it changed.
+
+        checked(change) guards an index change against running on the wrong layout:
+        a single index file that turned into a manifest, or a shard file that is gone.
+        """
+        for attempt in range(3):
+            if self._shards is None or attempt > 0:
+                self._shards = self._shard_count()
+            shards = self._shards
+
+            def checked(change):
+                def guarded(entries):
+                    if isinstance(entries, dict) if shards == 1 else entries is None:
+                        raise _LayoutChanged(INDEX_FILE)
+                    return change(entries)
+                return guarded
+
+            try:
+                return commit(shards, checked)
+            except _LayoutChanged:
+                if attempt == 2:
+                    raise
+
+    def _index_changes(self, shards: int, checked, summaries: Dict[str, Dict], wishlist_id=None, change=None):
+        """Index file changes for one commit: the waiting summaries, then change for wishlist_id's file."""
+        changes = self._summary_changes(summaries, shards)
+        if change is not None:
+            name = self._shard_name(wishlist_id, shards)
+            before = changes.get(name)
+            changes[name] = change if before is None else (lambda entries: change(before(entries)))
+        return {name: checked(c) for name, c in changes.items()}
+
+    def _write_summaries(self, summaries: Dict[str, Dict]) -> None:
+        self._with_index(lambda shards, checked: remote_storage.update_index_files_remote(
+            self._index_changes(shards, checked, summaries)))
+
+    def read(self, wishlist_id: str):
+        return remote_storage.load_wishlist_remote_versioned(wishlist_id)
+
+    def write(self, wishlist_id: str, data: Dict, expected_version=None):
+        try:
+            sha = remote_storage.save_wishlist_remote(wishlist_id, data, expected_sha=expected_version)
+        except remote_storage.RemoteConflictError:
+            raise StaleVersionError(wishlist_id)
+        self._note_summary(wishlist_id, data)
+        return sha
+
+    def write_many(self, writes: Dict) -> Dict:
+        versions = remote_storage.save_wishlists_remote(writes)
+        for wishlist_id, version in versions.items():
+            if version is not None:
+                self._note_summary(wishlist_id, writes[wishlist_id][0])
+        return versions
+
+    def create(self, wishlist_id: str, data: Dict) -> None:
+        entry = index_entry(wishlist_id, data)
+        size = [0]
+
+        def add_entry(entries):
+            entries = [e for e in entries or [] if e.get('id') != wishlist_id] + [entry]
+            size[0] = len(entries)
+            return entries
+
+        def commit(shards, checked):
+            # Wishlist file and its index file land in one commit; the entry is added to the
+            # index as of that commit, so concurrent creates don't drop each other's entries
+            remote_storage.create_wishlist_remote(
+                wishlist_id, data, self._index_changes(shards, checked, summaries, wishlist_id, add_entry))
+            return shards
+
+        summaries = self._take_summaries()
+        try:
+            shards = self._with_index(commit)
+        except Exception:
+            self._keep_summaries(summaries)
+            raise
+        self._fan_out_if_full(shards, size[0])
+
+    def delete(self, wishlist_id: str) -> None:
+        summaries = self._take_summaries()
+        summaries.pop(wishlist_id, None)
+        try:
+            self._with_index(lambda shards, checked: remote_storage.delete_wishlist_remote(
+                wishlist_id, self._index_changes(shards, checked, summaries, wishlist_id,
+                                                 lambda entries: [w for w in entries or [] if w.get('id') != wishlist_id])))
+        except Exception:
+            self._keep_summaries(summaries)
+            raise
@@ -0,0 +1,220 @@
+import atexit
+import hashlib
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "wishlists_index.json"
+
+# Entries per index file before the index fans out into 16, then 256 shards by ID hash prefix
+SHARD_LIMIT = 1000
+_FAN_OUT = {1: 16, 16: 256}
+_PREFIX_LENGTH = {1: 0, 16: 1, 256: 2}
+
+# Overview page size for backends that can page natively (SQLite)
+PAGE_SIZE = 100
+
+
+def utc_timestamp() -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+
+def index_entry(wishlist_id: str, data: Dict, modified: Optional[str] = None) -> Dict:
+    """The index entry of a wishlist: id and name plus a summary for the overview."""
+    items = data.get("items", [])
+    return {
+        "id": wishlist_id,
+        "name": data.get("name"),
+        "item_count": len(items),
+        "gifted_count": sum(1 for item in items if item.get("is_gifted")),
+        "modified": modified or utc_timestamp(),
+    }
+
+
+def shard_file(prefix: str) -> str:
+    return f"wishlists_index_{prefix}.json"
+
+
+def _shard_prefix(wishlist_id: str, shards: int) -> str:
+    # Hashed, so IDs of any shape spread evenly
+    return hashlib.md5(wishlist_id.encode()).hexdigest()[:_PREFIX_LENGTH[shards]]
+
+
+def _prefixes(shards: int) -> List[str]:
+    width = _PREFIX_LENGTH[shards]
+    return [format(n, "x").rjust(width, "0") for n in range(shards)]
+
+
+def _layout(entries: List[Dict], shards: int) -> Dict[str, object]:
+    """Index files for entries in a layout with the given number of shards."""
+    if shards == 1:
+        return {INDEX_FILE: list(entries)}
+    files = {shard_file(p): [] for p in _prefixes(shards)}
+    for entry in entries:
+        files[shard_file(_shard_prefix(entry["id"], shards))].append(entry)
+    files[INDEX_FILE] = {"shards": shards}
+    return files
+
+
+class ShardedIndex:
+    """Mixin for backends that keep the index as JSON files.
+
+    Small indexes are a single wishlists_index.json list, as always. Once a file holds
+    more than SHARD_LIMIT entries, the entries move into shard files by a hash prefix of
+    the wishlist ID and wishlists_index.json only records the shard count. One overview page is
+    one shard, so it is a single small read at any size.
+
+    Backends provide _read_index_file(name) -> payload or None, _modify_index_file(name,
+    change) for a safe read-modify-write of one file, and _replace_index_files(files)
+    (payload None removes a file).
+
+    Saves and item operations don't touch the index: they remember the list's new summary
+    (_note_summary), and flush_summaries() writes all remembered ones per shard. That
+    happens before the index is read, and when the process exits.
+    """
+
+    def __init__(self):
+        self._summaries = {}
+        self._summaries_lock = threading.Lock()
+        self._flush_at_exit = False
+
+    def _read_index_file(self, name: str):
+        raise NotImplementedError
+
+    def _modify_index_file(self, name: str, change) -> None:
+        raise NotImplementedError
+
+    def _replace_index_files(self, files: Dict[str, object]) -> None:
+        raise NotImplementedError
+
+    def _shard_count(self) -> int:
+        manifest = self._read_index_file(INDEX_FILE)
+        if isinstance(manifest, dict):
+            return manifest.get("shards", 1)
+        return 1
+
+    def _shard_name(self, wishlist_id: str, shards: int) -> str:
+        return INDEX_FILE if shards == 1 else shard_file(_shard_prefix(wishlist_id, shards))
+
+    def list_wishlists(self) -> List[Dict]:
+        self.flush_summaries()
+        manifest = self._read_index_file(INDEX_FILE)
+        if not isinstance(manifest, dict):
+            return manifest or []
+        entries = []
+        for prefix in _prefixes(manifest.get("shards", 1)):
+            entries += self._read_index_file(shard_file(prefix)) or []
+        return entries
+
+    def list_page(self, page: int = 0):
+        self.flush_summaries()
+        manifest = self._read_index_file(INDEX_FILE)
+        if not isinstance(manifest, dict):
+            return manifest or [], 1
+        shards = manifest.get("shards", 1)
+        page = min(max(page, 0), shards - 1)
+        return self._read_index_file(shard_file(_prefixes(shards)[page])) or [], shards
+
+    def save_index(self, wishlists: List[Dict]) -> None:
+        shards = 1
+        while shards in _FAN_OUT and len(wishlists) > SHARD_LIMIT * shards:
+            shards = _FAN_OUT[shards]
+        self._write_layout(list(wishlists), shards)
+
+    def _write_layout(self, entries: List[Dict], shards: int) -> None:
+        files = _layout(entries, shards)
+        old = self._shard_count()
+        if old != shards and old != 1:
+            for prefix in _prefixes(old):
+                files.setdefault(shard_file(prefix), None)
+        self._replace_index_files(files)
+
+    def _index_upsert(self, entry: Dict) -> None:
+        """Update the entry with the same ID in place, or append it."""
+        shards = self._shard_count()
+        name = self._shard_name(entry["id"], shards)
+        size = [0]
+
+        def change(entries):
+            entries = list(entries or [])
+            for i, existing in enumerate(entries):
+                if existing.get("id") == entry["id"]:
+                    entries[i] = {**existing, **entry}
+                    break
+            else:
+                entries.append(entry)
+            size[0] = len(entries)
+            return entries
+
+        self._modify_index_file(name, change)
+        self._fan_out_if_full(shards, size[0])
+
+    def _fan_out_if_full(self, shards: int, size: int) -> None:
+        """Move to the next shard count once an index file has grown past SHARD_LIMIT."""
+        if size > SHARD_LIMIT and shards in _FAN_OUT:
+            self._write_layout(self.list_wishlists(), _FAN_OUT[shards])
+
+    def _index_remove(self, wishlist_id: str) -> None:
+        name = self._shard_name(wishlist_id, self._shard_count())
+        self._modify_index_file(name, lambda entries: [e for e in entries or [] if e.get("id") != wishlist_id])
+
+    def update_summary(self, wishlist_id: str, data: Dict) -> None:
+        self._note_summary(wishlist_id, data)
+        self.flush_summaries()
+
+    def _note_summary(self, wishlist_id: str, data: Dict) -> None:
+        """Remember the summary of a changed list for the next flush_summaries()."""
+        entry = index_entry(wishlist_id, data)
+        with self._summaries_lock:
+            self._summaries[wishlist_id] = entry
+            if not self._flush_at_exit:
+                self._flush_at_exit = True
+                atexit.register(self.flush_summaries)
+
+    def _take_summaries(self) -> Dict[str, Dict]:
+        with self._summaries_lock:
+            summaries, self._summaries = self._summaries, {}
+        return summaries
+
+    def _keep_summaries(self, summaries: Dict[str, Dict]) -> None:
+        """Put summaries that could not be written back (newer ones win)."""
+        with self._summaries_lock:
+            for wishlist_id, entry in summaries.items():
+                self._summaries.setdefault(wishlist_id, entry)
+
+    def _summary_changes(self, summaries: Dict[str, Dict], shards: int) -> Dict[str, object]:
+        """Index file name -> change(entries) writing the summaries that belong in it."""
+        by_file = {}
+        for wishlist_id, entry in summaries.items():
+            by_file.setdefault(self._shard_name(wishlist_id, shards), {})[wishlist_id] = entry
+
+        def change_for(entries_by_id):
+            def change(entries):
+                # Only lists that are in the index get a summary (deleted ones stay deleted)
+                return [{**e, **entries_by_id[e.get("id")]} if e.get("id") in entries_by_id else e
+                        for e in entries or []]
+            return change
+
+        return {name: change_for(entries_by_id) for name, entries_by_id in by_file.items()}
+
+    def _write_summaries(self, summaries: Dict[str, Dict]) -> None:
+        for name, change in self._summary_changes(summaries, self._shard_count()).items():
+            self._modify_index_file(name, change)
+
+    def flush_summaries(self) -> None:
+        """Write the remembered summaries into the index.
+
+        A failure is logged and the summaries are kept for the next flush; it never fails
+        the read or save that triggered the flush.
+        """
+        summaries = self._take_summaries()
+        if not summaries:
+            return
+        try:
+            self._write_summaries(summaries)
+        except Exception:
+            logger.warning("Could not write the index summaries of %d list(s)", len(summaries), exc_info=True)
+            self._keep_summaries(summaries)
@@ -0,0 +1,334 @@
+import os
+import glob
+import json
+import tempfile
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Optional
+from .base import (
+    StorageBackend,
+    StaleVersionError,
+    assign_item_ids,
+    check_item,
+    find_item,
+)
+from .index import INDEX_FILE, ShardedIndex, index_entry
+from ..merge import WishlistConflictError
+try:
+    import fcntl  # advisory locks shared by all worker processes (POSIX only)
+except ImportError:
+    fcntl = None
+
+# mkstemp creates files as 0600; written files get the mode a plain open() would give them.
+# Read once at import: os.umask can only be read by setting it, which races with other threads.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _local_version(stat, log_size: int = 0) -> str:
+    # Every atomic replace creates a new inode, so this changes even within one mtime tick
+    return f"{stat.st_ino}-{stat.st_mtime_ns}-{stat.st_size}-{log_size}"
+
+
+def _complete_length(log) -> int:
+    """Bytes of an open binary log up to and including its last newline."""
+    position = log.seek(0, os.SEEK_END)
+    while position > 0:
+        step = min(4096, position)
+        position -= step
+        log.seek(position)
+        newline = log.read(step).rfind(b"\n")
+        if newline >= 0:
+            return position + newline + 1
+    return 0
+
+
+def _replay(wishlist_id: str, data: Dict, op: Dict) -> None:
+    """Apply one logged item operation to a wishlist document."""
+    items = data.setdefault("items", [])
+    kind = op.get("op")
+    if kind == "add":
+        items.append(dict(op["item"]))
+        return
+    # The writer assigned missing IDs to exactly this state before logging the op
+    assign_item_ids(wishlist_id, items)
+    index = find_item(items, op["item_id"])
+    if index < 0:
+        return
+    if kind == "update":
+        items[index].update(op["fields"])
+    elif kind == "gift":
+        items[index]["is_gifted"] = True
+    elif kind == "delete":
+        items.pop(index)
+    elif kind == "move" and 0 <= op["to"] < len(items):
+        items.insert(op["to"], items.pop(index))
+
+
+class JsonFileBackend(ShardedIndex, StorageBackend):
+    """One JSON file per wishlist plus the index (see ShardedIndex) in a local folder.
+
+    Item operations are appended as single JSON lines to an operation log next to the
+    snapshot instead of rewriting the whole file; reads replay the log on top of the
+    snapshot. The log belongs to one snapshot file (its name carries the snapshot's
+    inode), and once it grows past compact_after operations a background thread folds
+    it into a new snapshot.
+    """
+
+    name = "json"
+    label = "Local"
+
+    def __init__(self, data_dir: str = 'data', compact_after: int = 200):
+        super().__init__()
+        self.data_dir = data_dir
+        self.compact_after = compact_after
+        self._compacting = set()
+        self._compacting_lock = threading.Lock()
+        # How often a writer had to wait for another writer, per file name
+        self.lock_contention = Counter()
+        self._contention_lock = threading.Lock()
+
+    def ensure_data_dir(self):
+        os.makedirs(self.data_dir, exist_ok=True)
+
+    def wishlist_filename(self, wishlist_id: str) -> str:
+        return os.path.join(self.data_dir, f"wishlist_{wishlist_id}.json")
+
+    def log_filename(self, wishlist_id: str, snapshot_ino: int) -> str:
+        return f"{self.wishlist_filename(wishlist_id)}.{snapshot_ino}.log"
+
+    def index_filename(self, name: str = INDEX_FILE) -> str:
+        return os.path.join(self.data_dir, name)
+
+    @contextmanager
+    def _locked(self, filename: str):
+        """Exclusive advisory lock for writers of filename (via a sidecar .lock file).
+
+        Readers never take it: files are replaced atomically, so they see either the
+        old or the new content.
+        """
+        if fcntl is None:
+            yield
+            return
+        with open(filename + '.lock', 'a') as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                with self._contention_lock:
+                    self.lock_contention[os.path.basename(filename)] += 1
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _dump(self, filename: str, data) -> None:
+        """Write via temp file + fsync + rename, so a crash never leaves truncated JSON."""
+        directory = os.path.dirname(filename) or '.'
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(filename), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as file:
+                try:
+                    mode = os.stat(filename).st_mode & 0o777
+                except FileNotFoundError:
+                    mode = 0o666 & ~_UMASK
+                os.chmod(tmp_path, mode)
+                json.dump(data, file, indent=4, ensure_ascii=False)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_path, filename)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        if hasattr(os, 'O_DIRECTORY'):
+            dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+
+    def _read_index_file(self, name: str):
+        self.ensure_data_dir()
+        try:
+            with open(self.index_filename(name), 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def _modify_index_file(self, name: str, change) -> None:
+        self.ensure_data_dir()
+        filename = self.index_filename(name)
+        with self._locked(filename):
+            self._dump(filename, change(self._read_index_file(name)))
+
+    def _replace_index_files(self, files: Dict) -> None:
+        self.ensure_data_dir()
+        # New shards first, then the manifest that points at them, then removals
+        order = sorted(files, key=lambda name: (files[name] is None, name == INDEX_FILE))
+        with self._locked(self.index_filename()):
+            for name in order:
+                filename = self.index_filename(name)
+                if files[name] is not None:
+                    self._dump(filename, files[name])
+                elif os.path.exists(filename):
+                    os.remove(filename)
+
+    def _read_state(self, wishlist_id: str):
+        """Return (data, version, snapshot_ino, log_ops) with the log replayed, or Nones."""
+        filename = self.wishlist_filename(wishlist_id)
+        for _ in range(5):
+            try:
+                with open(filename, 'r', encoding='utf-8') as file:
+                    stat = os.fstat(file.fileno())
+                    data = json.load(file)
+            except (OSError, ValueError):
+                return None, None, None, 0
+            log_size = 0
+            log_ops = 0
+            try:
+                with open(self.log_filename(wishlist_id, stat.st_ino), 'rb') as log:
+                    for line in log:
+                        # A torn last line (crash mid-append) is ignored
+                        if not line.endswith(b"\n"):
+                            break
+                        try:
+                            _replay(wishlist_id, data, json.loads(line))
+                        except ValueError:
+                            pass  # a garbled line (e.g. appended to a torn one) loses only its own op
+                        log_size += len(line)
+                        log_ops += 1
+            except FileNotFoundError:
+                pass
+            # If the snapshot was replaced meanwhile, our log may have been folded and removed
+            try:
+                if os.stat(filename).st_ino != stat.st_ino:
+                    continue
+            except FileNotFoundError:
+                return None, None, None, 0
+            return data, _local_version(stat, log_size), stat.st_ino, log_ops
+        return None, None, None, 0
+
+    def read(self, wishlist_id: str):
+        self.ensure_data_dir()
+        data, version, _, _ = self._read_state(wishlist_id)
+        return data, version
+
+    def _current_version(self, wishlist_id: str):
+        filename = self.wishlist_filename(wishlist_id)
+        if not os.path.exists(filename):
+            return None
+        stat = os.stat(filename)
+        try:
+            with open(self.log_filename(wishlist_id, stat.st_ino), 'rb') as log:
+                # Like _read_state, count complete lines only
+                log_size = _complete_length(log)
+        except FileNotFoundError:
+            log_size = 0
+        return _local_version(stat, log_size)
+
+    def _replace_snapshot(self, wishlist_id: str, data: Dict) -> str:
+        """Write a new snapshot and drop the logs of older ones. Caller holds the lock."""
+        filename = self.wishlist_filename(wishlist_id)
+        self._dump(filename, data)
+        current_log = self.log_filename(wishlist_id, os.stat(filename).st_ino)
+        for old_log in glob.glob(glob.escape(filename) + '.*.log'):
+            if old_log != current_log:
+                os.remove(old_log)
+        return self._current_version(wishlist_id)
+
+    def write(self, wishlist_id: str, data: Dict, expected_version=None):
+        self.ensure_data_dir()
+        filename = self.wishlist_filename(wishlist_id)
+        # Version check and write under one lock, so the check can't go stale in between
+        with self._locked(filename):
+            if expected_version is not None and self._current_version(wishlist_id) != expected_version:
+                raise StaleVersionError(wishlist_id)
+            version = self._replace_snapshot(wishlist_id, data)
+        self._note_summary(wishlist_id, data)
+        return version
+
+    def _append_op(self, wishlist_id: str, op: Dict, check):
+        """Validate op against the current state and append it to the log (O(1) write)."""
+        self.ensure_data_dir()
+        with self._locked(self.wishlist_filename(wishlist_id)):
+            data, version, snapshot_ino, log_ops = self._read_state(wishlist_id)
+            if data is None:
+                raise WishlistConflictError("Wunschliste nicht gefunden")
+            items = data.setdefault("items", [])
+            assign_item_ids(wishlist_id, items)
+            check(items)
+            line = json.dumps(op, ensure_ascii=False) + "\n"
+            with open(self.log_filename(wishlist_id, snapshot_ino), 'a+b') as log:
+                # Drop a torn last line first, or the new op would be glued onto it
+                log.truncate(_complete_length(log))
+                log.write(line.encode('utf-8'))
+                log.flush()
+                os.fsync(log.fileno())
+            new_version = self._current_version(wishlist_id)
+        if log_ops + 1 >= self.compact_after:
+            self._schedule_compaction(wishlist_id)
+        _replay(wishlist_id, data, op)
+        self._note_summary(wishlist_id, data)
+        return version, new_version
+
+    def compact(self, wishlist_id: str) -> None:
+        """Fold the operation log into a new snapshot, and bring the index summaries up to date."""
+        with self._locked(self.wishlist_filename(wishlist_id)):
+            data, _, _, log_ops = self._read_state(wishlist_id)
+            if data is not None and log_ops:
+                self._replace_snapshot(wishlist_id, data)
+        if data is not None:
+            self._note_summary(wishlist_id, data)
+        self.flush_summaries()
+
+    def _schedule_compaction(self, wishlist_id: str) -> None:
+        with self._compacting_lock:
+            if wishlist_id in self._compacting:
+                return
+            self._compacting.add(wishlist_id)
+
+        def run():
+            try:
+                self.compact(wishlist_id)
+            finally:
+                with self._compacting_lock:
+                    self._compacting.discard(wishlist_id)
+
+        threading.Thread(target=run, name=f"compact-{wishlist_id}", daemon=True).start()
+
+    def add_item(self, wishlist_id: str, item: Dict):
+        return self._append_op(wishlist_id, {"op": "add", "item": dict(item)}, lambda items: None)
+
+    def update_item(self, wishlist_id: str, item_id: str, fields: Dict, expected: Optional[Dict] = None):
+        if fields == {"is_gifted": True}:
+            op = {"op": "gift", "item_id": item_id}
+        else:
+            op = {"op": "update", "item_id": item_id, "fields": fields}
+        return self._append_op(wishlist_id, op, lambda items: check_item(items, item_id, expected))
+
+    def delete_item(self, wishlist_id: str, item_id: str, expected: Optional[Dict] = None):
+        return self._append_op(wishlist_id, {"op": "delete", "item_id": item_id},
+                               lambda items: check_item(items, item_id, expected))
+
+    def move_item(self, wishlist_id: str, item_id: str, new_index: int, expected: Optional[Dict] = None):
+        return self._append_op(wishlist_id, {"op": "move", "item_id": item_id, "to": new_index},
+                               lambda items: check_item(items, item_id, expected))
+
+    def create(self, wishlist_id: str, data: Dict) -> None:
+        self.ensure_data_dir()
+        filename = self.wishlist_filename(wishlist_id)
+        with self._locked(filename):
+            self._dump(filename, data)
+        self._index_upsert(index_entry(wishlist_id, data))
+
+    def delete(self, wishlist_id: str) -> None:
+        self.ensure_data_dir()
+        self._index_remove(wishlist_id)
+        filename = self.wishlist_filename(wishlist_id)
+        with self._locked(filename):
+            if os.path.exists(filename):
+                os.remove(filename)
+            for log_file in glob.glob(glob.escape(filename) + '.*.log'):
+                os.remove(log_file)
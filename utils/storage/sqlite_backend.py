@@ -0,0 +1,338 @@
+import os
+import json
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+from .base import StorageBackend, StaleVersionError, check_expected
+from .index import PAGE_SIZE, utc_timestamp
+from ..merge import WishlistConflictError
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS wishlists (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    password_hash TEXT,
+    extra TEXT,
+    version INTEGER NOT NULL DEFAULT 1,
+    item_count INTEGER NOT NULL DEFAULT 0,
+    gifted_count INTEGER NOT NULL DEFAULT 0,
+    modified TEXT
+);
+CREATE TABLE IF NOT EXISTS items (
+    pk INTEGER PRIMARY KEY,
+    wishlist_id TEXT NOT NULL REFERENCES wishlists(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    item_id TEXT,
+    gift_name TEXT NOT NULL DEFAULT '',
+    purchase_link TEXT NOT NULL DEFAULT '',
+    is_gifted INTEGER NOT NULL DEFAULT 0,
+    price TEXT NOT NULL DEFAULT '',
+    amazon_link TEXT NOT NULL DEFAULT '',
+    is_highlight INTEGER NOT NULL DEFAULT 0,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS items_by_position ON items (wishlist_id, position);
+"""
+
+_COUNT_SUMMARIES = (
+    "UPDATE wishlists SET"
+    " item_count = (SELECT COUNT(*) FROM items WHERE items.wishlist_id = wishlists.id),"
+    " gifted_count = (SELECT COUNT(*) FROM items WHERE items.wishlist_id = wishlists.id AND is_gifted = 1)"
+)
+
+# Columns added after the first release: (table, column, statements run once to add them)
+_MIGRATIONS = (
+    ("items", "item_id", ("ALTER TABLE items ADD COLUMN item_id TEXT",)),
+    ("wishlists", "item_count", (
+        "ALTER TABLE wishlists ADD COLUMN item_count INTEGER NOT NULL DEFAULT 0",
+        "ALTER TABLE wishlists ADD COLUMN gifted_count INTEGER NOT NULL DEFAULT 0",
+        "ALTER TABLE wishlists ADD COLUMN modified TEXT",
+        _COUNT_SUMMARIES,
+    )),
+)
+_INDEXES = """
+CREATE INDEX IF NOT EXISTS items_by_id ON items (wishlist_id, item_id);
+"""
+
+_ITEM_TEXT_FIELDS = ("gift_name", "purchase_link", "price", "amazon_link")
+_ITEM_BOOL_FIELDS = ("is_gifted", "is_highlight")
+_ITEM_FIELDS = ("id",) + _ITEM_TEXT_FIELDS + _ITEM_BOOL_FIELDS
+_WISHLIST_FIELDS = ("id", "name", "password_hash", "items")
+
+
+def _extra(data: Dict, known) -> Optional[str]:
+    rest = {k: v for k, v in data.items() if k not in known}
+    return json.dumps(rest, ensure_ascii=False) if rest else None
+
+
+def _item_row(item: Dict):
+    return (
+        item.get("id"),
+        *(item.get(f) or "" for f in _ITEM_TEXT_FIELDS),
+        *(1 if item.get(f) else 0 for f in _ITEM_BOOL_FIELDS),
+        _extra(item, _ITEM_FIELDS),
+    )
+
+
+class SqliteBackend(StorageBackend):
+    """Wishlists and items as rows in a SQLite database (WAL mode).
+
+    Readers never block the writer and vice versa, and item operations touch single
+    rows instead of rewriting the whole wishlist. The version of a wishlist is a
+    counter bumped by every write.
+    """
+
+    name = "sqlite"
+    label = "SQLite"
+    transient_errors = (OSError, sqlite3.OperationalError)  # e.g. "database is locked"
+
+    def __init__(self, path: str = os.path.join('data', 'wishlists.db')):
+        self.path = path
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            with self._init_lock:
+                if not self._initialized:
+                    conn.executescript(_SCHEMA)
+                    for table, column, statements in _MIGRATIONS:
+                        columns = {r["name"] for r in conn.execute(f"PRAGMA table_info({table})")}
+                        if column not in columns:
+                            for statement in statements:
+                                conn.execute(statement)
+                    conn.executescript(_INDEXES)
+                    self._initialized = True
+            self._local.conn = conn
+        return conn
+
+    def _write_txn(self):
+        """BEGIN IMMEDIATE: take the write lock up front so version checks stay valid."""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        return conn
+
+    def _bump_version(self, conn, wishlist_id: str, expected_version=None) -> int:
+        row = conn.execute("SELECT version FROM wishlists WHERE id = ?", (wishlist_id,)).fetchone()
+        if row is None:
+            raise WishlistConflictError("Wunschliste nicht gefunden")
+        if expected_version is not None and row["version"] != expected_version:
+            raise StaleVersionError(wishlist_id)
+        conn.execute("UPDATE wishlists SET version = version + 1 WHERE id = ?", (wishlist_id,))
+        return row["version"] + 1
+
+    def _touch(self, conn, wishlist_id: str, items: int = 0, gifted: int = 0) -> None:
+        """Adjust the summary columns of a wishlist by the given deltas; no items are counted."""
+        conn.execute(
+            "UPDATE wishlists SET item_count = item_count + ?, gifted_count = gifted_count + ?, modified = ?"
+            " WHERE id = ?",
+            (items, gifted, utc_timestamp(), wishlist_id),
+        )
+
+    def _set_summary(self, conn, wishlist_id: str, items: List[Dict]) -> None:
+        """Set the summary columns from the item list a whole-wishlist write just stored."""
+        conn.execute(
+            "UPDATE wishlists SET item_count = ?, gifted_count = ?, modified = ? WHERE id = ?",
+            (len(items), sum(1 for i in items if i.get("is_gifted")), utc_timestamp(), wishlist_id),
+        )
+
+    def _insert_items(self, conn, wishlist_id: str, items: List[Dict], start: int = 0) -> None:
+        conn.executemany(
+            "INSERT INTO items (wishlist_id, position, item_id, gift_name, purchase_link, price, amazon_link,"
+            " is_gifted, is_highlight, extra) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(wishlist_id, start + i, *_item_row(item)) for i, item in enumerate(items)],
+        )
+
+    def _item_from_row(self, row) -> Dict:
+        item = {"id": row["item_id"]} if row["item_id"] else {}
+        item.update((f, row[f]) for f in _ITEM_TEXT_FIELDS)
+        for f in _ITEM_BOOL_FIELDS:
+            item[f] = bool(row[f])
+        if row["extra"]:
+            item.update(json.loads(row["extra"]))
+        return item
+
+    def list_wishlists(self) -> List[Dict]:
+        rows = self._conn().execute(
+            "SELECT id, name, item_count, gifted_count, modified FROM wishlists ORDER BY seq"
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+    def list_page(self, page: int = 0):
+        conn = self._conn()
+        (count,) = conn.execute("SELECT COUNT(*) FROM wishlists").fetchone()
+        pages = max(1, -(-count // PAGE_SIZE))
+        page = min(max(page, 0), pages - 1)
+        rows = conn.execute(
+            "SELECT id, name, item_count, gifted_count, modified FROM wishlists ORDER BY seq LIMIT ? OFFSET ?",
+            (PAGE_SIZE, page * PAGE_SIZE),
+        ).fetchall()
+        return [dict(r) for r in rows], pages
+
+    def save_index(self, wishlists: List[Dict]) -> None:
+        # The index is derived from the wishlists table; only names can change here
+        conn = self._write_txn()
+        try:
+            conn.executemany(
+                "UPDATE wishlists SET name = ? WHERE id = ?",
+                [(w.get("name"), w.get("id")) for w in wishlists],
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def read(self, wishlist_id: str):
+        conn = self._conn()
+        # One read transaction so the wishlist row and its items come from the same snapshot
+        conn.execute("BEGIN")
+        try:
+            row = conn.execute("SELECT * FROM wishlists WHERE id = ?", (wishlist_id,)).fetchone()
+            if row is None:
+                return None, None
+            items = conn.execute(
+                "SELECT * FROM items WHERE wishlist_id = ? ORDER BY position", (wishlist_id,)
+            ).fetchall()
+        finally:
+            conn.execute("COMMIT")
+        data = {"id": row["id"], "name": row["name"], "password_hash": row["password_hash"]}
+        if row["extra"]:
+            data.update(json.loads(row["extra"]))
+        data["items"] = [self._item_from_row(r) for r in items]
+        return data, row["version"]
+
+    def write(self, wishlist_id: str, data: Dict, expected_version=None):
+        conn = self._write_txn()
+        try:
+            version = self._bump_version(conn, wishlist_id, expected_version)
+            conn.execute(
+                "UPDATE wishlists SET name = ?, password_hash = ?, extra = ? WHERE id = ?",
+                (data.get("name"), data.get("password_hash"), _extra(data, _WISHLIST_FIELDS), wishlist_id),
+            )
+            conn.execute("DELETE FROM items WHERE wishlist_id = ?", (wishlist_id,))
+            self._insert_items(conn, wishlist_id, data.get("items", []))
+            self._set_summary(conn, wishlist_id, data.get("items", []))
+            conn.execute("COMMIT")
+            return version
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def create(self, wishlist_id: str, data: Dict) -> None:
+        conn = self._write_txn()
+        try:
+            conn.execute(
+                "INSERT INTO wishlists (id, name, password_hash, extra) VALUES (?, ?, ?, ?)",
+                (wishlist_id, data.get("name"), data.get("password_hash"), _extra(data, _WISHLIST_FIELDS)),
+            )
+            self._insert_items(conn, wishlist_id, data.get("items", []))
+            self._set_summary(conn, wishlist_id, data.get("items", []))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def delete(self, wishlist_id: str) -> None:
+        conn = self._write_txn()
+        try:
+            conn.execute("DELETE FROM wishlists WHERE id = ?", (wishlist_id,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _locate_item(self, conn, wishlist_id: str, item_id: str, expected: Optional[Dict]):
+        row = conn.execute(
+            "SELECT * FROM items WHERE wishlist_id = ? AND item_id = ?", (wishlist_id, item_id)
+        ).fetchone()
+        item = check_expected(self._item_from_row(row) if row is not None else None, expected)
+        return row, item
+
+    def add_item(self, wishlist_id: str, item: Dict):
+        conn = self._write_txn()
+        try:
+            version = self._bump_version(conn, wishlist_id)
+            (count,) = conn.execute("SELECT COUNT(*) FROM items WHERE wishlist_id = ?", (wishlist_id,)).fetchone()
+            self._insert_items(conn, wishlist_id, [item], start=count)
+            self._touch(conn, wishlist_id, items=1, gifted=1 if item.get("is_gifted") else 0)
+            conn.execute("COMMIT")
+            return version - 1, version
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def update_item(self, wishlist_id: str, item_id: str, fields: Dict, expected: Optional[Dict] = None):
+        conn = self._write_txn()
+        try:
+            version = self._bump_version(conn, wishlist_id)
+            row, item = self._locate_item(conn, wishlist_id, item_id, expected)
+            item.update(fields)
+            # A single-row UPDATE; gifting touches nothing else
+            conn.execute(
+                "UPDATE items SET item_id = ?, gift_name = ?, purchase_link = ?, price = ?, amazon_link = ?,"
+                " is_gifted = ?, is_highlight = ?, extra = ? WHERE pk = ?",
+                (*_item_row(item), row["pk"]),
+            )
+            self._touch(conn, wishlist_id, gifted=(1 if item.get("is_gifted") else 0) - row["is_gifted"])
+            conn.execute("COMMIT")
+            return version - 1, version
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def delete_item(self, wishlist_id: str, item_id: str, expected: Optional[Dict] = None):
+        conn = self._write_txn()
+        try:
+            version = self._bump_version(conn, wishlist_id)
+            row, _ = self._locate_item(conn, wishlist_id, item_id, expected)
+            index = row["position"]
+            conn.execute("DELETE FROM items WHERE pk = ?", (row["pk"],))
+            conn.execute(
+                "UPDATE items SET position = position - 1 WHERE wishlist_id = ? AND position > ?",
+                (wishlist_id, index),
+            )
+            self._touch(conn, wishlist_id, items=-1, gifted=-row["is_gifted"])
+            conn.execute("COMMIT")
+            return version - 1, version
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def move_item(self, wishlist_id: str, item_id: str, new_index: int, expected: Optional[Dict] = None):
+        conn = self._write_txn()
+        try:
+            version = self._bump_version(conn, wishlist_id)
+            row, _ = self._locate_item(conn, wishlist_id, item_id, expected)
+            index = row["position"]
+            (count,) = conn.execute("SELECT COUNT(*) FROM items WHERE wishlist_id = ?", (wishlist_id,)).fetchone()
+            if 0 <= new_index < count and new_index != index:
+                if new_index < index:
+                    conn.execute(
+                        "UPDATE items SET position = position + 1"
+                        " WHERE wishlist_id = ? AND position >= ? AND position < ?",
+                        (wishlist_id, new_index, index),
+                    )
+                else:
+                    conn.execute(
+                        "UPDATE items SET position = position - 1"
+                        " WHERE wishlist_id = ? AND position > ? AND position <= ?",
+                        (wishlist_id, index, new_index),
+                    )
+                conn.execute("UPDATE items SET position = ? WHERE pk = ?", (new_index, row["pk"]))
+            self._touch(conn, wishlist_id)
+            conn.execute("COMMIT")
+            return version - 1, version
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
@@ -0,0 +1,151 @@
+import copy
+import time
+import atexit
+import threading
+from collections import OrderedDict, deque
+
+
+class WriteBehindQueue:
+    """Coalesces saves per key and writes the latest state from a background thread.
+
+    The first save for a key opens a flush window; further saves within the window only
+    replace the pending state, so one write carries all of them. Pending (and in-flight)
+    state stays readable via get_pending() until the write has landed.
+
+    Only errors retry_if() accepts are retried; a write that fails otherwise, or runs out
+    of attempts, is reported to the owners of the saves it carried (see pop_failures).
+    """
+
+    _MAX_OWNERS = 1000
+
+    def __init__(self, writer, window: float = 2.0, max_attempts: int = 3, retry_if=lambda error: True):
+        self._writer = writer
+        self._window = window
+        self._max_attempts = max_attempts
+        self._retry_if = retry_if
+        self._pending = {}   # key -> [data, due_time, attempts, owners]
+        self._inflight = {}  # key -> data currently being written
+        self._cond = threading.Condition()
+        # Held while popping and writing a batch, so writes for a key land in submit order
+        self._write_lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+        self.errors = deque(maxlen=20)
+        # Failed writes not yet shown to their owners: owner -> [{"key", "error", "time"}]
+        self._failures = OrderedDict()
+        atexit.register(self.close)
+
+    def submit(self, key, data, owner=None):
+        """Queue data as the latest state for key; owner (e.g. a session) hears if it fails."""
+        with self._cond:
+            entry = self._pending.get(key)
+            if entry is not None:
+                entry[0] = copy.deepcopy(data)
+            else:
+                entry = self._pending[key] = [copy.deepcopy(data), time.monotonic() + self._window, 0, set()]
+            if owner is not None:
+                entry[3].add(owner)
+            closed = self._closed
+            if not closed:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+                    self._thread.start()
+                self._cond.notify()
+        if closed:
+            # Shutting down: no worker left to pick this up
+            self.flush(key)
+
+    def get_pending(self, key):
+        """Latest unsaved state for key (a copy), or None."""
+        with self._cond:
+            entry = self._pending.get(key)
+            if entry is not None:
+                return copy.deepcopy(entry[0])
+            if key in self._inflight:
+                return copy.deepcopy(self._inflight[key])
+        return None
+
+    def has_pending(self, key=None) -> bool:
+        with self._cond:
+            if key is None:
+                return bool(self._pending or self._inflight)
+            return key in self._pending or key in self._inflight
+
+    def pop_failures(self, owner):
+        """Failed writes carrying saves of owner since the last call: [{"key", "error", "time"}]."""
+        with self._cond:
+            return self._failures.pop(owner, [])
+
+    def discard(self, key):
+        """Drop pending state for key (e.g. the wishlist was deleted), waiting out an in-flight write."""
+        with self._write_lock:
+            with self._cond:
+                self._pending.pop(key, None)
+
+    def flush(self, key=None):
+        """Write pending state now (for one key or all keys) in the calling thread."""
+        with self._write_lock:
+            with self._cond:
+                keys = [key] if key is not None else list(self._pending)
+                batch = self._take(keys)
+            for k, entry in batch:
+                self._write(k, entry)
+
+    def close(self):
+        """Stop accepting background work and flush everything that is pending."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self.flush()
+
+    def _take(self, keys):
+        """Move pending entries to in-flight. Caller holds self._cond."""
+        batch = [(k, self._pending.pop(k)) for k in keys if k in self._pending]
+        for k, entry in batch:
+            self._inflight[k] = entry[0]
+        return batch
+
+    def _write(self, key, entry):
+        data, _, attempts, owners = entry
+        try:
+            self._writer(key, data)
+        except Exception as e:
+            failure = {"key": key, "error": str(e), "time": time.time()}
+            self.errors.append(failure)
+            with self._cond:
+                newer = self._pending.get(key)
+                if newer is not None:
+                    # A newer state builds on this one, so its write carries these saves too
+                    newer[3].update(owners)
+                elif self._retry_if(e) and attempts + 1 < self._max_attempts and not self._closed:
+                    self._pending[key] = [data, time.monotonic() + self._window, attempts + 1, owners]
+                    self._cond.notify()
+                else:
+                    # A conflict won't go away by retrying: tell the sessions whose edits are lost
+                    for owner in owners:
+                        self._failures.setdefault(owner, []).append(failure)
+                        self._failures.move_to_end(owner)
+                    while len(self._failures) > self._MAX_OWNERS:
+                        self._failures.popitem(last=False)
+        finally:
+            with self._cond:
+                if self._inflight.get(key) is data:
+                    del self._inflight[key]
+
+    def _due_keys(self):
+        now = time.monotonic()
+        return [k for k, entry in self._pending.items() if entry[1] <= now]
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._closed and not self._due_keys():
+                    next_due = min((entry[1] for entry in self._pending.values()), default=None)
+                    self._cond.wait(None if next_due is None else max(0.0, next_due - time.monotonic()))
+                if self._closed:
+                    return
+            with self._write_lock:
+                with self._cond:
+                    batch = self._take(self._due_keys())
+                for k, entry in batch:
+                    self._write(k, entry)